@@ -0,0 +1,104 @@
+import os
+import threading
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+COUNTERS_COLLECTION = "Counters"
+AUDIT_COUNTER = "audit_id"
+# First audit id handed out on an empty database
+FIRST_AUDIT_ID = 1001
+# Ids reserved per round trip; unused ids in a block are skipped when the process exits
+AUDIT_ID_BLOCK_SIZE = int(os.getenv("AUDIT_ID_BLOCK_SIZE", 20))
+
+
+class AuditIdAllocator:
+    """Hands out unique audit ids from a counter document.
+
+    Each process reserves a block of ids with one atomic $inc and serves
+    them from memory, so concurrent uploads, workers and processes never
+    share an id. Ids are unique and increasing per process, but may have
+    gaps and are not strictly ordered across processes. An allocator is not
+    carried across a fork: ``get_allocator`` gives a forked child a new one.
+    """
+
+    def __init__(self, db, block_size: int = AUDIT_ID_BLOCK_SIZE, counter: str = AUDIT_COUNTER):
+        self.db = db
+        self.block_size = max(1, block_size)
+        self.counter = counter
+        self._lock = threading.Lock()
+        self._seeded = False
+        self._next = 0
+        self._last = -1
+
+    def _seed(self):
+        """Start the counter after the highest audit id already stored."""
+        last = self.db["Audit"].find_one(
+            {"audit_id": {"$type": "number"}},
+            sort=[("audit_id", -1)],
+            projection={"audit_id": 1}
+        )
+        floor = max(FIRST_AUDIT_ID - 1, int(last["audit_id"]) if last else 0)
+        try:
+            # $max keeps the seed safe when several processes seed at once
+            self.db[COUNTERS_COLLECTION].update_one(
+                {"_id": self.counter}, {"$max": {"seq": floor}}, upsert=True
+            )
+        except DuplicateKeyError:
+            # Another process created the counter between our match and insert
+            self.db[COUNTERS_COLLECTION].update_one({"_id": self.counter}, {"$max": {"seq": floor}})
+        self._seeded = True
+
+    def _reserve(self):
+        if not self._seeded:
+            self._seed()
+        counter = self.db[COUNTERS_COLLECTION].find_one_and_update(
+            {"_id": self.counter},
+            {"$inc": {"seq": self.block_size}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        self._last = counter["seq"]
+        self._next = self._last - self.block_size + 1
+
+    def next_id(self) -> int:
+        with self._lock:
+            if self._next > self._last:
+                self._reserve()
+            audit_id = self._next
+            self._next += 1
+            return audit_id
+
+
+def ensure_audit_indexes(db):
+    """Create the unique audit_id index the allocator and /audits paging rely on."""
+    try:
+        db["Audit"].create_index([("audit_id", ASCENDING)], unique=True, name="audit_id_unique")
+        return True
+    except OperationFailure as e:
+        # Usually duplicate ids written before the allocator existed
+        print(f"⚠️ Could not create unique audit_id index: {e}")
+        return False
+
+
+_allocator = None
+_allocator_lock = threading.Lock()
+
+
+def get_allocator(db) -> AuditIdAllocator:
+    """Process-wide allocator, so every caller shares the reserved block."""
+    global _allocator
+    with _allocator_lock:
+        if _allocator is None:
+            _allocator = AuditIdAllocator(db)
+        return _allocator
+
+
+def _reset_allocator():
+    # The parent's allocator holds the parent's db and MongoClient; a forked child builds its own
+    global _allocator, _allocator_lock
+    _allocator_lock = threading.Lock()
+    _allocator = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_allocator)
@@ -0,0 +1,219 @@
+"""Incrementally maintained audit analytics.
+
+Every finished ingestion adds its outcome to one ``Audit_Summary`` document
+per (file type, day). ``/audits/summary`` aggregates those small
+documents instead of scanning the Audit log. Processing times are kept as
+fixed-bucket histograms so percentiles can be read back without the raw
+durations.
+"""
+import argparse
+from datetime import datetime, timezone
+
+SUMMARY_COLLECTION = "Audit_Summary"
+IN_FLIGHT_STATUSES = ["PENDING", "IN_PROGRESS"]
+
+# Upper bounds (seconds) of the processing-time histogram buckets; the last one is open-ended
+DURATION_BUCKETS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600, float("inf")]
+PERCENTILES = [50, 90, 99]
+INTERVALS = ["day", "week", "month"]
+
+
+def _day(moment: datetime) -> datetime:
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _duration_bucket(seconds: float) -> int:
+    for i, bound in enumerate(DURATION_BUCKETS):
+        if seconds <= bound:
+            return i
+    return len(DURATION_BUCKETS) - 1
+
+
+def summary_update(status: str, processed_rows, error_rows, duration_seconds) -> dict:
+    """``$inc``/``$max`` update adding one finished audit to its summary bucket."""
+    inc = {
+        "files": 1,
+        f"status.{status}": 1,
+        "processed_rows": processed_rows or 0,
+        "error_rows": error_rows or 0,
+    }
+    update = {"$inc": inc}
+    if duration_seconds is not None:
+        inc["timed_files"] = 1
+        inc["duration_sum"] = duration_seconds
+        inc[f"duration_hist.{_duration_bucket(duration_seconds)}"] = 1
+        update["$max"] = {"duration_max": duration_seconds}
+    return update
+
+
+def record_audit(db, file_type: str, status: str, processed_rows=None, error_rows=None,
+                 duration_seconds=None, finished_at: datetime = None):
+    """Fold a finished audit into the summary collection (one upsert)."""
+    bucket = _day(finished_at or datetime.now())
+    db[SUMMARY_COLLECTION].update_one(
+        {"file_type": file_type, "bucket": bucket},
+        summary_update(status, processed_rows, error_rows, duration_seconds),
+        upsert=True
+    )
+
+
+def _merge_counts(target: dict, counts: dict):
+    for key, value in (counts or {}).items():
+        target[key] = target.get(key, 0) + value
+
+
+def duration_stats(hist: dict, timed_files: int, duration_sum: float, duration_max) -> dict:
+    """Mean, max and histogram percentiles (bucket upper bounds) in seconds."""
+    stats = {"mean": None, "max": duration_max}
+    stats.update({f"p{p}": None for p in PERCENTILES})
+    if not timed_files:
+        return stats
+    stats["mean"] = round(duration_sum / timed_files, 3)
+    counts = [hist.get(str(i), 0) for i in range(len(DURATION_BUCKETS))]
+    for p in PERCENTILES:
+        rank, seen = p / 100 * timed_files, 0
+        for i, count in enumerate(counts):
+            seen += count
+            if seen >= rank:
+                bound = DURATION_BUCKETS[i]
+                # The open-ended bucket can only be bounded by the observed maximum
+                stats[f"p{p}"] = duration_max if bound == float("inf") else min(bound, duration_max)
+                break
+    return stats
+
+
+def _finish(group: dict) -> dict:
+    processed = group["processed_rows"]
+    return {
+        "files": group["files"],
+        "status": group["status"],
+        "processed_rows": processed,
+        "error_rows": group["error_rows"],
+        "error_rate": round(group["error_rows"] / processed * 100, 2) if processed else 0.0,
+        "processing_seconds": duration_stats(group["duration_hist"], group["timed_files"],
+                                             group["duration_sum"], group["duration_max"]),
+    }
+
+
+def _group_stage(key) -> dict:
+    return {"$group": {
+        "_id": key,
+        "files": {"$sum": "$files"},
+        "processed_rows": {"$sum": "$processed_rows"},
+        "error_rows": {"$sum": "$error_rows"},
+        "timed_files": {"$sum": "$timed_files"},
+        "duration_sum": {"$sum": "$duration_sum"},
+        "duration_max": {"$max": "$duration_max"},
+        # a handful of small dicts per group, merged below
+        "status": {"$push": "$status"},
+        "duration_hist": {"$push": "$duration_hist"},
+    }}
+
+
+def _collapse(doc: dict) -> dict:
+    group = dict(doc)
+    group.pop("_id")
+    for field in ("status", "duration_hist"):
+        merged = {}
+        for counts in group[field]:
+            _merge_counts(merged, counts)
+        group[field] = merged
+    return group
+
+
+def summary_pipeline(interval: str = "day", date_from: datetime = None, date_to: datetime = None) -> list:
+    match = {}
+    if date_from is not None or date_to is not None:
+        match["bucket"] = {}
+        if date_from is not None:
+            match["bucket"]["$gte"] = _day(date_from)
+        if date_to is not None:
+            match["bucket"]["$lte"] = date_to
+    bucket = "$bucket" if interval == "day" else {"$dateTrunc": {"date": "$bucket", "unit": interval}}
+    return [
+        {"$match": match},
+        {"$facet": {
+            "file_types": [_group_stage("$file_type"), {"$sort": {"_id": 1}}],
+            "timeline": [_group_stage({"bucket": bucket, "file_type": "$file_type"}), {"$sort": {"_id.bucket": 1, "_id.file_type": 1}}],
+        }},
+    ]
+
+
+def build_summary(db, interval: str = "day", date_from: datetime = None, date_to: datetime = None) -> dict:
+    """Counts, error rates and processing-time percentiles by file type and time bucket."""
+    if interval not in INTERVALS:
+        raise ValueError(f"Unsupported interval: {interval}, expected one of {INTERVALS}")
+
+    facets = next(db[SUMMARY_COLLECTION].aggregate(summary_pipeline(interval, date_from, date_to)),
+                  {"file_types": [], "timeline": []})
+
+    status_counts = {}
+    file_types = []
+    for doc in facets["file_types"]:
+        group = _collapse(doc)
+        _merge_counts(status_counts, group["status"])
+        file_types.append({"file_type": doc["_id"], **_finish(group)})
+
+    timeline = []
+    for doc in facets["timeline"]:
+        timeline.append({
+            "bucket": doc["_id"]["bucket"].date().isoformat(),
+            "file_type": doc["_id"]["file_type"],
+            **_finish(_collapse(doc)),
+        })
+
+    # Unfinished uploads never reach the summary; count them live from the Audit log
+    for status in IN_FLIGHT_STATUSES:
+        status_counts[status] = db["Audit"].count_documents({"status": status})
+
+    return {"interval": interval, "status_counts": status_counts, "file_types": file_types, "timeline": timeline}
+
+
+def _parse_time(value):
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+def rebuild_summary(db) -> int:
+    """Recompute the summary collection from the full Audit log (one-off backfill)."""
+    buckets = {}
+    audits = db["Audit"].find(
+        {"status": {"$nin": IN_FLIGHT_STATUSES}},
+        {"file_type": 1, "status": 1, "processed_rows": 1, "error_rows": 1, "started_at": 1, "finished_at": 1}
+    )
+    for audit in audits:
+        started, finished = _parse_time(audit.get("started_at")), _parse_time(audit.get("finished_at"))
+        duration = (finished - started).total_seconds() if started and finished else None
+        key = (audit.get("file_type"), _day(finished or datetime.now()))
+        update = summary_update(audit.get("status"), audit.get("processed_rows"), audit.get("error_rows"), duration)
+        doc = buckets.setdefault(key, {"$inc": {}, "$max": {}})
+        _merge_counts(doc["$inc"], update["$inc"])
+        if "$max" in update:
+            doc["$max"]["duration_max"] = max(doc["$max"].get("duration_max", 0), update["$max"]["duration_max"])
+
+    summary = db[SUMMARY_COLLECTION]
+    summary.delete_many({})
+    for (file_type, bucket), update in buckets.items():
+        update = {op: fields for op, fields in update.items() if fields}
+        summary.update_one({"file_type": file_type, "bucket": bucket}, update, upsert=True)
+    return len(buckets)
+
+
+if __name__ == "__main__":
+    from mongo_writer import MongoWriter
+
+    parser = argparse.ArgumentParser(description="Maintain the Audit_Summary collection")
+    parser.add_argument("--rebuild", action="store_true", help="recompute it from the Audit log")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        count = rebuild_summary(MongoWriter().db)
+        print(f"✅ Rebuilt {count} summary buckets from the Audit log")
+    else:
+        parser.print_help()
@@ -0,0 +1,87 @@
+"""Audit id allocator concurrency check.
+
+Simulates many parallel uploads: several processes, each with several
+threads, allocate audit ids and insert Audit records into a scratch
+database guarded by the unique audit_id index. Reports ids/sec and
+exits non-zero if any id was handed out twice.
+
+    python -m benchmarks.bench_audit_ids --processes 8 --threads 16 --ids 200
+"""
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from pymongo import MongoClient
+from pymongo.errors import DuplicateKeyError
+
+from audit_ids import AUDIT_ID_BLOCK_SIZE, AuditIdAllocator, ensure_audit_indexes
+from mongo_writer import MONGO_URI
+
+
+def upload_worker(uri, db_name, threads, ids_per_thread, block_size):
+    """One process worth of uploads; returns (allocated ids, duplicate inserts)."""
+    db = MongoClient(uri)[db_name]
+    allocator = AuditIdAllocator(db, block_size=block_size)
+
+    def upload(_):
+        ids, duplicates = [], 0
+        for _ in range(ids_per_thread):
+            audit_id = allocator.next_id()
+            ids.append(audit_id)
+            try:
+                db["Audit"].insert_one({"audit_id": audit_id, "status": "PENDING"})
+            except DuplicateKeyError:
+                duplicates += 1
+        return ids, duplicates
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(upload, range(threads)))
+    return [i for ids, _ in results for i in ids], sum(d for _, d in results)
+
+
+def run(uri, db_name, processes, threads, ids_per_thread, block_size):
+    client = MongoClient(uri)
+    client.drop_database(db_name)
+    ensure_audit_indexes(client[db_name])
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = [
+            pool.submit(upload_worker, uri, db_name, threads, ids_per_thread, block_size)
+            for _ in range(processes)
+        ]
+        results = [f.result() for f in futures]
+    elapsed = time.perf_counter() - start
+
+    ids = [i for worker_ids, _ in results for i in worker_ids]
+    result = {
+        "processes": processes,
+        "threads": threads,
+        "block_size": block_size,
+        "ids": len(ids),
+        "unique_ids": len(set(ids)),
+        "duplicate_inserts": sum(d for _, d in results),
+        "ids_per_sec": round(len(ids) / elapsed, 1) if elapsed else None,
+    }
+    client.drop_database(db_name)
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--uri", default=MONGO_URI)
+    parser.add_argument("--db", default="audit_id_bench", help="scratch database, dropped before and after")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--ids", type=int, default=100, help="ids allocated per thread")
+    parser.add_argument("--block-size", type=int, default=AUDIT_ID_BLOCK_SIZE)
+    args = parser.parse_args()
+
+    result = run(args.uri, args.db, args.processes, args.threads, args.ids, args.block_size)
+    print(json.dumps(result, indent=4))
+    if result["unique_ids"] != result["ids"] or result["duplicate_inserts"]:
+        print("❌ Duplicate audit ids allocated")
+        sys.exit(1)
+    print("✅ All audit ids unique")
@@ -0,0 +1,89 @@
+"""Per-customer Data Mart lookup latency benchmark.
+
+Loads N synthetic customer documents (default 1M) into a scratch
+database and times the /fetch/<customer_id> existence lookup with and
+without the customer_id index from indexes.py.
+
+    python -m benchmarks.bench_customer_lookup --customers 1000000
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+
+from pymongo import MongoClient
+
+from data_mart import DATA_MART_COLLECTION, customer_id_query
+from indexes import INDEXES
+from mongo_writer import MONGO_URI
+
+INSERT_BATCH = 10000
+
+
+def load_customers(collection, customers, seed=9):
+    rnd = random.Random(seed)
+    for start in range(0, customers, INSERT_BATCH):
+        collection.insert_many([
+            {
+                "customer_id": 100000 + i,
+                "name": f"Customer {i}",
+                "collections": {"Customer_UPI_Transactions": [{"amount (inr)": rnd.randint(1, 5000)}]},
+            }
+            for i in range(start, min(start + INSERT_BATCH, customers))
+        ], ordered=False)
+
+
+def time_lookups(collection, customers, lookups, seed=13):
+    rnd = random.Random(seed)
+    latencies = []
+    for _ in range(lookups):
+        customer_id = str(100000 + rnd.randrange(customers))  # ids arrive from the URL as strings
+        start = time.perf_counter()
+        collection.find_one(customer_id_query(customer_id), {"_id": 1})
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {
+        "lookups": lookups,
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))], 3),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+    }
+
+
+def run(uri, db_name, customers, lookups, unindexed_lookups):
+    client = MongoClient(uri)
+    client.drop_database(db_name)
+    collection = client[db_name][DATA_MART_COLLECTION]
+
+    started = time.perf_counter()
+    load_customers(collection, customers)
+    print(f"Loaded {customers:,} customers in {time.perf_counter() - started:.1f}s")
+
+    results = {"customers": customers}
+    results["without_index"] = time_lookups(collection, customers, unindexed_lookups)
+    print(f"without index  {results['without_index']}")
+
+    for spec in INDEXES[DATA_MART_COLLECTION]:
+        collection.create_index(spec["keys"], **{k: v for k, v in spec.items() if k != "keys"})
+    results["with_index"] = time_lookups(collection, customers, lookups)
+    print(f"with index     {results['with_index']}")
+
+    client.drop_database(db_name)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--uri", default=MONGO_URI)
+    parser.add_argument("--db", default="customer_lookup_bench", help="scratch database, dropped before and after")
+    parser.add_argument("--customers", type=int, default=1000000)
+    parser.add_argument("--lookups", type=int, default=10000)
+    parser.add_argument("--unindexed-lookups", type=int, default=20, help="collection scans are slow; keep this small")
+    parser.add_argument("--out", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = run(args.uri, args.db, args.customers, args.lookups, args.unindexed_lookups)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
@@ -0,0 +1,110 @@
+"""Response encoding benchmark for a large /audits/errors page.
+
+Builds Error_Records documents shaped like the ones ingestion writes
+(ObjectId, the failing record, pydantic errors) and encodes them the way
+``stream_page`` does: with the previous ``json_util`` path and with the
+plain encoders (orjson when installed, and the standard library). Reports
+encode time, bytes on the wire uncompressed, gzipped and brotli-compressed.
+
+    python -m benchmarks.bench_encoding --rows 100000
+"""
+import argparse
+import gzip
+import json
+import random
+import time
+from bson import ObjectId, json_util
+
+from benchmarks.bench_validation import retail_record
+from response_encoding import _plain_orjson, _plain_stdlib, brotli, orjson
+
+
+def error_record(i, rnd):
+    record = retail_record(i, rnd)
+    record["rating"] = "excellent"
+    return {
+        "_id": ObjectId(),
+        "filename": "retail_transactions.csv",
+        "record": record,
+        "invalid_fields": ["rating"],
+        "errors": [{
+            "type": "int_parsing",
+            "loc": ["rating"],
+            "msg": "Input should be a valid integer, unable to parse string as an integer",
+            "input": "excellent",
+            "url": "https://errors.pydantic.dev/2.11/v/int_parsing",
+        }],
+    }
+
+
+def stream_body(docs, encode_doc, error_count):
+    """The envelope stream_page writes for /audits/errors, joined into one body."""
+    parts = [encode_doc({"error_count": error_count})[:-1] + b',"error_records":[']
+    for i, doc in enumerate(docs):
+        parts.append((b"," if i else b"") + encode_doc(doc))
+    parts.append(b'],"next_after":null}')
+    return b"".join(parts)
+
+
+def _json_util(doc) -> bytes:
+    # The previous path: extended JSON, with _id stringified by the route
+    if "_id" in doc:
+        doc = {**doc, "_id": str(doc["_id"])}
+    return json_util.dumps(doc).encode("utf-8")
+
+
+def measure(name, docs, encode_doc):
+    start = time.perf_counter()
+    body = stream_body(docs, encode_doc, len(docs))
+    seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    gzipped = gzip.compress(body, compresslevel=6)
+    gzip_seconds = time.perf_counter() - start
+    result = {
+        "encoder": name,
+        "rows": len(docs),
+        "encode_seconds": round(seconds, 3),
+        "rows_per_sec": round(len(docs) / seconds),
+        "bytes": len(body),
+        "gzip_bytes": len(gzipped),
+        "gzip_seconds": round(gzip_seconds, 3),
+    }
+    if brotli is not None:
+        start = time.perf_counter()
+        result["br_bytes"] = len(brotli.compress(body, quality=4))
+        result["br_seconds"] = round(time.perf_counter() - start, 3)
+    json.loads(body)  # every encoder must produce valid JSON
+    return result
+
+
+def run(rows, seed=9):
+    rnd = random.Random(seed)
+    docs = [error_record(i, rnd) for i in range(rows)]
+    encoders = [("json_util (before)", _json_util), ("plain stdlib", _plain_stdlib)]
+    if orjson is not None:
+        encoders.append(("plain orjson", _plain_orjson))
+
+    results = []
+    for name, encode_doc in encoders:
+        result = measure(name, docs, encode_doc)
+        results.append(result)
+        br = f"  br {result['br_bytes'] / 1024 / 1024:>6.1f} MB" if "br_bytes" in result else ""
+        print(f"{name:<20} {result['encode_seconds']:>7.3f}s  {result['rows_per_sec']:>9,} rows/s  "
+              f"{result['bytes'] / 1024 / 1024:>6.1f} MB  gzip {result['gzip_bytes'] / 1024 / 1024:>6.1f} MB{br}")
+    baseline = results[0]["encode_seconds"]
+    for result in results[1:]:
+        print(f"{result['encoder']}: {baseline / result['encode_seconds']:.1f}x faster than json_util")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--out", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = run(args.rows)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
@@ -0,0 +1,104 @@
+"""Streaming JSON parser benchmark.
+
+Writes a synthetic Customer_Master_Data.json array (and the same records as
+JSON Lines) and reads them with json.load, the raw_decode streamer, ijson
+when installed, and the NDJSON parser. Each mode runs in a fresh process
+and validates CustomerModel chunks as the upload pipeline does, so the
+reported peak RSS covers parsing plus validation.
+
+    python -m benchmarks.bench_json --rows 2000000
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.bench_validation import customer_record
+from benchmarks.bench_xml import peak_rss_mb
+from parsers.json_parser import JSONParser, ijson
+from parsers.ndjson_parser import NDJSONParser
+from validators.customers import CustomerModel
+from validators.validation_engine import validate_batch
+
+
+def write_files(directory, rows, seed=5):
+    rnd = random.Random(seed)
+    array_path = os.path.join(directory, "Customer_Master_Data.json")
+    lines_path = os.path.join(directory, "Customer_Master_Data.jsonl")
+    with open(array_path, "w", encoding="utf-8") as array, open(lines_path, "w", encoding="utf-8") as lines:
+        array.write("[\n")
+        for i in range(rows):
+            line = json.dumps(customer_record(i, rnd))
+            array.write(("  " if i == 0 else ",\n  ") + line)
+            lines.write(line + "\n")
+        array.write("\n]\n")
+    return array_path, lines_path
+
+
+def _loaded_chunks(path, chunk_size):
+    """The pre-streaming reader: json.load, then chunks sliced from the list."""
+    with open(path, "r", encoding="utf-8") as f:
+        records = json.load(f)
+    for i in range(0, len(records), chunk_size):
+        yield records[i:i + chunk_size]
+
+
+def measure(mode, path, chunk_size):
+    if mode == "json.load":
+        chunks = _loaded_chunks(path, chunk_size)
+    elif mode == "ndjson":
+        chunks = NDJSONParser().iter_chunks(path, chunk_size)
+    else:
+        chunks = JSONParser(use_ijson=mode == "ijson").iter_chunks(path, chunk_size)
+
+    start = time.perf_counter()
+    rows = errors = 0
+    for chunk in chunks:
+        errors += len(validate_batch(CustomerModel, chunk))
+        rows += len(chunk)
+    seconds = time.perf_counter() - start
+    return {
+        "mode": mode,
+        "rows": rows,
+        "invalid_rows": errors,
+        "seconds": round(seconds, 2),
+        "rows_per_sec": round(rows / seconds),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run(rows, chunk_size):
+    with tempfile.TemporaryDirectory() as tmp:
+        array_path, lines_path = write_files(tmp, rows)
+        modes = [("json.load", array_path), ("raw_decode stream", array_path)]
+        if ijson is not None:
+            modes.append(("ijson", array_path))
+        modes.append(("ndjson", lines_path))
+
+        results = []
+        context = multiprocessing.get_context("spawn")
+        for mode, path in modes:
+            # A fresh process per mode, so each peak RSS is its own
+            with context.Pool(1) as pool:
+                result = pool.apply(measure, (mode, path, chunk_size))
+            result["file_mb"] = round(os.path.getsize(path) / 1024 / 1024, 1)
+            results.append(result)
+            print(f"{mode:<18} {result['seconds']:>8.2f}s  {result['rows_per_sec']:>9,} rows/s  "
+                  f"peak {result['peak_rss_mb']:>8.1f} MB  (file {result['file_mb']} MB)")
+        return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000000)
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--out", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.chunk_size)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
@@ -0,0 +1,124 @@
+"""Record normalization benchmark.
+
+Normalizes chunks of retail rows whose headers are capitalized the way
+spreadsheet exports write them (``Transaction_ID``), three ways: the
+previous ``keys_to_lower`` + ``remove_inner_ids`` + ``pop("_id")`` passes,
+the single-pass ``normalize_records``, and ``normalize_batch`` renaming the
+chunk's DataFrame columns. Also times ``normalize_batch`` on a chunk whose
+headers are already normalized, where records pass through untouched.
+Reports time and the peak memory allocated while normalizing (tracemalloc).
+
+    python -m benchmarks.bench_normalize --rows 200000
+"""
+import argparse
+import json
+import random
+import time
+import tracemalloc
+
+import pandas as pd
+
+from benchmarks.bench_validation import retail_record
+from normalize import normalize_batch, normalize_records
+from validators.retail_transactions import CustomerRetailModel
+
+
+def keys_to_lower(obj):
+    """The previous first pass, as it was in main.py"""
+    if isinstance(obj, dict):
+        return {str(k).lower(): keys_to_lower(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [keys_to_lower(i) for i in obj]
+    else:
+        return obj
+
+
+def remove_inner_ids(data):
+    """The previous second pass, as it was in main.py"""
+    if isinstance(data, dict):
+        data.pop("_id", None)
+        for k, v in data.items():
+            data[k] = remove_inner_ids(v)
+    elif isinstance(data, list):
+        data = [remove_inner_ids(item) for item in data]
+    return data
+
+
+def before(records, frame):
+    records = [keys_to_lower(record) for record in records]
+    records = [remove_inner_ids(record) for record in records]
+    for record in records:
+        record.pop("_id", None)
+    return records
+
+
+def chunks(rows, chunk_size, capitalize, seed=5):
+    rnd = random.Random(seed)
+    result = []
+    for start in range(0, rows, chunk_size):
+        records = [retail_record(i, rnd) for i in range(start, min(start + chunk_size, rows))]
+        if capitalize:
+            records = [{key.title(): value for key, value in record.items()} for record in records]
+        frame = pd.DataFrame(records)
+        result.append((frame.to_dict(orient="records"), frame))
+    return result
+
+
+def measure(name, normalize, data):
+    rows = sum(len(records) for records, _ in data)
+    best = None
+    for _ in range(3):
+        start = time.perf_counter()
+        for records, frame in data:
+            normalize(records, frame)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    # Ingestion holds one chunk at a time, so the peak of one chunk is what counts
+    tracemalloc.start()
+    records, frame = data[0]
+    normalize(records, frame)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "method": name,
+        "rows": rows,
+        "seconds": round(best, 4),
+        "rows_per_sec": round(rows / best),
+        "chunk_peak_mb": round(peak / 1024 / 1024, 2),
+    }
+
+
+def run(rows, chunk_size):
+    capitalized = chunks(rows, chunk_size, capitalize=True)
+    normalized = chunks(rows, chunk_size, capitalize=False)
+    methods = [
+        ("keys_to_lower + remove_inner_ids", before, capitalized),
+        ("normalize_records", lambda records, frame: normalize_records(records, CustomerRetailModel), capitalized),
+        ("normalize_batch (renamed)", lambda records, frame: normalize_batch(records, frame, CustomerRetailModel), capitalized),
+        ("normalize_batch (already clean)", lambda records, frame: normalize_batch(records, frame, CustomerRetailModel), normalized),
+    ]
+    results = []
+    for name, normalize, data in methods:
+        result = measure(name, normalize, data)
+        results.append(result)
+        print(f"{name:<34} {result['seconds']:>7.3f}s  {result['rows_per_sec']:>10,} rows/s  "
+              f"chunk peak {result['chunk_peak_mb']:>7.2f} MB")
+    baseline = results[0]
+    for result in results[1:3]:  # the clean chunk passes through and does not compare meaningfully
+        print(f"{result['method']}: {baseline['seconds'] / result['seconds']:.1f}x faster, "
+              f"{baseline['chunk_peak_mb'] / max(result['chunk_peak_mb'], 0.01):.1f}x less memory per chunk")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--out", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.chunk_size)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
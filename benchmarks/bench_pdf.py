@@ -0,0 +1,96 @@
+"""PDF extraction benchmark.
+
+Renders a synthetic scanned trade statement (image-only pages, so every
+page goes through OCR) and times serial extraction, parallel extraction
+with a cold OCR cache, and re-ingesting the same file with a warm cache.
+
+    python -m benchmarks.bench_pdf --pages 24 --workers 8
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from PIL import Image, ImageDraw, ImageFont
+
+from parsers.ocr_cache import OCRCache
+from parsers.pdf_parser import PDFParser
+
+LINES_PER_PAGE = 30
+
+
+def trade_line(i, rnd):
+    quantity = rnd.randint(1, 500)
+    price = round(rnd.uniform(10, 2000), 2)
+    value = round(quantity * price, 2)
+    fee = round(value * 0.001, 2)
+    return (
+        f"{100000 + i}  {rnd.randint(1, 12)}/{rnd.randint(1, 28)}/2024  Equity  INFY  BUY  "
+        f"{quantity}  {price}  {rnd.randint(10000, 99999)}  {value}  {fee}  {round(value - fee, 2)}  "
+        f"{round(rnd.uniform(-500, 500), 2)}  {rnd.randint(1, 12)}/{rnd.randint(1, 28)}/2024  Low"
+    )
+
+
+def write_pdf(path, pages, seed=7):
+    """Write ``pages`` A4 pages of rendered trade lines as an image-only PDF."""
+    rnd = random.Random(seed)
+    try:
+        font = ImageFont.load_default(size=22)
+    except TypeError:  # Pillow < 10.1
+        font = ImageFont.load_default()
+    images = []
+    for page in range(pages):
+        image = Image.new("L", (2480, 3508), color=255)  # A4 at 300 DPI
+        draw = ImageDraw.Draw(image)
+        for line in range(LINES_PER_PAGE):
+            draw.text((80, 120 + line * 100), trade_line(page * LINES_PER_PAGE + line, rnd), fill=0, font=font)
+        images.append(image)
+    images[0].save(path, save_all=True, append_images=images[1:], resolution=300)
+
+
+def timed(parser, path):
+    start = time.perf_counter()
+    rows = parser.parse(path)
+    return len(rows), time.perf_counter() - start
+
+
+def run(pages, workers):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "statement.pdf")
+        write_pdf(path, pages)
+        cache = OCRCache(directory=os.path.join(tmp, "ocr_cache"))
+
+        results = []
+        for label, parser in [
+            ("serial, no cache", PDFParser(workers=1, cache=OCRCache(max_bytes=0))),
+            (f"{workers} workers, cold cache", PDFParser(workers=workers, cache=cache)),
+            (f"{workers} workers, warm cache", PDFParser(workers=workers, cache=cache)),
+        ]:
+            rows, seconds = timed(parser, path)
+            results.append({
+                "run": label,
+                "pages": pages,
+                "rows": rows,
+                "seconds": round(seconds, 3),
+                "pages_per_sec": round(pages / seconds, 2),
+                "speedup": round(results[0]["seconds"] / seconds, 2) if results else 1.0,
+                "cache_hits": parser.cache.hits,
+            })
+            print(f"{label:<28} {seconds:>8.2f}s  {pages / seconds:>7.2f} pages/s  "
+                  f"x{results[-1]['speedup']}")
+        return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=24)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--out", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = run(args.pages, args.workers)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
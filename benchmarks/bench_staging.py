@@ -0,0 +1,98 @@
+"""Parquet staging benchmark: reload from staging vs re-parsing the .xlsx.
+
+Writes a synthetic retail_transactions.xlsx, stages it once, then times a
+full reload through each path the way ingestion reads it (records plus the
+DataFrame used for pre-validation), each in a fresh process so peak RSS is
+its own. Also times a column-pruned analytics read of the staged file.
+
+    python -m benchmarks.bench_staging --rows 200000
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+from openpyxl import Workbook
+
+from benchmarks.bench_validation import retail_record
+from benchmarks.bench_xml import peak_rss_mb
+from parsers.excel_parser import ExcelParser
+from parsers.parquet_parser import ParquetParser
+from staging import stage_file
+from validators.retail_transactions import CustomerRetailModel
+
+
+def write_workbook(path, rows, seed=11):
+    rnd = random.Random(seed)
+    wb = Workbook(write_only=True)
+    sheet = wb.create_sheet()
+    header = list(retail_record(0, rnd))
+    sheet.append(header)
+    for i in range(rows):
+        record = retail_record(i, rnd)
+        if i % 500 == 0:
+            record["rating"] = "excellent"  # some invalid cells, as real exports have
+        sheet.append([record[h] for h in header])
+    wb.save(path)
+
+
+def measure(mode, path, chunk_size, columns=None):
+    parser = ExcelParser() if mode == "xlsx re-parse" else ParquetParser(columns=columns)
+    start = time.perf_counter()
+    rows = 0
+    for records, frame in parser.iter_batches(path, chunk_size):
+        rows += len(records)
+    seconds = time.perf_counter() - start
+    return {
+        "mode": mode,
+        "rows": rows,
+        "seconds": round(seconds, 2),
+        "rows_per_sec": round(rows / seconds),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run(rows, chunk_size):
+    with tempfile.TemporaryDirectory() as tmp:
+        xlsx = os.path.join(tmp, "retail_transactions.xlsx")
+        staged = os.path.join(tmp, "retail_transactions.parquet")
+        write_workbook(xlsx, rows)
+
+        start = time.perf_counter()
+        stats = stage_file(ExcelParser(), xlsx, staged, CustomerRetailModel, chunk_size)
+        print(f"staging (once)     {time.perf_counter() - start:>8.2f}s  {stats['rows']:,} rows, "
+              f"{stats['overflow_rows']:,} with overflow cells")
+        print(f"file size          xlsx {os.path.getsize(xlsx) / 1024 / 1024:.1f} MB, "
+              f"parquet {os.path.getsize(staged) / 1024 / 1024:.1f} MB")
+
+        modes = [
+            ("xlsx re-parse", xlsx, None),
+            ("staged reload", staged, None),
+            ("staged 2 columns", staged, ["customer_id", "total_amount"]),
+        ]
+        results = []
+        context = multiprocessing.get_context("spawn")
+        for mode, path, columns in modes:
+            with context.Pool(1) as pool:
+                result = pool.apply(measure, (mode, path, chunk_size, columns))
+            results.append(result)
+            print(f"{mode:<18} {result['seconds']:>8.2f}s  {result['rows_per_sec']:>9,} rows/s  "
+                  f"peak {result['peak_rss_mb']:>8.1f} MB")
+        print(f"staged reload is {results[0]['seconds'] / results[1]['seconds']:.1f}x faster than re-parsing")
+        return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--out", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.chunk_size)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
@@ -0,0 +1,111 @@
+"""Trade OCR line extraction micro-benchmark.
+
+Compares the old per-line extraction (pattern rebuilt per line, re.match,
+re.split fallback) with parsers.trade_ocr on synthetic OCR text carrying
+the artifacts seen in validation_report.json.
+
+    python -m benchmarks.bench_trade_ocr --lines 100000
+"""
+import argparse
+import json
+import random
+import re
+import time
+
+from parsers.trade_ocr import TRADE_HEADERS, extract_trade_rows
+
+# Artifacts observed in OCR'd trade statements
+ARTIFACTS = [
+    lambda v: "{" + v,
+    lambda v: v + "}",
+    lambda v: v + ".",
+    lambda v: v + ",",
+    lambda v: v + "/",
+    lambda v: v.replace("-", "—"),
+    lambda v: v.replace("-", "~"),
+]
+
+
+def ocr_line(i, rnd, artifact_rate):
+    quantity = rnd.randint(1, 500)
+    price = round(rnd.uniform(10, 2000), 2)
+    value = round(quantity * price, 2)
+    fee = round(value * 0.001, 2)
+    values = [
+        str(1000 + i), f"{rnd.randint(1, 12)}/{rnd.randint(1, 28)}/2021", rnd.choice(["Equity", "FX", "Crypto"]),
+        rnd.choice(["AAPL", "GOOG", "ETHUSD"]), rnd.choice(["Buy", "Sell"]), str(quantity), str(price),
+        str(rnd.randint(410000, 420000)), str(value), str(fee), str(round(value - fee, 2)),
+        str(round(rnd.uniform(-5000, 5000), 2)), f"{rnd.randint(1, 12)}/{rnd.randint(1, 28)}/2021",
+        rnd.choice(["Low", "Medium", "High"]),
+    ]
+    if rnd.random() < artifact_rate:
+        column = rnd.choice([0, 4, 6, 7, 9, 10, 11])
+        values[column] = rnd.choice(ARTIFACTS)(values[column])
+    return " ".join(values)
+
+
+def legacy_extract(text):
+    """The extraction loop PDFParser used before parsers.trade_ocr."""
+    parsed_data = []
+    text = re.sub(r"[\]\|\)]", " ", text)
+    lines = [line.strip() for line in text.split("\n") if line.strip()]
+    for line in lines:
+        pattern = r"(\d+)\s+(\d{1,2}/\d{1,2}/\d{4})\s+(\w+)\s+(\w+)\s+(\w+)\s+([\d,]+)\s+([\d.]+)\s+(\d+)\s+([\d.]+)\s+([\d.]+)\s+(-?[\d.]+)\s+(\d{1,2}/\d{1,2}/\d{4})\s+(\w+)"
+        match = re.match(pattern, line.replace(",", ""))
+        if match:
+            # The old pattern has 13 groups for 14 headers; stop at the last group
+            record = {TRADE_HEADERS[i]: match.group(i + 1) for i in range(len(match.groups()))}
+            parsed_data.append(record)
+        else:
+            values = re.split(r"\s+", line)
+            record = {TRADE_HEADERS[i]: values[i] if i < len(values) else None for i in range(len(TRADE_HEADERS))}
+            parsed_data.append(record)
+    return parsed_data
+
+
+def dirty_fields(rows):
+    """Numeric fields still carrying OCR artifacts after extraction."""
+    dirty = re.compile(r"[{}]|[.,/]$|^[—~]")
+    return sum(
+        1 for row in rows for header in ("TradeID", "Price", "CustomerID", "Fee", "NetValue", "PnL")
+        if row.get(header) and dirty.search(row[header])
+    )
+
+
+def run(lines, artifact_rate, pages):
+    rnd = random.Random(11)
+    text_lines = [ocr_line(i, rnd, artifact_rate) for i in range(lines)]
+    per_page = max(1, lines // pages)
+    page_texts = ["\n".join(text_lines[i:i + per_page]) for i in range(0, lines, per_page)]
+
+    results = []
+    for label, extract in [("legacy per-line", legacy_extract), ("trade_ocr finditer", extract_trade_rows)]:
+        start = time.perf_counter()
+        rows = [row for text in page_texts for row in extract(text)]
+        seconds = time.perf_counter() - start
+        results.append({
+            "extractor": label,
+            "lines": lines,
+            "rows": len(rows),
+            "seconds": round(seconds, 3),
+            "lines_per_sec": round(lines / seconds),
+            "dirty_fields": dirty_fields(rows),
+        })
+        print(f"{label:<20} {seconds:>7.3f}s  {lines / seconds:>10,.0f} lines/s  "
+              f"{results[-1]['dirty_fields']} fields with artifacts")
+    print(f"speedup x{results[0]['seconds'] / results[1]['seconds']:.2f}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=100000)
+    parser.add_argument("--artifact-rate", type=float, default=0.05)
+    parser.add_argument("--pages", type=int, default=2000, help="split the lines over this many page texts")
+    parser.add_argument("--out", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = run(args.lines, args.artifact_rate, args.pages)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
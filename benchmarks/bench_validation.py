@@ -0,0 +1,129 @@
+"""Validation engine scaling benchmark.
+
+Validates synthetic records for each model with 1, 2, 4 ... N worker
+processes and reports records/sec and the speedup over a single worker.
+
+    python -m benchmarks.bench_validation --rows 200000
+"""
+import argparse
+import json
+import os
+import random
+import time
+
+from validators.credit_card_transactions import CustomerCreditCardModel
+from validators.customers import CustomerModel
+from validators.retail_transactions import CustomerRetailModel
+from validators.trade_transactions import CustomerTradeModel
+from validators.upi_transactions import CustomerUPIModel
+from validators.validation_engine import ValidationEngine
+
+
+def retail_record(i, rnd):
+    return {
+        "transaction_id": 100000 + i, "customer_id": rnd.randint(10000, 99999),
+        "date": f"{rnd.randint(1, 12)}/{rnd.randint(1, 28)}/2023", "year": 2023, "month": "March",
+        "time": f"{rnd.randint(0, 23)}:{rnd.randint(10, 59)}:{rnd.randint(10, 59)}",
+        "total_purchases": rnd.randint(1, 10), "amount": round(rnd.uniform(5, 500), 2),
+        "total_amount": round(rnd.uniform(5, 5000), 2), "product_category": "Electronics",
+        "product_brand": "Sony", "product_type": "Headphones", "feedback": "Good",
+        "shipping_method": "Standard", "payment_method": "Card", "order_status": "Delivered",
+        "rating": rnd.randint(1, 5), "products": "Headphones",
+    }
+
+
+def upi_record(i, rnd):
+    return {
+        "transaction id": f"TXN{i:010d}", "customer id": rnd.randint(10000, 99999),
+        "timestamp": f"2024-0{rnd.randint(1, 9)}-{rnd.randint(10, 28)} 10:{rnd.randint(10, 59)}:00",
+        "transaction type": "P2M", "merchant_category": "Grocery", "transaction_status": "SUCCESS",
+        "sender_age_group": "26-35", "receiver_age_group": "36-45", "sender_state": "Delhi",
+        "sender_bank": "SBI", "receiver_bank": "HDFC", "device_type": "Android", "network_type": "4G",
+        "fraud_flag": 0, "hour_of_day": 10, "day_of_week": "Monday", "is_weekend": 0,
+    }
+
+
+def trade_record(i, rnd):
+    return {
+        "tradeid": str(1000 + i), "tradedate": "1/15/2021", "instrument": "Equity", "symbol": "AAPL",
+        "tradetype": rnd.choice(["Buy", "Sell"]), "quantity": str(rnd.randint(1, 500)),
+        "price": f"{rnd.uniform(10, 900):.2f}", "customerid": str(rnd.randint(100000, 999999)),
+        "tradevalue": f"{rnd.uniform(100, 90000):.2f}", "fee": f"{rnd.uniform(1, 200):.2f}",
+        "netvalue": f"{rnd.uniform(100, 90000):.2f}", "pnl": f"{rnd.uniform(-5000, 5000):.2f}",
+        "settlementdate": "1/17/2021", "riskcategory": "Medium",
+    }
+
+
+def credit_record(i, rnd):
+    record = {"recordid": i, "cust_id": rnd.randint(10000, 99999)}
+    for field in CustomerCreditCardModel.model_fields:
+        record.setdefault(field, round(rnd.uniform(0, 10000), 6))
+    return record
+
+
+def customer_record(i, rnd):
+    return {
+        "customer_id": 10000 + i, "name": f"Customer {i}", "email": f"customer{i}@example.com",
+        "phone": "9876543210", "address": "1 Main St", "city": "Pune", "state": "MH",
+        "zipcode": 411001, "country": "India", "age": rnd.randint(18, 80), "gender": "F",
+        "income": "Medium", "customer_segment": "Retail",
+    }
+
+
+GENERATORS = {
+    CustomerRetailModel: retail_record,
+    CustomerUPIModel: upi_record,
+    CustomerTradeModel: trade_record,
+    CustomerCreditCardModel: credit_record,
+    CustomerModel: customer_record,
+}
+
+
+def worker_counts(max_workers):
+    counts, n = [], 1
+    while n < max_workers:
+        counts.append(n)
+        n *= 2
+    return counts + [max_workers]
+
+
+def run(rows, max_workers):
+    rnd = random.Random(42)
+    report = []
+    for model_cls, generator in GENERATORS.items():
+        records = [generator(i, rnd) for i in range(rows)]
+        baseline = None
+        for workers in worker_counts(max_workers):
+            engine = ValidationEngine(workers=workers)
+            engine.validate(model_cls, records[:workers * 100])  # warm up the pool
+            start = time.perf_counter()
+            valid, failures = engine.validate(model_cls, records)
+            elapsed = time.perf_counter() - start
+            engine.shutdown()
+            baseline = baseline or elapsed
+            result = {
+                "model": model_cls.__name__,
+                "workers": workers,
+                "rows": rows,
+                "valid": len(valid),
+                "errors": len(failures),
+                "seconds": round(elapsed, 3),
+                "rows_per_sec": round(rows / elapsed),
+                "speedup": round(baseline / elapsed, 2),
+            }
+            print(f"{result['model']:<26} workers={workers:<3} {result['rows_per_sec']:>10} rows/s  x{result['speedup']}")
+            report.append(result)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--out", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.workers)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
@@ -0,0 +1,120 @@
+"""Streaming XML parser memory benchmark.
+
+Writes a synthetic credit card export shaped like
+Customet_credit_card_transactions.xml and reads it three ways, each in a
+fresh process so peak memory is measured separately: the old ``ET.parse``
+tree, streaming ``iterparse`` with the stdlib, and with lxml when installed.
+Records are fed through CustomerCreditCardModel validation in chunks, the
+way the upload pipeline consumes them.
+
+    python -m benchmarks.bench_xml --size-mb 2048
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+
+from benchmarks.bench_validation import credit_record
+from parsers.xml_parser import XMLParser, lxml_etree
+from validators.credit_card_transactions import CustomerCreditCardModel
+from validators.validation_engine import validate_batch
+
+
+def write_export(path, size_mb, seed=3):
+    """Write records until the file reaches ``size_mb``; returns the record count."""
+    rnd = random.Random(seed)
+    target = size_mb * 1024 * 1024
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="utf-8"?>\n<Customer_Credit_Card_Transactions>\n')
+        while f.tell() < target:
+            lines = []
+            for _ in range(1000):
+                record = credit_record(count, rnd)
+                fields = "".join(f"<{key.upper()}>{value}</{key.upper()}>" for key, value in record.items())
+                lines.append(f"  <Transaction>{fields}</Transaction>\n")
+                count += 1
+            f.write("".join(lines))
+        f.write("</Customer_Credit_Card_Transactions>\n")
+    return count
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB, where the platform reports it."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / 1024 / (1024 if sys.platform == "darwin" else 1), 1)
+    except ImportError:
+        import psutil
+        return round(psutil.Process().memory_info().peak_wset / 1024 / 1024, 1)
+
+
+def _tree_chunks(path, chunk_size):
+    """The pre-streaming reader: the whole tree, then records sliced out of it."""
+    records = [{elem.tag: elem.text for elem in child} for child in ET.parse(path).getroot()]
+    for i in range(0, len(records), chunk_size):
+        yield records[i:i + chunk_size]
+
+
+def measure(mode, path, chunk_size):
+    if mode == "ET.parse":
+        chunks = _tree_chunks(path, chunk_size)
+    else:
+        chunks = XMLParser(use_lxml=mode == "lxml iterparse").iter_chunks(path, chunk_size)
+
+    start = time.perf_counter()
+    rows = errors = 0
+    for chunk in chunks:
+        records = [{key.lower(): value for key, value in record.items()} for record in chunk]
+        errors += len(validate_batch(CustomerCreditCardModel, records))
+        rows += len(records)
+    seconds = time.perf_counter() - start
+    return {
+        "mode": mode,
+        "rows": rows,
+        "invalid_rows": errors,
+        "seconds": round(seconds, 2),
+        "rows_per_sec": round(rows / seconds),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run(size_mb, chunk_size, path=None):
+    modes = ["ET.parse", "ET iterparse"] + (["lxml iterparse"] if lxml_etree is not None else [])
+    with tempfile.TemporaryDirectory() as tmp:
+        if path is None:
+            path = os.path.join(tmp, "Customer_credit_card_transactions.xml")
+            write_export(path, size_mb)
+        file_mb = round(os.path.getsize(path) / 1024 / 1024, 1)
+
+        results = []
+        context = multiprocessing.get_context("spawn")
+        for mode in modes:
+            # A fresh process per mode, so each peak RSS is its own
+            with context.Pool(1) as pool:
+                result = pool.apply(measure, (mode, path, chunk_size))
+            result["file_mb"] = file_mb
+            results.append(result)
+            print(f"{mode:<16} {result['seconds']:>8.2f}s  {result['rows_per_sec']:>9,} rows/s  "
+                  f"peak {result['peak_rss_mb']:>8.1f} MB  (file {file_mb} MB)")
+        return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=2048, help="size of the generated export")
+    parser.add_argument("--file", help="measure an existing export instead of generating one")
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--out", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = run(args.size_mb, args.chunk_size, args.file)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
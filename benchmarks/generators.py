@@ -0,0 +1,300 @@
+"""Deterministic synthetic uploads for the five source shapes.
+
+Each writer streams ``rows`` records to disk, so row counts in the millions
+only cost disk space, and the same seed always produces the same file:
+
+- retail transactions as CSV
+- UPI transactions as XLSX
+- credit card transactions as XML, shaped like the bank export
+- customer master data as a JSON array
+- trade statements as a PDF with ruled digital tables (the pdfplumber
+  ``extract_tables`` path, no OCR)
+
+A fraction of the records carry the artifacts OCR left in the trade
+statement behind ``validation_report.json``: a trailing ``.`` on a float, a
+trailing ``,`` or ``}`` on an integer, and a row shifted one column so a
+value lands in the wrong field. ``artifact_rates`` derives the rate of each
+from the report, so the synthetic files fail validation about as often as
+the real one did.
+"""
+import csv
+import json
+import os
+import random
+
+import pyarrow as pa
+from openpyxl import Workbook
+
+from benchmarks.bench_validation import credit_record, customer_record, retail_record, trade_record, upi_record
+from staging import model_types
+from validators.credit_card_transactions import CustomerCreditCardModel
+from validators.customers import CustomerModel
+from validators.retail_transactions import CustomerRetailModel
+from validators.trade_transactions import CustomerTradeModel
+from validators.upi_transactions import CustomerUPIModel
+
+REPORT_PATH = "validation_report.json"
+ARTIFACTS = ["trailing_dot", "trailing_comma", "brace", "column_shift"]
+# Rates measured from validation_report.json (customer_trade_data_V3_image.pdf, 12 of 295 rows)
+DEFAULT_RATES = {"trailing_dot": 2 / 295, "trailing_comma": 4 / 295, "brace": 2 / 295, "column_shift": 4 / 295}
+SHIFT_FILLERS = ["/", "_", "{", "|"]
+
+TRADE_HEADERS = [
+    "TradeID", "TradeDate", "Instrument", "Symbol", "TradeType", "Quantity", "Price", "CustomerID",
+    "TradeValue", "Fee", "NetValue", "PnL", "SettlementDate", "RiskCategory",
+]
+
+
+def _artifact(error: dict) -> str:
+    value = str(error.get("input"))
+    if value.endswith("."):
+        return "trailing_dot"
+    if value.endswith(","):
+        return "trailing_comma"
+    if value.endswith("}"):
+        return "brace"
+    try:
+        float(value)
+        return "column_shift"  # a well-formed number in the wrong column
+    except ValueError:
+        return "other"
+
+
+def artifact_rates(report_path: str = REPORT_PATH) -> dict:
+    """Share of all rows carrying each artifact, classified from the first error of each failed row."""
+    if not os.path.exists(report_path):
+        return dict(DEFAULT_RATES)
+    with open(report_path, encoding="utf-8") as f:
+        report = json.load(f)
+    counts = dict.fromkeys(ARTIFACTS, 0)
+    rows = 0
+    for entry in report:
+        rows += entry.get("success", 0) + entry.get("errors", 0)
+        for detail in entry.get("error_details", []):
+            kind = _artifact(detail["errors"][0]) if detail.get("errors") else "other"
+            if kind in counts:
+                counts[kind] += 1
+    return {kind: count / rows for kind, count in counts.items()} if rows else dict(DEFAULT_RATES)
+
+
+class ArtifactInjector:
+    """Corrupts a seeded fraction of records, at most one artifact per record."""
+
+    def __init__(self, model_cls, rates: dict, seed: int):
+        types_by_key = model_types(model_cls)
+        self.int_keys = {key for key, arrow_type in types_by_key.items() if arrow_type == pa.int64()}
+        self.float_keys = {key for key, arrow_type in types_by_key.items() if arrow_type == pa.float64()}
+        self.rates = rates
+        self.rnd = random.Random(seed)
+        self.counts = dict.fromkeys(rates, 0)
+
+    def _kind(self):
+        roll = self.rnd.random()
+        for kind, rate in self.rates.items():
+            if roll < rate:
+                return kind
+            roll -= rate
+        return None
+
+    def __call__(self, record: dict) -> dict:
+        kind = self._kind()
+        if kind is None:
+            return record
+        keys = list(record)
+        ints = [key for key in keys if key.lower() in self.int_keys]
+        floats = [key for key in keys if key.lower() in self.float_keys]
+        applied = True
+        if kind == "trailing_dot" and floats:
+            key = self.rnd.choice(floats)
+            record[key] = f"{record[key]}."
+        elif kind in ("trailing_comma", "brace") and ints:
+            key = self.rnd.choice(ints)
+            record[key] = f"{record[key]}{',' if kind == 'trailing_comma' else '}'}"
+        elif kind == "column_shift":
+            applied = self._shift(record, keys)
+        else:
+            applied = False
+        if applied:
+            self.counts[kind] += 1
+        return record
+
+    def _shift(self, record: dict, keys: list) -> bool:
+        """Shift values one column so an integer field receives its neighbour's value, as a misread row does."""
+        values = [record[key] for key in keys]
+        right = [i for i in range(1, len(keys)) if keys[i].lower() in self.int_keys
+                 and keys[i - 1].lower() not in self.int_keys]
+        if right:
+            target = self.rnd.choice(right)
+            start = self.rnd.randint(0, target - 1)
+            values = values[:start] + [self.rnd.choice(SHIFT_FILLERS)] + values[start:-1]
+        else:
+            left = [i for i in range(len(keys) - 1) if keys[i].lower() in self.int_keys
+                    and keys[i + 1].lower() not in self.int_keys]
+            if not left:
+                return False
+            target = self.rnd.choice(left)
+            values = values[:target] + values[target + 1:] + [self.rnd.choice(SHIFT_FILLERS)]
+        record.update(zip(keys, values))
+        return True
+
+
+def _records(builder, inject: ArtifactInjector, rows: int, seed: int):
+    rnd = random.Random(seed)
+    for i in range(rows):
+        yield inject(builder(i, rnd))
+
+
+def _injector(model_cls, rates: dict, seed: int) -> ArtifactInjector:
+    return ArtifactInjector(model_cls, rates if rates is not None else artifact_rates(), seed + 1)
+
+
+def write_retail_csv(path: str, rows: int, seed: int = 1, rates: dict = None):
+    inject = _injector(CustomerRetailModel, rates, seed)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = None
+        for record in _records(retail_record, inject, rows, seed):
+            if writer is None:
+                writer = csv.DictWriter(f, fieldnames=list(record))
+                writer.writeheader()
+            writer.writerow(record)
+    return inject.counts
+
+
+def write_upi_xlsx(path: str, rows: int, seed: int = 2, rates: dict = None):
+    inject = _injector(CustomerUPIModel, rates, seed)
+    wb = Workbook(write_only=True)  # rows are streamed to the file, not held as cells
+    sheet = wb.create_sheet()
+    header = None
+    for record in _records(upi_record, inject, rows, seed):
+        if header is None:
+            header = list(record)
+            sheet.append(header)
+        sheet.append([record[key] for key in header])
+    wb.save(path)
+    return inject.counts
+
+
+def write_credit_xml(path: str, rows: int, seed: int = 3, rates: dict = None):
+    inject = _injector(CustomerCreditCardModel, rates, seed)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="utf-8"?>\n<Customer_Credit_Card_Transactions>\n')
+        lines = []
+        for record in _records(credit_record, inject, rows, seed):
+            fields = "".join(f"<{key.upper()}>{value}</{key.upper()}>" for key, value in record.items())
+            lines.append(f"  <Transaction>{fields}</Transaction>\n")
+            if len(lines) == 1000:
+                f.write("".join(lines))
+                lines = []
+        f.write("".join(lines))
+        f.write("</Customer_Credit_Card_Transactions>\n")
+    return inject.counts
+
+
+def write_customer_json(path: str, rows: int, seed: int = 4, rates: dict = None):
+    inject = _injector(CustomerModel, rates, seed)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[\n")
+        for i, record in enumerate(_records(customer_record, inject, rows, seed)):
+            f.write((",\n" if i else "") + json.dumps(record))
+        f.write("\n]\n")
+    return inject.counts
+
+
+# Landscape A4 in points, and the ruled table laid out on it
+PAGE_WIDTH, PAGE_HEIGHT = 842, 595
+MARGIN = 20
+ROW_HEIGHT = 12
+FONT_SIZE = 6.5
+ROWS_PER_PAGE = (PAGE_HEIGHT - 2 * MARGIN) // ROW_HEIGHT - 1  # one row is the header
+
+
+def _pdf_text(value) -> str:
+    text = "" if value is None else str(value)
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _table_page(rows: list) -> bytes:
+    """Content stream for one page: a header row plus ``rows``, each cell ruled on all sides."""
+    column_width = (PAGE_WIDTH - 2 * MARGIN) / len(TRADE_HEADERS)
+    top = PAGE_HEIGHT - MARGIN
+    lines = len(rows) + 1
+    bottom = top - lines * ROW_HEIGHT
+    ops = ["0.5 w"]
+    for line in range(lines + 1):
+        y = top - line * ROW_HEIGHT
+        ops.append(f"{MARGIN} {y} m {PAGE_WIDTH - MARGIN} {y} l S")
+    for column in range(len(TRADE_HEADERS) + 1):
+        x = MARGIN + column * column_width
+        ops.append(f"{x:.2f} {top} m {x:.2f} {bottom} l S")
+    ops.append(f"BT /F1 {FONT_SIZE} Tf")
+    for line, cells in enumerate([TRADE_HEADERS] + rows):
+        y = top - (line + 1) * ROW_HEIGHT + 3.5
+        for column, cell in enumerate(cells):
+            x = MARGIN + column * column_width + 2
+            ops.append(f"1 0 0 1 {x:.2f} {y:.2f} Tm ({_pdf_text(cell)}) Tj")
+    ops.append("ET")
+    return "\n".join(ops).encode("latin-1", "replace")
+
+
+def write_trade_pdf(path: str, rows: int, seed: int = 5, rates: dict = None):
+    """A digital trade statement: Helvetica text in ruled tables, a header row on every page."""
+    inject = _injector(CustomerTradeModel, rates, seed)
+    offsets = {}
+    page_ids = []
+    next_id = 4  # 1 catalog, 2 page tree (written last, once the pages are known), 3 font
+
+    with open(path, "wb") as f:
+        def write_object(number: int, body: bytes):
+            offsets[number] = f.tell()
+            f.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+
+        f.write(b"%PDF-1.4\n")
+        write_object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        write_object(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+
+        def write_page(page_rows):
+            nonlocal next_id
+            content = _table_page(page_rows)
+            write_object(next_id, b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+            write_object(next_id + 1, (
+                "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Contents %d 0 R "
+                "/Resources << /Font << /F1 3 0 R >> >> >>" % (PAGE_WIDTH, PAGE_HEIGHT, next_id)
+            ).encode())
+            page_ids.append(next_id + 1)
+            next_id += 2
+
+        page_rows = []
+        for record in _records(trade_record, inject, rows, seed):
+            page_rows.append(list(record.values()))
+            if len(page_rows) == ROWS_PER_PAGE:
+                write_page(page_rows)
+                page_rows = []
+        if page_rows or not page_ids:
+            write_page(page_rows)
+
+        kids = " ".join(f"{number} 0 R" for number in page_ids)
+        write_object(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode())
+
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % next_id)
+        for number in range(1, next_id):
+            f.write(b"%010d 00000 n \n" % offsets[number])
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (next_id, xref))
+    return inject.counts
+
+
+# source name -> (file name, writer, validator model); the file names carry the keywords main.py routes on
+SOURCES = {
+    "retail": ("retail_transactions.csv", write_retail_csv, CustomerRetailModel),
+    "upi": ("upi_transactions.xlsx", write_upi_xlsx, CustomerUPIModel),
+    "credit": ("credit_card_transactions.xml", write_credit_xml, CustomerCreditCardModel),
+    "customer": ("customer_master_data.json", write_customer_json, CustomerModel),
+    "trade": ("trade_statement.pdf", write_trade_pdf, CustomerTradeModel),
+}
+
+
+def generate(source: str, directory: str, rows: int, rates: dict = None):
+    """Write ``rows`` records of ``source`` into ``directory``; returns ``(path, injected artifact counts)``."""
+    file_name, writer, _ = SOURCES[source]
+    path = os.path.join(directory, file_name)
+    return path, writer(path, rows, rates=rates)
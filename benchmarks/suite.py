@@ -0,0 +1,198 @@
+"""End-to-end ingestion benchmark over synthetic uploads of every source shape.
+
+Generates each source with ``benchmarks.generators`` and runs it through the
+upload pipeline chunk by chunk, timing each stage on its own with the
+same ``IngestMetrics`` ingestion records on Audit documents (wall and CPU
+time, rows/sec, peak RSS):
+
+- parse: the parser's ``iter_batches`` (records, plus the DataFrame for tabular sources)
+- normalize: ``normalize_batch`` (lowercase keys mapped to the model's aliases, no ``_id`` fields)
+- validate: columnar pre-validation and pydantic, the way ingestion does it,
+  including building the compact Error_Records documents
+- insert: upserts on the natural key, the Error_Records insert and the Error_Rollups update
+
+Inserts go to mongomock by default, or to a scratch database on a real
+server with ``--mongo mongodb://localhost:27017`` (dropped afterwards).
+mongomock has no real indexes, so every upsert scans the whole collection;
+against it the insert stage uses plain ``insert_many`` instead, and the
+upserts ingestion performs are only timed against a real server (the
+Error_Rollups upserts also run one ``update_one`` at a time against it).
+Trade PDFs are read through their digital tables with the page cache off,
+so the parse stage measures pdfplumber and not the cache. Results, with the
+git commit, Python version and injected artifact rates, are printed and
+written as JSON with ``--out`` so runs can be compared over time. This
+replaces the single ``time.time()`` total printed by validators/validation_f.py.
+
+    python -m benchmarks.suite --rows 1000000 --pdf-rows 2000 --out bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from benchmarks.generators import SOURCES, artifact_rates, generate
+from error_records import ROLLUP_COLLECTION, error_documents, rollup_changes, rollup_updates
+from factory import ParserFactory
+from instrumentation import IngestMetrics
+from ingestion_ledger import NATURAL_KEYS
+from mongo_writer import MongoWriter
+from normalize import normalize_batch
+from parsers.ocr_cache import OCRCache
+from parsers.pdf_parser import PDFParser
+from validators.prevalidation import validate_frame
+from validators.validation_engine import get_engine
+
+STAGES = ["parse", "normalize", "validate", "insert"]
+BENCH_DB = "ingestion_benchmark"
+
+# source -> warehouse collection, as main.py maps the generated file names
+COLLECTIONS = {
+    "retail": "Customer_Retails_Transactions",
+    "upi": "Customer_UPI_Transactions",
+    "credit": "Customer_Credit_Card_Transactions",
+    "customer": "Customer",
+    "trade": "Customer_Trade",
+}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def mongo_target(mongo: str) -> MongoWriter:
+    if mongo == "mongomock":
+        import mongomock
+        return MongoWriter(db_name=BENCH_DB, client=mongomock.MongoClient())
+    return MongoWriter(uri=mongo, db_name=BENCH_DB)
+
+
+def get_parser(source: str, ext: str):
+    if source == "trade":
+        # Inline extraction with the page cache disabled, so every run parses the tables
+        return PDFParser(workers=1, cache=OCRCache(max_bytes=0))
+    return ParserFactory.get_parser(ext)
+
+
+def run_source(source, path, mongo, chunk_size, upsert=True):
+    file_name, _, model_cls = SOURCES[source]
+    collection = COLLECTIONS[source]
+    parser = get_parser(source, path.rsplit(".", 1)[-1].lower())
+    engine = get_engine()
+    metrics = IngestMetrics(path.rsplit(".", 1)[-1].upper())
+    rows = valid = errors = 0
+
+    batches = parser.iter_batches(path, chunk_size)
+    for records, frame in metrics.iterate("parse", batches, rows=lambda batch: len(batch[0])):
+        rows += len(records)
+
+        with metrics.stage("normalize") as stage:
+            records, frame = normalize_batch(records, frame, model_cls)
+            stage.rows = len(records)
+
+        with metrics.stage("validate") as stage:
+            if frame is not None:
+                correct, failures = validate_frame(model_cls, frame, records, engine)
+            else:
+                correct, failures = engine.validate(model_cls, records)
+            error_records = error_documents(file_name, path, rows - len(records), failures)
+            stage.rows = len(records)
+
+        with metrics.stage("insert") as stage:
+            if upsert:
+                mongo.upsert_records(collection, correct, NATURAL_KEYS[collection])
+            else:
+                mongo.insert_records(collection, correct)
+            mongo.insert_records("Error_Records", error_records)
+            if error_records and upsert:
+                mongo.db[ROLLUP_COLLECTION].bulk_write(rollup_updates(file_name, path, error_records), ordered=False)
+            elif error_records:
+                # mongomock's bulk_write cannot run UpdateOne with current pymongo; one update per error type
+                for query, update in rollup_changes(file_name, path, error_records):
+                    mongo.db[ROLLUP_COLLECTION].update_one(query, update, upsert=True)
+            stage.rows = len(records)
+        valid += len(correct)
+        errors += len(failures)
+
+    stages = metrics.summary()
+    total = sum(stage["wall_seconds"] for stage in stages.values())
+    return {
+        "source": source,
+        "file": file_name,
+        "bytes": os.path.getsize(path),
+        "rows": rows,
+        "valid": valid,
+        "errors": errors,
+        "stages": stages,
+        "total_seconds": round(total, 3),
+        "rows_per_sec": round(rows / total) if total else None,
+    }
+
+
+def run(sources, rows, pdf_rows, mongo_uri, chunk_size):
+    rates = artifact_rates()
+    mongo = mongo_target(mongo_uri)
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for source in sources:
+                count = pdf_rows if source == "trade" else rows
+                start = time.perf_counter()
+                path, injected = generate(source, tmp, count, rates)
+                generate_seconds = time.perf_counter() - start
+
+                result = run_source(source, path, mongo, chunk_size, upsert=mongo_uri != "mongomock")
+                result["injected"] = injected
+                result["generate_seconds"] = round(generate_seconds, 3)
+                results.append(result)
+                os.remove(path)
+
+                stages = "  ".join(f"{stage} {result['stages'][stage]['wall_seconds']:>7.2f}s" for stage in STAGES)
+                print(f"{source:<9} {result['rows']:>9,} rows  {stages}  "
+                      f"{result['rows_per_sec'] or 0:>9,} rows/s  {result['errors']:,} errors")
+    finally:
+        mongo.client.drop_database(BENCH_DB)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "mongo": "mongomock" if mongo_uri == "mongomock" else "mongod",
+            "insert_mode": "insert" if mongo_uri == "mongomock" else "upsert",
+            "chunk_size": chunk_size,
+            "validation_workers": get_engine().workers,
+            "artifact_rates": {kind: round(rate, 6) for kind, rate in rates.items()},
+        },
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000, help="rows per source (trade PDFs use --pdf-rows)")
+    parser.add_argument("--pdf-rows", type=int, default=2000)
+    parser.add_argument("--sources", default=",".join(SOURCES),
+                        help=f"comma-separated subset of {', '.join(SOURCES)}")
+    parser.add_argument("--mongo", default="mongomock", help="'mongomock' or a MongoDB URI")
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--out", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    sources = [source.strip() for source in args.sources.split(",") if source.strip()]
+    unknown = [source for source in sources if source not in SOURCES]
+    if unknown:
+        parser.error(f"unknown sources: {', '.join(unknown)}")
+
+    report = run(sources, args.rows, args.pdf_rows, args.mongo, args.chunk_size)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4)
@@ -0,0 +1,131 @@
+"""Query helpers for the customer Data Mart ("Customer" collection).
+
+Each customer document keeps one array per source collection under
+``collections.<name>``. These helpers push the per-collection slicing,
+date filtering and sorting into MongoDB so only the requested page of one
+array leaves the database.
+"""
+from datetime import datetime
+
+from validators.retail_transactions import DATE_FORMATS as RETAIL_DATE_FORMATS
+from validators.trade_transactions import DATE_FORMATS as TRADE_DATE_FORMATS
+from validators.upi_transactions import TIMESTAMP_FORMATS
+
+DATA_MART_COLLECTION = "Customer"
+# Set on each embedded record: the file it was ingested from, so a re-ingested file can pull its records
+SOURCE_FIELD = "_source"
+
+# Record field holding the transaction date, with the formats the validators accept
+DATE_FIELDS = {
+    "Customer_Retails_Transactions": ("date", RETAIL_DATE_FORMATS),
+    "Customer_Trade": ("tradedate", TRADE_DATE_FORMATS),
+    "Customer_UPI_Transactions": ("timestamp", TIMESTAMP_FORMATS),
+}
+
+# strptime directives that $dateFromString understands
+_MONGO_DIRECTIVES = {"%Y", "%m", "%d", "%H", "%M", "%S"}
+
+
+def customer_id_query(customer_id) -> dict:
+    """Match a customer id from the URL whether it was stored as a string or an int."""
+    candidates = [customer_id]
+    if isinstance(customer_id, str) and customer_id.lstrip("-").isdigit():
+        candidates.append(int(customer_id))
+    return {"customer_id": {"$in": candidates}}
+
+
+def pull_source(db, collection_name: str, source: str) -> int:
+    """Pull a source file's records from the customers' ``collection_name`` arrays before it is ingested again in full."""
+    path = f"collections.{collection_name}"
+    return db[DATA_MART_COLLECTION].update_many(
+        {f"{path}.{SOURCE_FIELD}": source},
+        {"$pull": {path: {SOURCE_FIELD: source}}},
+    ).modified_count
+
+
+def parse_date_param(value: str):
+    """Parse a ``from``/``to`` query value (ISO date or datetime)."""
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid date: {value}, expected YYYY-MM-DD")
+
+
+def _supported(fmt: str) -> bool:
+    directives = {fmt[i:i + 2] for i in range(len(fmt) - 1) if fmt[i] == "%"}
+    return directives <= _MONGO_DIRECTIVES
+
+
+def date_expression(path: str, formats) -> dict:
+    """Aggregation expression turning ``path`` into a BSON date (or null).
+
+    Dates stored as BSON dates are used as-is; strings are tried against each
+    validator format in order, then MongoDB's own format detection.
+    """
+    as_string = {"$toString": path}
+    attempts = [
+        {"$dateFromString": {"dateString": as_string, "format": fmt, "onError": None, "onNull": None}}
+        for fmt in formats if _supported(fmt)
+    ]
+    attempts.append({"$dateFromString": {"dateString": as_string, "onError": None, "onNull": None}})
+    return {"$cond": [
+        {"$eq": [{"$type": path}, "date"]},
+        path,
+        {"$ifNull": attempts + [None]},
+    ]}
+
+
+def collection_page_pipeline(customer_id, collection_name: str, offset: int = 0, limit: int = 100,
+                             date_from=None, date_to=None, sort=None) -> list:
+    """Pipeline returning ``{"total": [...], "records": [...]}`` for one customer's collection.
+
+    ``sort`` is a record field name, prefixed with ``-`` for descending order;
+    ``date`` sorts by the collection's transaction date.
+    """
+    pipeline = [
+        {"$match": customer_id_query(customer_id)},
+        {"$project": {"_id": 0, "record": f"$collections.{collection_name}"}},
+        {"$unwind": "$record"},
+    ]
+    return pipeline + record_page_stages(collection_name, offset, limit, date_from, date_to, sort)
+
+
+def record_page_stages(collection_name: str, offset: int = 0, limit: int = 100,
+                       date_from=None, date_to=None, sort=None) -> list:
+    """Date filter, sort and ``$facet`` page over documents of the form ``{"record": {...}}``."""
+    pipeline = []
+    date_field = DATE_FIELDS.get(collection_name)
+    needs_date = date_from is not None or date_to is not None or (sort or "").lstrip("-") == "date"
+    if needs_date:
+        if not date_field:
+            raise ValueError(f"{collection_name} records have no date field")
+        field, formats = date_field
+        pipeline.append({"$addFields": {"_date": date_expression(f"$record.{field}", formats)}})
+        bounds = {}
+        if date_from is not None:
+            bounds["$gte"] = date_from
+        if date_to is not None:
+            bounds["$lte"] = date_to
+        if bounds:
+            pipeline.append({"$match": {"_date": bounds}})
+
+    page = []
+    if sort:
+        direction = -1 if sort.startswith("-") else 1
+        field = sort.lstrip("-")
+        page.append({"$sort": {"_date" if field == "date" else f"record.{field}": direction}})
+    page += [{"$skip": offset}, {"$limit": limit}, {"$replaceWith": "$record"}, {"$project": {SOURCE_FIELD: 0}}]
+
+    pipeline.append({"$facet": {"total": [{"$count": "count"}], "records": page}})
+    return pipeline
+
+
+def customer_summary_pipeline(customer_id, collection_names) -> list:
+    """Customer profile with per-collection record counts instead of the arrays themselves."""
+    counts = {name: {"$size": {"$ifNull": [f"$collections.{name}", []]}} for name in collection_names}
+    return [
+        {"$match": customer_id_query(customer_id)},
+        {"$limit": 1},
+        {"$addFields": {"collection_counts": counts}},
+        {"$unset": "collections"},
+    ]
@@ -0,0 +1,240 @@
+"""Bucketed Data Mart layout.
+
+Instead of one ever-growing ``collections.<name>`` array per customer, each
+customer's records live in ``Customer_Buckets`` documents keyed by
+(customer, collection, source file, month). A bucket holds at most
+``DATA_MART_BUCKET_SIZE`` records; when it is full the next write opens a
+new one, so no document approaches the 16 MB BSON limit. Each bucket keeps
+summary fields up to date on write: record count, amount total and the
+first/last transaction date.
+
+Select it with ``DATA_MART_LAYOUT=bucketed``. ``python data_mart_buckets.py
+--migrate`` converts existing embedded arrays into buckets.
+"""
+import argparse
+import os
+import time
+from datetime import datetime
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from data_mart import DATA_MART_COLLECTION, DATE_FIELDS, customer_id_query, record_page_stages
+
+BUCKET_COLLECTION = "Customer_Buckets"
+# "embedded" keeps the original collections.<name> arrays on the Customer document
+DATA_MART_LAYOUT = os.getenv("DATA_MART_LAYOUT", "embedded")
+DATA_MART_BUCKET_SIZE = int(os.getenv("DATA_MART_BUCKET_SIZE", 500))
+MIGRATED_SOURCE = "migrated"
+
+# Record field summed into each bucket's summary.amount
+AMOUNT_FIELDS = {
+    "Customer_Retails_Transactions": "total_amount",
+    "Customer_UPI_Transactions": "amount (inr)",
+    "Customer_Trade": "tradevalue",
+    "Customer_Credit_Card_Transactions": "purchases",
+}
+
+
+def record_date(collection_name: str, record: dict):
+    """Transaction date of a record, parsed with its validator's formats, or ``None``."""
+    date_field = DATE_FIELDS.get(collection_name)
+    if not date_field:
+        return None
+    field, formats = date_field
+    value = record.get(field)
+    if isinstance(value, datetime):
+        return value
+    if value is None:
+        return None
+    text = str(value).strip()
+    for fmt in formats:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def _amount(value) -> float:
+    try:
+        return float(str(value).replace(",", ""))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def bucket_operations(collection_name: str, source: str, customer_id, records: list,
+                      bucket_size: int = DATA_MART_BUCKET_SIZE) -> list:
+    """Upserts appending ``records`` to the customer's buckets for ``collection_name``.
+
+    Records are grouped by month and written in slices of at most
+    ``bucket_size``. A slice only goes into a bucket that still has room for
+    all of it (``count <= bucket_size - len(slice)``); otherwise the upsert
+    opens a new bucket.
+    """
+    by_month = {}
+    for record in records:
+        date = record_date(collection_name, record)
+        by_month.setdefault(date.strftime("%Y-%m") if date else None, []).append((date, record))
+
+    amount_field = AMOUNT_FIELDS.get(collection_name)
+    operations = []
+    for month, dated in by_month.items():
+        for start in range(0, len(dated), bucket_size):
+            piece = dated[start:start + bucket_size]
+            dates = [date for date, _ in piece if date is not None]
+            update = {
+                "$push": {"records": {"$each": [record for _, record in piece]}},
+                "$inc": {
+                    "count": len(piece),
+                    "summary.amount": sum(_amount(record.get(amount_field)) for _, record in piece) if amount_field else 0,
+                },
+                "$set": {"updated_at": datetime.now()},
+            }
+            if dates:
+                update["$min"] = {"summary.first_date": min(dates)}
+                update["$max"] = {"summary.last_date": max(dates)}
+            operations.append(UpdateOne(
+                {
+                    "customer_id": customer_id,
+                    "collection": collection_name,
+                    "source": source,
+                    "month": month,
+                    "count": {"$lte": bucket_size - len(piece)},
+                },
+                update,
+                upsert=True,
+            ))
+    return operations
+
+
+def write_buckets(db, collection_name: str, source: str, grouped: dict, batch_size: int = 1000) -> dict:
+    """Append each customer's records to their buckets; stats match store_in_mongo_data_mart's."""
+    operations = [
+        operation
+        for customer_id, records in grouped.items()
+        for operation in bucket_operations(collection_name, source, customer_id, records)
+    ]
+    stats = {"batches": 0, "upserted": 0, "modified": 0, "failed_batches": [], "seconds": 0.0}
+    started = time.perf_counter()
+    for batch_no, start in enumerate(range(0, len(operations), batch_size)):
+        batch = operations[start:start + batch_size]
+        stats["batches"] += 1
+        try:
+            result = db[BUCKET_COLLECTION].bulk_write(batch, ordered=False)
+            stats["upserted"] += result.upserted_count
+            stats["modified"] += result.modified_count
+        except BulkWriteError as e:
+            details = e.details
+            stats["upserted"] += details.get("nUpserted", 0)
+            stats["modified"] += details.get("nModified", 0)
+            write_errors = details.get("writeErrors", [])
+            stats["failed_batches"].append({
+                "batch": batch_no,
+                "operations": len(batch),
+                "failed_operations": len(write_errors),
+                "error": write_errors[0]["errmsg"] if write_errors else str(e)
+            })
+    stats["seconds"] = time.perf_counter() - started
+    return stats
+
+
+def drop_source(db, source: str) -> int:
+    """Remove a source file's buckets before it is ingested again in full."""
+    return db[BUCKET_COLLECTION].delete_many({"source": source}).deleted_count
+
+
+def customer_exists(db, customer_id) -> bool:
+    query = customer_id_query(customer_id)
+    return bool(db[DATA_MART_COLLECTION].find_one(query, {"_id": 1}) or db[BUCKET_COLLECTION].find_one(query, {"_id": 1}))
+
+
+def bucket_page_pipeline(customer_id, collection_name: str, offset: int = 0, limit: int = 100,
+                         date_from=None, date_to=None, sort=None) -> list:
+    """Same result shape as ``collection_page_pipeline``, read from the customer's buckets.
+
+    With a date range, buckets whose summary dates fall entirely outside it
+    are skipped before their records are unwound.
+    """
+    match = {**customer_id_query(customer_id), "collection": collection_name}
+    bounds = []
+    if date_from is not None:
+        bounds.append({"$or": [{"summary.last_date": {"$gte": date_from}}, {"summary.last_date": None}]})
+    if date_to is not None:
+        bounds.append({"$or": [{"summary.first_date": {"$lte": date_to}}, {"summary.first_date": None}]})
+    if bounds:
+        match["$and"] = bounds
+    pipeline = [
+        {"$match": match},
+        {"$sort": {"month": 1, "_id": 1}},  # insertion order within a month
+        {"$project": {"_id": 0, "records": 1}},
+        {"$unwind": "$records"},
+        {"$replaceWith": {"record": "$records"}},
+    ]
+    return pipeline + record_page_stages(collection_name, offset, limit, date_from, date_to, sort)
+
+
+def customer_profile(db, customer_id, collection_names) -> dict:
+    """Customer document (without embedded arrays) plus record counts and summaries from the buckets."""
+    profile = db[DATA_MART_COLLECTION].find_one(customer_id_query(customer_id), {"collections": 0}) or {
+        "customer_id": customer_id
+    }
+    counts = {name: 0 for name in collection_names}
+    summaries = {}
+    for group in db[BUCKET_COLLECTION].aggregate([
+        {"$match": {**customer_id_query(customer_id), "collection": {"$in": list(collection_names)}}},
+        {"$group": {
+            "_id": "$collection",
+            "count": {"$sum": "$count"},
+            "amount": {"$sum": "$summary.amount"},
+            "first_date": {"$min": "$summary.first_date"},
+            "last_date": {"$max": "$summary.last_date"},
+            "buckets": {"$sum": 1},
+        }},
+    ]):
+        name = group.pop("_id")
+        counts[name] = group["count"]
+        summaries[name] = group
+    profile["collection_counts"] = counts
+    profile["collection_summaries"] = summaries
+    return profile
+
+
+def migrate(db, unset: bool = False, bucket_size: int = DATA_MART_BUCKET_SIZE) -> dict:
+    """Copy every customer's embedded ``collections.<name>`` arrays into buckets.
+
+    Earlier migrated buckets are replaced, so the migration can be re-run.
+    With ``unset`` the arrays are removed from the Customer documents afterwards.
+    """
+    drop_source(db, MIGRATED_SOURCE)
+    stats = {"customers": 0, "records": 0, "buckets": 0}
+    cursor = db[DATA_MART_COLLECTION].find({"collections": {"$exists": True}}, {"customer_id": 1, "collections": 1})
+    for customer in cursor:
+        operations = [
+            operation
+            for collection_name, records in (customer.get("collections") or {}).items()
+            for operation in bucket_operations(collection_name, MIGRATED_SOURCE, customer["customer_id"],
+                                               records or [], bucket_size)
+        ]
+        if operations:
+            result = db[BUCKET_COLLECTION].bulk_write(operations, ordered=False)
+            stats["buckets"] += result.upserted_count
+            stats["records"] += sum(len(records or []) for records in customer["collections"].values())
+        stats["customers"] += 1
+        if unset:
+            db[DATA_MART_COLLECTION].update_one({"_id": customer["_id"]}, {"$unset": {"collections": ""}})
+    return stats
+
+
+if __name__ == "__main__":
+    from mongo_writer import MongoWriter
+
+    parser = argparse.ArgumentParser(description="Bucketed Data Mart maintenance")
+    parser.add_argument("--migrate", action="store_true", help="convert embedded collections.<name> arrays into buckets")
+    parser.add_argument("--unset", action="store_true", help="remove the embedded arrays after migrating")
+    args = parser.parse_args()
+
+    if args.migrate:
+        result = migrate(MongoWriter().db, unset=args.unset)
+        print(f"✅ Migrated {result['records']} records of {result['customers']} customers into {result['buckets']} buckets")
+    else:
+        parser.print_help()
@@ -0,0 +1,213 @@
+"""Compact validation error records and per-file error rollups.
+
+A row that fails validation is stored in ``Error_Records`` as a reference
+to the row, not as a copy of it:
+
+    {"filename": "retail_transactions.csv",
+     "source": "uploads/.staging/<sha256>.v2.parquet",
+     "row": 1234,
+     "errors": [{"field": "rating", "type": "int_parsing"}]}
+
+``row`` is the row's offset in ``source``, which is the staged Parquet copy
+of the upload, or the upload itself for formats that are not staged (PDFs).
+``errors`` keeps each error's field and pydantic error type. Pydantic's
+message, input, url and ctx are dropped, since the type identifies the error
+and the input is in the source. ``attach_records`` reads the rows back from
+their source when samples are requested.
+
+``Error_Rollups`` holds one document per (file, field, error type). It has
+the number of rows with that error and the first ``ERROR_ROLLUP_SAMPLES``
+row offsets. Ingestion adds to it with ``$inc`` chunk by chunk, so
+``/audits/errors?view=rollup`` reads a few small documents and does not
+scan the error records. A delta upload only appends rows, so the offsets
+recorded by earlier runs still point at the same rows in the newer source.
+"""
+import os
+from collections import Counter
+
+from pymongo import UpdateOne
+
+from factory import ParserFactory
+from normalize import normalize_batch
+from parsers.parquet_parser import ParquetParser
+
+ERROR_COLLECTION = "Error_Records"
+ROLLUP_COLLECTION = "Error_Rollups"
+# Row offsets kept on each rollup document as drill-down samples
+ERROR_ROLLUP_SAMPLES = int(os.getenv("ERROR_ROLLUP_SAMPLES", 20))
+# Rows read per batch when sample rows are loaded back from their source
+SAMPLE_CHUNK_SIZE = int(os.getenv("ERROR_SAMPLE_CHUNK_SIZE", 1000))
+ROOT_FIELD = "__root__"  # errors raised for the record as a whole (no loc)
+
+
+def error_field(err: dict) -> str:
+    """Dotted path of the field an error is about."""
+    loc = err.get("loc") or ()
+    return ".".join(str(part) for part in loc) if loc else ROOT_FIELD
+
+
+def compact_errors(errors: list) -> list:
+    """``[{"field", "type"}]`` pairs of a row's pydantic errors."""
+    return [{"field": error_field(err), "type": err.get("type")} for err in errors]
+
+
+def error_documents(file_name: str, source: str, first_row: int, failures: list) -> list:
+    """Error_Records documents for a chunk's ``(index, errors)`` failures; ``first_row`` is the chunk's offset."""
+    return [{
+        "filename": file_name,
+        "source": source,
+        "row": first_row + idx,
+        "errors": compact_errors(errors),
+    } for idx, errors in failures]
+
+
+def rollup_changes(file_name: str, source: str, documents: list) -> list:
+    """``(filter, update)`` pairs adding a chunk's error documents to the file's rollup, one per (field, type).
+
+    A row counts once per (field, type), however many of its errors share them.
+    """
+    rows = Counter()
+    samples = {}
+    for doc in documents:
+        for key in {(err["field"], err["type"]) for err in doc["errors"]}:
+            rows[key] += 1
+            sample = samples.setdefault(key, [])
+            if len(sample) < ERROR_ROLLUP_SAMPLES:
+                sample.append(doc["row"])
+    return [
+        (
+            {"filename": file_name, "field": field, "type": error_type},
+            {
+                "$inc": {"rows": count},
+                "$set": {"source": source},
+                "$push": {"sample_rows": {"$each": sorted(samples[(field, error_type)]),
+                                          "$slice": ERROR_ROLLUP_SAMPLES}},
+            },
+        )
+        for (field, error_type), count in rows.items()
+    ]
+
+
+def rollup_updates(file_name: str, source: str, documents: list) -> list:
+    """``rollup_changes`` as upserts for one ``bulk_write``."""
+    return [UpdateOne(query, update, upsert=True) for query, update in rollup_changes(file_name, source, documents)]
+
+
+def write_errors(db, file_name: str, source: str, first_row: int, failures: list) -> int:
+    """Store a chunk's failures and add them to the rollup; returns the number of error rows."""
+    documents = error_documents(file_name, source, first_row, failures)
+    if documents:
+        updates = rollup_updates(file_name, source, documents)
+        db[ERROR_COLLECTION].insert_many(documents)
+        db[ROLLUP_COLLECTION].bulk_write(updates, ordered=False)
+    return len(documents)
+
+
+def clear_errors(db, file_name: str):
+    """Drop a file's error records and rollup before it is ingested again from the start."""
+    db[ERROR_COLLECTION].delete_many({"filename": file_name})
+    db[ROLLUP_COLLECTION].delete_many({"filename": file_name})
+
+
+def error_query(file_name: str = None, field: str = None, error_type: str = None) -> dict:
+    """Error_Records filter for a file and, optionally, one field and/or error type."""
+    query = {"filename": file_name} if file_name else {}
+    match = {}
+    if field:
+        match["field"] = field
+    if error_type:
+        match["type"] = error_type
+    if match:
+        query["errors"] = {"$elemMatch": match}
+    return query
+
+
+def error_rollup(db, file_name: str = None) -> list:
+    """Per-file error counts: ``[{"filename", "source", "error_types": [{"field", "type", "rows", "sample_rows"}]}]``.
+
+    Each file's error types are ordered by their row count, largest first.
+    """
+    query = {"filename": file_name} if file_name else {}
+    files = {}
+    cursor = db[ROLLUP_COLLECTION].find(query, {"_id": 0}).sort([("filename", 1), ("rows", -1)])
+    for doc in cursor:
+        entry = files.get(doc["filename"])
+        if entry is None:
+            entry = files[doc["filename"]] = {"filename": doc["filename"], "source": doc.get("source"),
+                                              "error_types": []}
+        entry["error_types"].append({
+            "field": doc["field"],
+            "type": doc["type"],
+            "rows": doc["rows"],
+            "sample_rows": doc.get("sample_rows", []),
+        })
+    return list(files.values())
+
+
+def load_rows(source: str, rows: list, model_cls=None, chunk_size: int = SAMPLE_CHUNK_SIZE) -> dict:
+    """``{row: record}`` for the given offsets of ``source``, normalized the way ingestion validated them.
+
+    Rows are read in order, starting a new read when the next wanted row is
+    more than a chunk ahead (Parquet seeks to its row group). Offsets past the
+    end, or a source that is gone, are left out.
+    """
+    wanted = sorted(set(rows))
+    if not wanted or not source or not os.path.exists(source):
+        return {}
+    ext = source.rsplit(".", 1)[-1].lower()
+    # Staged copies are read with the internal Parquet reader; uploads cannot be Parquet
+    parser = ParquetParser() if ext == "parquet" else ParserFactory.get_parser(ext)
+    found = {}
+    position = 0
+    while position < len(wanted):
+        offset = wanted[position]
+        exhausted = True
+        for records, frame in parser.iter_batches(source, chunk_size, offset):
+            records, _ = normalize_batch(records, frame, model_cls)
+            end = offset + len(records)
+            while position < len(wanted) and wanted[position] < end:
+                found[wanted[position]] = records[wanted[position] - offset]
+                position += 1
+            offset = end
+            if position == len(wanted) or wanted[position] >= end + chunk_size:
+                exhausted = False
+                break
+        if exhausted:
+            break
+    return found
+
+
+def attach_records(docs, model_for=None) -> list:
+    """``docs`` with the row each one refers to loaded as ``record`` (``None`` when it cannot be read).
+
+    Rows are read once per source. ``model_for(filename)`` gives the validator
+    model whose aliases the record keys are normalized to. Documents written
+    before error records were compacted already carry their ``record``.
+    """
+    docs = list(docs)
+    by_source = {}
+    for doc in docs:
+        if "record" not in doc and doc.get("row") is not None:
+            by_source.setdefault((doc.get("source"), doc.get("filename")), []).append(doc)
+    for (source, file_name), group in by_source.items():
+        model_cls = model_for(file_name) if model_for else None
+        records = load_rows(source, [doc["row"] for doc in group], model_cls)
+        for doc in group:
+            doc["record"] = records.get(doc["row"])
+    return docs
+
+
+__all__ = [
+    "ERROR_COLLECTION",
+    "ROLLUP_COLLECTION",
+    "compact_errors",
+    "error_documents",
+    "rollup_changes",
+    "rollup_updates",
+    "write_errors",
+    "clear_errors",
+    "error_query",
+    "error_rollup",
+    "load_rows",
+    "attach_records",
+]
@@ -66,23 +66,34 @@ export async function fetchCustomerData(
   }
 }
 
+// Audit records requested per /audits page
+const AUDIT_PAGE_SIZE = 1000;
+
 /**
- * Fetches audit data from the API endpoint
+ * Fetches audit data from the API endpoint, following ?after= pages until a short page
  * @returns Promise containing the audit data
  */
 export async function fetchAuditData(type: "audit" | "error", fileName: string): Promise<AuditData[]> {
   try {
-    const response = await fetch(
-      `${API_BASE_URL}/audits`
-    );
+    const audits: AuditData[] = [];
+    let after: number | null = null;
+    while (true) {
+      const cursor: string = after === null ? "" : `&after=${after}`;
+      const response = await fetch(
+        `${API_BASE_URL}/audits?limit=${AUDIT_PAGE_SIZE}${cursor}`
+      );
 
-    if (!response.ok) {
-      throw new Error(`API request failed with status: ${response.status}`);
-    }
+      if (!response.ok) {
+        throw new Error(`API request failed with status: ${response.status}`);
+      }
 
-    const data = await response.json();
-    console.log(data)
-    return data || []; 
+      const page: AuditData[] = (await response.json()) || [];
+      audits.push(...page);
+      if (page.length < AUDIT_PAGE_SIZE) {
+        return audits;
+      }
+      after = page[page.length - 1].audit_id;
+    }
   } catch (error) {
     console.error("Error fetching logs:", error);
     return [];
@@ -90,10 +101,51 @@ export async function fetchAuditData(type: "audit" | "error", fileName: string):
 }
 
 
+// Processing-time statistics (seconds) from the backend histograms
+export interface DurationStats {
+  mean: number | null;
+  max: number | null;
+  p50: number | null;
+  p90: number | null;
+  p99: number | null;
+}
+
+export interface AuditSummaryGroup {
+  files: number;
+  status: Record<string, number>;
+  processed_rows: number;
+  error_rows: number;
+  error_rate: number;
+  processing_seconds: DurationStats;
+}
+
+// Response of /audits/summary: pre-aggregated audit analytics
+export interface AuditSummary {
+  interval: string;
+  status_counts: Record<string, number>;
+  file_types: (AuditSummaryGroup & { file_type: string })[];
+  timeline: (AuditSummaryGroup & { bucket: string; file_type: string })[];
+}
+
+/**
+ * Fetches pre-aggregated audit analytics from the API endpoint
+ * @param interval Time bucket for the timeline (day, week or month)
+ * @returns Promise containing the audit summary
+ */
+export async function fetchAuditSummary(interval: "day" | "week" | "month" = "day"): Promise<AuditSummary> {
+  const response = await fetch(`${API_BASE_URL}/audits/summary?interval=${interval}`);
+
+  if (!response.ok) {
+    throw new Error(`API request failed with status: ${response.status}`);
+  }
+
+  return response.json();
+}
+
 /**
- * Calculates status counts from audit data
+ * Calculates status counts from the audit summary
  */
-export function calculateStatusCounts(data: AuditData[]) {
+export function calculateStatusCounts(summary: AuditSummary) {
   const counts = {
     SUCCESS: 0,
     ERROR: 0,
@@ -101,65 +153,67 @@ export function calculateStatusCounts(data: AuditData[]) {
     PENDING: 0
   };
   
-  data.forEach(item => {
-    counts[item.status]++;
+  Object.entries(summary.status_counts).forEach(([status, count]) => {
+    // Failed uploads are recorded as FAILED by the backend
+    const key = (status === "FAILED" ? "ERROR" : status) as keyof typeof counts;
+    if (key in counts) {
+      counts[key] += count;
+    }
   });
   
   return counts;
 }
 
 /**
- * Calculates file type counts from audit data
+ * Calculates file type counts from the audit summary
  */
-export function calculateFileTypeCounts(data: AuditData[]) {
+export function calculateFileTypeCounts(summary: AuditSummary) {
   const counts: Record<string, number> = {};
   
-  data.forEach(item => {
-    if (!counts[item.file_type]) {
-      counts[item.file_type] = 0;
-    }
-    counts[item.file_type]++;
+  summary.file_types.forEach(item => {
+    counts[item.file_type] = item.files;
   });
   
   return counts;
 }
 
 /**
- * Calculates processing time data from audit data
+ * Calculates processing time percentiles per file type from the audit summary
  */
-export function calculateProcessingTimeData(data: AuditData[]) {
-  return data
-    .filter(item => item.finished_at !== null)
-    .map(item => {
-      const startTime = new Date(item.started_at).getTime();
-      const endTime = new Date(item.finished_at as string).getTime();
-      const processingTimeSeconds = (endTime - startTime) / 1000;
-      
-      return {
-        audit_id: item.audit_id,
-        file_name: item.file_name,
-        processing_time_seconds: processingTimeSeconds,
-        file_size: item.file_size
-      };
-    });
+export function calculateProcessingTimeData(summary: AuditSummary) {
+  return summary.file_types
+    .filter(item => item.processing_seconds.p50 !== null)
+    .map(item => ({
+      file_type: item.file_type,
+      files: item.files,
+      mean_seconds: item.processing_seconds.mean,
+      p50_seconds: item.processing_seconds.p50,
+      p90_seconds: item.processing_seconds.p90,
+      p99_seconds: item.processing_seconds.p99
+    }));
 }
 
 /**
- * Calculates error rate data from audit data
+ * Calculates error rate data per time bucket and file type from the audit summary
  */
-export function calculateErrorRateData(data: AuditData[]) {
-  return data
+export function calculateErrorRateData(summary: AuditSummary) {
+  return summary.timeline
     .filter(item => item.processed_rows > 0)
-    .map(item => {
-      const errorRate = (item.error_rows / item.processed_rows) * 100;
-      
-      return {
-        audit_id: item.audit_id,
-        file_name: item.file_name,
-        error_rate: parseFloat(errorRate.toFixed(2)),
-        processed_rows: item.processed_rows,
-        error_rows: item.error_rows,
-        file_size: item.file_size
-      };
-    });
-}
\ No newline at end of file
+    .map(item => ({
+      bucket: item.bucket,
+      file_type: item.file_type,
+      error_rate: item.error_rate,
+      processed_rows: item.processed_rows,
+      error_rows: item.error_rows,
+      files: item.files
+    }));
+}
+
+/**
+ * Overall error rate (%) across every processed row in the audit summary
+ */
+export function calculateOverallErrorRate(summary: AuditSummary) {
+  const processed = summary.file_types.reduce((sum, item) => sum + item.processed_rows, 0);
+  const errors = summary.file_types.reduce((sum, item) => sum + item.error_rows, 0);
+  return processed > 0 ? (errors / processed) * 100 : 0;
+}
@@ -15,13 +15,14 @@ import {
   Legend,
   ChartOptions
 } from "chart.js";
-import { AuditData } from "@/app/data/audit-data";
 import { 
-  fetchAuditData,
+  AuditSummary,
+  fetchAuditSummary,
   calculateStatusCounts,
   calculateFileTypeCounts,
   calculateProcessingTimeData,
-  calculateErrorRateData
+  calculateErrorRateData,
+  calculateOverallErrorRate
 } from "@/app/services/api-service";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 
@@ -37,9 +38,9 @@ ChartJS.register(
   Legend
 );
 
-// Common hook for fetching audit data
-function useAuditData() {
-  const [auditData, setAuditData] = useState<AuditData[]>([]);
+// Common hook for fetching the pre-aggregated audit summary
+function useAuditSummary() {
+  const [auditSummary, setAuditSummary] = useState<AuditSummary | null>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
 
@@ -47,8 +48,8 @@ function useAuditData() {
     async function loadData() {
       try {
         setLoading(true);
-        const data = await fetchAuditData();
-        setAuditData(data);
+        const data = await fetchAuditSummary();
+        setAuditSummary(data);
         setError(null);
       } catch (err) {
         console.error("Error fetching audit data:", err);
@@ -61,14 +62,14 @@ function useAuditData() {
     loadData();
   }, []);
 
-  return { auditData, loading, error };
+  return { auditSummary, loading, error };
 }
 
 export function StatusChart() {
-  const { auditData, loading, error } = useAuditData();
+  const { auditSummary, loading, error } = useAuditSummary();
   
-  const statusCounts = auditData.length > 0 
-    ? calculateStatusCounts(auditData)
+  const statusCounts = auditSummary
+    ? calculateStatusCounts(auditSummary)
     : { SUCCESS: 0, ERROR: 0, IN_PROGRESS: 0, PENDING: 0 };
     
   const data = {
@@ -131,10 +132,10 @@ export function StatusChart() {
 }
 
 export function FileTypeChart() {
-  const { auditData, loading, error } = useAuditData();
+  const { auditSummary, loading, error } = useAuditSummary();
   
-  const fileTypeCounts = auditData.length > 0 
-    ? calculateFileTypeCounts(auditData) 
+  const fileTypeCounts = auditSummary
+    ? calculateFileTypeCounts(auditSummary) 
     : {};
     
   const data = {
@@ -189,25 +190,31 @@ export function FileTypeChart() {
 }
 
 export function ProcessingTimeChart() {
-  const { auditData, loading, error } = useAuditData();
+  const { auditSummary, loading, error } = useAuditSummary();
   
-  const processingTimeData = auditData.length > 0 
-    ? calculateProcessingTimeData(auditData)
+  const processingTimeData = auditSummary
+    ? calculateProcessingTimeData(auditSummary)
     : [];
     
-  const fileNames = processingTimeData.map(item => item.file_name);
-  const processingTimes = processingTimeData.map(item => item.processing_time_seconds);
+  const fileTypes = processingTimeData.map(item => item.file_type);
 
   const data = {
-    labels: fileNames,
+    labels: fileTypes,
     datasets: [
       {
-        label: "Processing Time (seconds)",
-        data: processingTimes,
+        label: "Median (seconds)",
+        data: processingTimeData.map(item => item.p50_seconds),
         backgroundColor: "rgba(75, 192, 192, 0.6)",
         borderColor: "rgba(75, 192, 192, 1)",
         borderWidth: 1,
       },
+      {
+        label: "90th percentile (seconds)",
+        data: processingTimeData.map(item => item.p90_seconds),
+        backgroundColor: "rgba(255, 159, 64, 0.6)",
+        borderColor: "rgba(255, 159, 64, 1)",
+        borderWidth: 1,
+      },
     ],
   };
 
@@ -221,7 +228,7 @@ export function ProcessingTimeChart() {
       },
       title: {
         display: true,
-        text: "File Processing Times",
+        text: "File Processing Times by File Type",
       },
     },
     scales: {
@@ -263,20 +270,20 @@ export function ProcessingTimeChart() {
 }
 
 export function ErrorRateChart() {
-  const { auditData, loading, error } = useAuditData();
+  const { auditSummary, loading, error } = useAuditSummary();
   
-  const errorRateData = auditData.length > 0 
-    ? calculateErrorRateData(auditData)
+  const errorRateData = auditSummary
+    ? calculateErrorRateData(auditSummary)
     : [];
   
   const data = {
     datasets: [
       {
-        label: "Error Rate vs File Size",
+        label: "Error Rate vs Processed Rows",
         data: errorRateData.map(item => ({
           x: item.processed_rows,
           y: item.error_rate,
-          r: item.file_size * 3,
+          r: Math.max(3, item.files * 3),
         })),
         backgroundColor: "rgba(255, 99, 132, 0.6)",
         borderColor: "rgba(255, 99, 132, 1)",
@@ -293,11 +300,11 @@ export function ErrorRateChart() {
           label: function(context: any) {
             const item = errorRateData[context.dataIndex];
             return [
-              `File: ${item.file_name}`,
+              `${item.file_type} files on ${item.bucket}`,
               `Processed Rows: ${item.processed_rows}`,
               `Error Rate: ${item.error_rate}%`,
               `Error Rows: ${item.error_rows}`,
-              `File Size: ${item.file_size} MB`
+              `Files: ${item.files}`
             ];
           }
         }
@@ -307,7 +314,7 @@ export function ErrorRateChart() {
       },
       title: {
         display: true,
-        text: "Error Rates by Processed Rows (bubble size = file size)",
+        text: "Error Rates by Processed Rows (bubble size = file count)",
       },
     },
     scales: {
@@ -357,20 +364,16 @@ export function ErrorRateChart() {
 }
 
 export function AuditSummaryCards() {
-  const { auditData, loading, error } = useAuditData();
+  const { auditSummary, loading, error } = useAuditSummary();
   
-  const statusCounts = auditData.length > 0 
-    ? calculateStatusCounts(auditData)
+  const statusCounts = auditSummary
+    ? calculateStatusCounts(auditSummary)
     : { SUCCESS: 0, ERROR: 0, IN_PROGRESS: 0, PENDING: 0 };
-    
-  const errorRateData = auditData.length > 0 
-    ? calculateErrorRateData(auditData)
-    : [];
   
   const totalFiles = Object.values(statusCounts).reduce((sum: number, count: number) => sum + count, 0);
   const successRate = totalFiles > 0 ? ((statusCounts.SUCCESS / totalFiles) * 100).toFixed(1) : "0.0";
-  const avgErrorRate = errorRateData.length > 0 
-    ? (errorRateData.reduce((sum: number, item: {error_rate: number}) => sum + item.error_rate, 0) / errorRateData.length).toFixed(2) 
+  const avgErrorRate = auditSummary
+    ? calculateOverallErrorRate(auditSummary).toFixed(2)
     : "0.00";
   
   if (loading) {
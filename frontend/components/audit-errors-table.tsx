@@ -47,6 +47,7 @@ export function AuditErrorsTable() {
     setError(null)
 
     try {
+      // The list carries no source rows; a row's data is loaded when it is opened
       const response = await fetch("http://127.0.0.1:5000/audits/errors")
 
       if (!response.ok) {
@@ -56,8 +57,15 @@ export function AuditErrorsTable() {
       const responseData = await response.json()
       const records = responseData.error_records || []
 
-      // extract record objects for table
-      const tableData = records.map((item: any) => item.record || {})
+      // one summary line per failing row: where it is and what failed
+      const tableData = records.map((item: any) => ({
+        file: item.filename,
+        row: item.row,
+        invalid_fields: invalidFields(item).join(", "),
+        error_types: Array.from(
+          new Set((item.errors || []).map((err: any) => err.type))
+        ).join(", "),
+      }))
 
       setRawData(records)
       setData(tableData)
@@ -82,9 +90,39 @@ export function AuditErrorsTable() {
     return String(value)
   }
 
-  const handleRowClick = (rowIndex: number) => {
-    setSelectedItem(rawData[rowIndex]) // show full record + errors in dialog
+  // Error records store (field, error type) pairs; a field can fail more than one check
+  const invalidFields = (item: ApiData): string[] =>
+    item.invalid_fields ??
+    Array.from(new Set((item.errors || []).map((err: any) => err.field)))
+
+  const handleRowClick = async (rowIndex: number) => {
+    const item = rawData[rowIndex]
+    setSelectedItem(item) // show the errors right away, the source row once loaded
     setDetailsDialogOpen(true)
+    if (item.record !== undefined) return
+
+    try {
+      const response = await fetch(
+        `http://127.0.0.1:5000/audits/errors/${item._id}`
+      )
+      if (!response.ok) {
+        throw new Error(`Error fetching record: ${response.status}`)
+      }
+      const detailed = await response.json()
+      setRawData((items) =>
+        items.map((other, i) => (i === rowIndex ? detailed : other))
+      )
+      setSelectedItem((current) =>
+        current && current._id === item._id ? detailed : current
+      )
+    } catch (err) {
+      console.error("Failed to fetch record:", err)
+      setSelectedItem((current) =>
+        current && current._id === item._id
+          ? { ...current, record: null }
+          : current
+      )
+    }
   }
 
   return (
@@ -223,7 +261,7 @@ export function AuditErrorsTable() {
                   <ul className="list-disc pl-4 text-sm space-y-1">
                     {selectedItem.errors.map((err: any, i: number) => (
                       <li key={i}>
-                        <strong>{err.loc?.join(".")}</strong>: {err.msg}
+                        <strong>{err.field ?? err.loc?.join(".")}</strong>: {err.type}
                       </li>
                     ))}
                   </ul>
@@ -236,7 +274,11 @@ export function AuditErrorsTable() {
                 <h4 className="text-sm font-semibold">Record Data</h4>
                 <div className="bg-muted p-3 rounded-md mt-1 overflow-auto max-h-96">
                   <pre className="text-xs font-mono whitespace-pre-wrap">
-                    {JSON.stringify(selectedItem.record, null, 2)}
+                    {selectedItem.record === undefined
+                      ? "Loading..."
+                      : selectedItem.record === null
+                      ? "Source row unavailable"
+                      : JSON.stringify(selectedItem.record, null, 2)}
                   </pre>
                 </div>
               </div>
@@ -39,10 +39,10 @@ function UploadForm() {
 
     // Check file extension
     const extension = file.name.split('.').pop()?.toLowerCase();
-    const supportedTypes = ['csv', 'xls', 'xlsx', 'json', 'xml', 'pdf'];
+    const supportedTypes = ['csv', 'xls', 'xlsx', 'json', 'jsonl', 'ndjson', 'xml', 'pdf', 'parquet'];
     
     if (!extension || !supportedTypes.includes(extension)) {
-      toast.error(`Unsupported file type: ${extension}. Please upload CSV, XLS, XLSX, JSON, XML, or PDF files.`);
+      toast.error(`Unsupported file type: ${extension}. Please upload CSV, XLS, XLSX, JSON, JSONL, XML, PDF, or Parquet files.`);
       return;
     }
 
@@ -175,7 +175,7 @@ function UploadForm() {
         <div className="flex flex-wrap gap-2 text-xs text-muted-foreground">
           <Badge variant="outline">CSV</Badge>
           <Badge variant="outline">XLS/XLSX</Badge>
-          <Badge variant="outline">JSON</Badge>
+          <Badge variant="outline">JSON/JSONL</Badge>
           <Badge variant="outline">XML</Badge>
           <Badge variant="outline">PDF</Badge>
         </div>
@@ -224,7 +224,7 @@ export function NavMain({
                 <DialogHeader>
                   <DialogTitle>Upload Files</DialogTitle>
                   <p className="text-sm text-muted-foreground">
-                    Upload data files for processing (CSV, XLS, XLSX, JSON, XML, PDF)
+                    Upload data files for processing (CSV, XLS, XLSX, JSON, JSONL, XML, PDF)
                   </p>
                 </DialogHeader>
                 <UploadForm />
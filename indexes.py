@@ -0,0 +1,222 @@
+"""Index bootstrap and query-plan checks.
+
+``INDEXES`` declares the indexes every collection needs for the queries the
+routes run. ``ensure_indexes`` creates them at startup; creating an index
+that already exists with the same options is a no-op, so it is safe on
+every start, from any number of processes at once. An index whose declared
+options changed is only reported there: ``python indexes.py`` (the bootstrap
+command, run once) drops and rebuilds it, since a dropped unique index lets
+duplicates in until it is back.
+
+``python indexes.py --check`` runs ``explain()`` on each route's query and
+exits non-zero if any winning plan contains a COLLSCAN, except for the
+routes in ``SCAN_ALLOWED`` that read a whole small collection on purpose.
+"""
+import argparse
+import sys
+from pymongo import ASCENDING
+from pymongo.errors import OperationFailure
+
+from audit_summary import SUMMARY_COLLECTION, summary_pipeline
+from data_mart import (
+    DATA_MART_COLLECTION,
+    collection_page_pipeline,
+    customer_id_query,
+    customer_summary_pipeline,
+)
+from data_mart_buckets import BUCKET_COLLECTION, bucket_page_pipeline
+from error_records import ROLLUP_COLLECTION, error_query
+from ingestion_ledger import NATURAL_KEYS
+from mongo_writer import MongoWriter
+from pagination import find_page, page_args
+
+TRANSACTION_COLLECTIONS = [
+    "Customer_UPI_Transactions", "Customer_Credit_Card_Transactions",
+    "Customer_Trade", "Customer_Retails_Transactions",
+]
+
+
+# BSON types a natural key is stored as (parsers give strings or numbers); null is not one of them
+NATURAL_KEY_TYPES = ["string", "number"]
+# Raised when an index exists under the same name or keys with other options
+INDEX_CONFLICT_CODES = (85, 86)
+
+
+def _natural_key_index(key: str) -> dict:
+    return {
+        "keys": [(key, ASCENDING)],
+        "name": f"{key.replace(' ', '_')}_unique",
+        "unique": True,
+        # Rows without the key, or with a null key, stay out of the index, so they don't collide on null
+        "partialFilterExpression": {key: {"$type": NATURAL_KEY_TYPES}},
+    }
+
+
+# Collection name -> index specs ("keys" plus create_index options)
+INDEXES = {
+    # Warehouse collections: upserts match on the natural key (see ingestion_ledger);
+    # on "Customer" the same index serves the Data Mart lookups by customer_id
+    **{collection: [_natural_key_index(key)] for collection, key in NATURAL_KEYS.items()},
+    "Audit": [
+        {"keys": [("audit_id", ASCENDING)], "name": "audit_id_unique", "unique": True},
+        {"keys": [("job_id", ASCENDING)], "name": "job_id", "sparse": True},
+        {"keys": [("status", ASCENDING)], "name": "status"},
+    ],
+    "Error_Records": [
+        # /audits/errors filters by file and pages by _id
+        {"keys": [("filename", ASCENDING), ("_id", ASCENDING)], "name": "filename_id"},
+        # ?field=&type= drill-downs into one error type
+        {"keys": [("filename", ASCENDING), ("errors.field", ASCENDING), ("errors.type", ASCENDING)],
+         "name": "filename_error_field_type"},
+    ],
+    ROLLUP_COLLECTION: [
+        # Ingestion increments one document per file, field and error type; ?view=rollup reads a file's
+        {"keys": [("filename", ASCENDING), ("field", ASCENDING), ("type", ASCENDING)],
+         "name": "filename_field_type_unique", "unique": True},
+    ],
+    BUCKET_COLLECTION: [
+        # Appends find the open bucket; /fetch/<customer_id> reads a customer's buckets in month order
+        {"keys": [("customer_id", ASCENDING), ("collection", ASCENDING), ("source", ASCENDING), ("month", ASCENDING)],
+         "name": "customer_collection_source_month"},
+        {"keys": [("customer_id", ASCENDING), ("collection", ASCENDING), ("month", ASCENDING)],
+         "name": "customer_collection_month"},
+        # Full re-ingestion of a file drops its buckets
+        {"keys": [("source", ASCENDING)], "name": "source"},
+    ],
+    SUMMARY_COLLECTION: [
+        {"keys": [("file_type", ASCENDING), ("bucket", ASCENDING)], "name": "file_type_bucket", "unique": True},
+        {"keys": [("bucket", ASCENDING)], "name": "bucket"},
+    ],
+}
+
+
+def _drop_conflicting(collection, spec: dict):
+    """Drop the existing index with the spec's name or keys."""
+    keys = dict(spec["keys"])
+    for name, info in collection.index_information().items():
+        if name == spec["name"] or dict(info["key"]) == keys:
+            collection.drop_index(name)
+
+
+def ensure_indexes(db, rebuild: bool = False) -> dict:
+    """Create every declared index; returns ``{collection: {index name: "ok" | error}}``.
+
+    A failure (usually a unique index over existing duplicates) is reported
+    and does not stop the remaining indexes. With ``rebuild`` an index that
+    exists with other options is dropped and created again; without it, the
+    conflict is reported like any other failure.
+    """
+    report = {}
+    for collection, specs in INDEXES.items():
+        report[collection] = {}
+        for spec in specs:
+            options = {k: v for k, v in spec.items() if k != "keys"}
+            try:
+                try:
+                    db[collection].create_index(spec["keys"], **options)
+                except OperationFailure as e:
+                    if not rebuild or e.code not in INDEX_CONFLICT_CODES:
+                        raise
+                    # Declared options changed (e.g. a new partial filter): rebuild the index
+                    _drop_conflicting(db[collection], spec)
+                    db[collection].create_index(spec["keys"], **options)
+                report[collection][spec["name"]] = "ok"
+            except OperationFailure as e:
+                print(f"⚠️ Could not create index {spec['name']} on {collection}: {e}")
+                report[collection][spec["name"]] = str(e)
+    return report
+
+
+def _winning_plans(explain):
+    """Every ``winningPlan`` in an explain document, including those nested in aggregation stages."""
+    if isinstance(explain, dict):
+        for key, value in explain.items():
+            if key == "winningPlan":
+                yield value
+            else:
+                yield from _winning_plans(value)
+    elif isinstance(explain, list):
+        for item in explain:
+            yield from _winning_plans(item)
+
+
+def _stages(plan):
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from _stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from _stages(item)
+
+
+# Routes whose query reads a whole collection by design, and why that is fine
+SCAN_ALLOWED = {
+    "/audits/summary": "aggregates all of Audit_Summary, one small document per file type and day",
+}
+
+
+def route_queries(db, customer_id="1001", file_name="sample.csv"):
+    """``(route, explain thunk)`` for the query behind each read route."""
+    page = page_args({}, "_id", default_limit=100)
+    audit_page = page_args({}, "audit_id", default_limit=100)
+    data_mart = db[DATA_MART_COLLECTION]
+
+    def aggregate(collection, pipeline):
+        return lambda: db.command("aggregate", collection, pipeline=pipeline, cursor={}, explain=True)
+
+    yield "/fetch", lambda: find_page(data_mart, {}, page).explain()
+    yield "/fetch/<customer_id> lookup", lambda: data_mart.find(customer_id_query(customer_id), {"_id": 1}).limit(1).explain()
+    yield "/fetch/<customer_id> profile", aggregate(
+        DATA_MART_COLLECTION, customer_summary_pipeline(customer_id, TRANSACTION_COLLECTIONS))
+    for name in TRANSACTION_COLLECTIONS:
+        yield f"/fetch/<customer_id>?collection={name}", aggregate(
+            DATA_MART_COLLECTION, collection_page_pipeline(customer_id, name))
+        yield f"/fetch/<customer_id>?collection={name} (bucketed)", aggregate(
+            BUCKET_COLLECTION, bucket_page_pipeline(customer_id, name))
+    yield "/audits", lambda: find_page(db["Audit"], {}, audit_page).explain()
+    yield "/audits in-flight counts", lambda: db["Audit"].find({"status": "PENDING"}).explain()
+    yield "/jobs/<job_id>", lambda: db["Audit"].find({"job_id": "0" * 32}).limit(1).explain()
+    yield "/audits/errors", lambda: find_page(db["Error_Records"], {"filename": file_name}, page).explain()
+    yield "/audits/errors?field=&type=", lambda: find_page(
+        db["Error_Records"], error_query(file_name, "rating", "int_parsing"), page).explain()
+    yield "/audits/errors?view=rollup", lambda: db[ROLLUP_COLLECTION].find({"filename": file_name}).explain()
+    yield "/audits/summary", aggregate(SUMMARY_COLLECTION, summary_pipeline())
+    for collection, key in NATURAL_KEYS.items():
+        yield f"upsert {collection}.{key}", lambda c=collection, k=key: db[c].find({k: 1}).explain()
+
+
+def check_query_plans(db) -> list:
+    """Explain every route query; returns ``[(route, stages)]`` and prints one line per route."""
+    results = []
+    for route, explain in route_queries(db):
+        stages = sorted({stage for plan in _winning_plans(explain()) for stage in _stages(plan)})
+        results.append((route, stages))
+        if "COLLSCAN" not in stages:
+            mark = "✅"
+        elif route in SCAN_ALLOWED:
+            mark = f"➖ ({SCAN_ALLOWED[route]})"
+        else:
+            mark = "❌"
+        print(f"{mark} {route}: {', '.join(stages) or 'no plan'}")
+    return results
+
+
+def scanning_routes(results) -> list:
+    """Routes from ``check_query_plans`` whose plan scans a collection without being allowed to."""
+    return [route for route, stages in results if "COLLSCAN" in stages and route not in SCAN_ALLOWED]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create (or rebuild) the declared indexes and check route query plans")
+    parser.add_argument("--check", action="store_true", help="explain each route query and fail on a COLLSCAN")
+    args = parser.parse_args()
+
+    db = MongoWriter().db
+    for collection, indexes in ensure_indexes(db, rebuild=True).items():
+        print(f"{collection}: {', '.join(f'{name} ({state})' for name, state in indexes.items())}")
+    if args.check:
+        results = check_query_plans(db)
+        if scanning_routes(results):
+            sys.exit(1)
@@ -0,0 +1,61 @@
+"""Content-addressed record of ingested files.
+
+Each upload is hashed (SHA-256 of its bytes) and looked up in the
+``Ingestion_Ledger`` collection, keyed by that hash. A file whose content
+was already ingested successfully is not parsed again. Warehouse rows are
+written as upserts on each collection's natural key, so re-running a file
+(forced, or after a failed attempt) updates rows instead of duplicating them.
+"""
+import hashlib
+from datetime import datetime
+
+LEDGER_COLLECTION = "Ingestion_Ledger"
+HASH_READ_SIZE = 1024 * 1024
+
+# Field identifying a row in each warehouse collection, as stored (lowercase parser keys)
+NATURAL_KEYS = {
+    "Customer_Retails_Transactions": "transaction_id",
+    "Customer_UPI_Transactions": "transaction id",
+    "Customer_Trade": "tradeid",
+    "Customer_Credit_Card_Transactions": "recordid",
+    "Customer": "customer_id",
+}
+
+
+def file_sha256(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_READ_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def find_ingested(db, sha256: str):
+    """Ledger entry of a successful earlier ingestion of this content, or ``None``."""
+    return db[LEDGER_COLLECTION].find_one({"_id": sha256, "status": "SUCCESS"})
+
+
+def mark_started(db, sha256: str, file_name: str, audit_id: int, file_size: int):
+    db[LEDGER_COLLECTION].update_one(
+        {"_id": sha256},
+        {
+            "$set": {
+                "status": "IN_PROGRESS",
+                "file_name": file_name,
+                "audit_id": audit_id,
+                "file_size": file_size,
+                "started_at": datetime.now(),
+            },
+            "$setOnInsert": {"first_seen_at": datetime.now()},
+        },
+        upsert=True,
+    )
+
+
+def mark_finished(db, sha256: str, status: str, collection: str = None, totals: dict = None):
+    fields = {"status": status, "finished_at": datetime.now()}
+    if collection:
+        fields["collection"] = collection
+    if totals:
+        fields.update({k: totals[k] for k in ("processed_rows", "correct_rows", "error_rows") if k in totals})
+    db[LEDGER_COLLECTION].update_one({"_id": sha256}, {"$set": fields})
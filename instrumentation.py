@@ -0,0 +1,140 @@
+"""Per-stage instrumentation of the ingestion pipeline.
+
+An ``IngestMetrics`` follows one upload from the save in ``upload_file``
+through every chunk of ``ingest_file``. Each stage (save, staging,
+delta_check, parse, normalize, validate, warehouse_insert,
+data_mart_upsert) adds up its wall time, the CPU time of the thread doing
+the work, and the rows it handled. The process's peak RSS is read as each
+stage ends. ``summary()`` is what the Audit record stores as ``stages``.
+
+CPU time covers the ingesting thread only. Validation shards that run in the
+engine's process pool show up as wall time of the validate stage.
+
+Finished uploads are also recorded as Prometheus metrics and served by
+``/metrics`` when prometheus_client is installed:
+
+* ``ingest_stage_seconds`` – histogram of each stage's wall time per upload
+* ``ingest_stage_cpu_seconds_total`` and ``ingest_stage_rows_total``
+* ``ingest_peak_rss_bytes`` – peak RSS seen at the end of each stage
+* ``ingest_uploads_total`` – uploads by file type and status
+"""
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+except ImportError:  # optional: /metrics reports that it is unavailable
+    generate_latest = None
+    CONTENT_TYPE_LATEST = None
+
+STAGE_SECONDS_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+if generate_latest is not None:
+    STAGE_SECONDS = Histogram("ingest_stage_seconds", "Wall time of one ingestion stage for one upload",
+                              ["stage", "file_type"], buckets=STAGE_SECONDS_BUCKETS)
+    STAGE_CPU_SECONDS = Counter("ingest_stage_cpu_seconds", "CPU time of the ingesting thread per stage",
+                                ["stage", "file_type"])
+    STAGE_ROWS = Counter("ingest_stage_rows", "Rows handled per ingestion stage", ["stage", "file_type"])
+    PEAK_RSS_BYTES = Gauge("ingest_peak_rss_bytes", "Process peak RSS seen at the end of the stage", ["stage"])
+    UPLOADS = Counter("ingest_uploads", "Finished uploads", ["file_type", "status"])
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB, or ``None`` where it cannot be read."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / 1024 / (1024 if sys.platform == "darwin" else 1), 1)
+    except ImportError:
+        try:
+            import psutil
+            return round(psutil.Process().memory_info().peak_wset / 1024 / 1024, 1)
+        except (ImportError, AttributeError):
+            return None
+
+
+class StageHandle:
+    """Yielded by ``IngestMetrics.stage``; set ``rows`` to the rows the stage handled."""
+
+    __slots__ = ("rows",)
+
+    def __init__(self):
+        self.rows = 0
+
+
+class IngestMetrics:
+    """Wall time, CPU time, rows and peak memory of each stage of one upload."""
+
+    def __init__(self, file_type: str = None):
+        self.file_type = file_type
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        handle = StageHandle()
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield handle
+        finally:
+            self._add(name, time.perf_counter() - wall, time.thread_time() - cpu, handle.rows)
+
+    def iterate(self, name: str, iterable, rows=len):
+        """Pass ``iterable`` through, timing each ``next()`` as stage ``name``; ``rows(item)`` counts its rows."""
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name) as stage:
+                item = next(iterator, StopIteration)
+                if item is not StopIteration:
+                    stage.rows = rows(item)
+            if item is StopIteration:
+                return
+            yield item
+
+    def _add(self, name: str, wall: float, cpu: float, rows: int):
+        totals = self.stages.get(name)
+        if totals is None:
+            totals = self.stages[name] = {"wall_seconds": 0.0, "cpu_seconds": 0.0, "rows": 0, "calls": 0,
+                                          "peak_rss_mb": None}
+        totals["wall_seconds"] += wall
+        totals["cpu_seconds"] += cpu
+        totals["rows"] += rows
+        totals["calls"] += 1
+        peak = peak_rss_mb()
+        if peak is not None:
+            totals["peak_rss_mb"] = max(totals["peak_rss_mb"] or 0, peak)
+
+    def summary(self) -> dict:
+        """Per-stage breakdown, in the order the stages first ran."""
+        return {
+            name: {
+                "wall_seconds": round(totals["wall_seconds"], 3),
+                "cpu_seconds": round(totals["cpu_seconds"], 3),
+                "rows": totals["rows"],
+                "rows_per_sec": round(totals["rows"] / totals["wall_seconds"], 1)
+                if totals["rows"] and totals["wall_seconds"] > 0 else None,
+                "calls": totals["calls"],
+                "peak_rss_mb": totals["peak_rss_mb"],
+            }
+            for name, totals in list(self.stages.items())
+        }
+
+    def observe(self, status: str):
+        """Record the finished upload in the Prometheus metrics."""
+        if generate_latest is None:
+            return
+        file_type = self.file_type or "unknown"
+        for name, totals in list(self.stages.items()):
+            STAGE_SECONDS.labels(name, file_type).observe(totals["wall_seconds"])
+            STAGE_CPU_SECONDS.labels(name, file_type).inc(totals["cpu_seconds"])
+            STAGE_ROWS.labels(name, file_type).inc(totals["rows"])
+            if totals["peak_rss_mb"] is not None:
+                PEAK_RSS_BYTES.labels(name).set(totals["peak_rss_mb"] * 1024 * 1024)
+        UPLOADS.labels(file_type, status).inc()
+
+
+def metrics_payload():
+    """``(body, content type)`` of the Prometheus text exposition, or ``None`` without prometheus_client."""
+    if generate_latest is None:
+        return None
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,141 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+# Uploads processed concurrently; 0 runs each job inline inside submit()
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", 2))
+# Finished jobs remembered for /jobs/<id> before the oldest are dropped
+MAX_FINISHED_JOBS = int(os.getenv("MAX_FINISHED_JOBS", 1000))
+
+
+class Job:
+    """Progress of one ingestion run, updated by the worker that owns it."""
+
+    def __init__(self, file_path: str, file_name: str, ext: str, job_id: str = None):
+        self.id = job_id or uuid.uuid4().hex
+        self.file_path = file_path
+        self.file_name = file_name
+        self.ext = ext
+        self.status = "PENDING"
+        self.stage = "queued"
+        self.audit_id = None
+        self.content_hash = None  # SHA-256 of the uploaded file
+        self.force = False  # re-ingest the whole file, ignoring the ledger and watermarks
+        self.rows_processed = 0
+        self.error_rows = 0
+        self.skipped_rows = 0  # already ingested by an earlier upload of the same source
+        self.total_rows = None  # estimate, when the parser can provide one
+        self.metrics = None  # per-stage timings (instrumentation.IngestMetrics)
+        self.result = None
+        self.error = None
+        self.created_at = datetime.now()
+        self.started_at = None
+        self.finished_at = None
+        self._started = None
+        self._finished = None
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+
+    def update(self, **fields):
+        with self._lock:
+            for key, value in fields.items():
+                setattr(self, key, value)
+
+    def start(self):
+        self.update(status="IN_PROGRESS", started_at=datetime.now())
+        self._started = time.perf_counter()
+
+    def finish(self, status: str, result=None, error=None):
+        self._finished = time.perf_counter()
+        self.update(status=status, stage="done", result=result, error=error, finished_at=datetime.now())
+        self._done.set()
+
+    def wait(self, timeout=None) -> bool:
+        return self._done.wait(timeout)
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            elapsed = None
+            if self._started is not None:
+                elapsed = (self._finished or time.perf_counter()) - self._started
+            rate = self.rows_processed / elapsed if elapsed else None
+            eta = None
+            if rate and self.total_rows is not None and not self.done:
+                eta = max(self.total_rows - self.rows_processed, 0) / rate
+            return {
+                "job_id": self.id,
+                "audit_id": self.audit_id,
+                "file_name": self.file_name,
+                "content_hash": self.content_hash,
+                "status": self.status,
+                "stage": self.stage,
+                "rows_processed": self.rows_processed,
+                "error_rows": self.error_rows,
+                "skipped_rows": self.skipped_rows,
+                "total_rows_estimate": self.total_rows,
+                "rows_per_sec": round(rate, 1) if rate else None,
+                "elapsed_seconds": round(elapsed, 3) if elapsed is not None else None,
+                "eta_seconds": round(eta, 1) if eta is not None else None,
+                "stages": self.metrics.summary() if self.metrics is not None else None,
+                "created_at": self.created_at.isoformat(),
+                "started_at": self.started_at.isoformat() if self.started_at else None,
+                "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+                "result": self.result,
+                "error": self.error,
+            }
+
+
+class JobQueue:
+    """In-process ingestion queue backed by a local thread pool.
+
+    ``runner(job)`` does the work and returns the job result; it reports
+    progress through ``job.update``. No external broker is involved, so the
+    queue can be exercised directly in tests (``workers=0`` runs inline).
+    """
+
+    def __init__(self, runner, workers: int = INGEST_WORKERS, max_finished: int = MAX_FINISHED_JOBS):
+        self.runner = runner
+        self.max_finished = max_finished
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest") if workers > 0 else None
+
+    def submit(self, job: Job) -> Job:
+        with self._lock:
+            self._jobs[job.id] = job
+            self._evict()
+        if self._executor is None:
+            self._run(job)
+        else:
+            self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job: Job):
+        job.start()
+        try:
+            result = self.runner(job)
+        except Exception as e:
+            job.finish("FAILED", error=str(e))
+        else:
+            job.finish("SUCCESS", result=result)
+
+    def _evict(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[:max(len(finished) - self.max_finished, 0)]:
+            del self._jobs[job_id]
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
@@ -1,29 +1,98 @@
-from flask import Flask, request, jsonify
-from bson import json_util
+from flask import Flask, Response, request, jsonify
 import pandas as pd
 import json
 import xml.etree.ElementTree as ET
 import pdfplumber
 import os
-import os
+import shutil
+import threading
+import time
 from factory import ParserFactory
+from parsers.parquet_parser import ParquetParser
+from normalize import CUSTOMER_ID_KEYS, canonical_keys, normalize_batch
+from error_records import attach_records, clear_errors, error_query, error_rollup, write_errors
+from indexes import ensure_indexes
+from jobs import Job, JobQueue
+from instrumentation import IngestMetrics, metrics_payload
+from audit_summary import build_summary, record_audit
+from audit_ids import get_allocator
+from ingestion_ledger import (
+    NATURAL_KEYS,
+    file_sha256,
+    find_ingested,
+    mark_finished,
+    mark_started,
+)
+from response_cache import ResponseCache, cached_response
+from response_encoding import EncoderJSONProvider, compress_response, json_response
+from pagination import MAX_PAGE_SIZE, find_page, page_args, stream_page
+from data_mart import (
+    DATA_MART_COLLECTION,
+    SOURCE_FIELD,
+    collection_page_pipeline,
+    customer_id_query,
+    customer_summary_pipeline,
+    parse_date_param,
+    pull_source,
+)
+from data_mart_buckets import (
+    BUCKET_COLLECTION,
+    DATA_MART_LAYOUT,
+    bucket_page_pipeline,
+    customer_exists,
+    customer_profile,
+    drop_source,
+    write_buckets,
+)
+from staging import STAGING_EXTENSIONS, stage_file, staging_path
+from watermarks import (WATERMARK_COLLECTION, DeltaPlan, RecordHasher, byte_prefix_plan, plan_delta, save_watermark,
+                        source_key)
 from mongo_writer import MongoWriter
 from flask_cors import CORS
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 from datetime import datetime
-from pydantic import ValidationError
 from validators.credit_card_transactions import CustomerCreditCardModel
 from validators.customers import CustomerModel
 from validators.retail_transactions import CustomerRetailModel
 from validators.trade_transactions import CustomerTradeModel
 from validators.upi_transactions import CustomerUPIModel
+from validators.validation_engine import get_engine
+from validators.prevalidation import validate_frame
 
 
 app = Flask(__name__)
+# jsonify and the streamed routes share one encoder: plain JSON, orjson when installed
+app.json = EncoderJSONProvider(app)
+app.after_request(compress_response)
 UPLOAD_FOLDER = "uploads"
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
+# Rows parsed, validated and inserted per batch; bounds memory for large uploads
+app.config["INGEST_CHUNK_SIZE"] = int(os.getenv("INGEST_CHUNK_SIZE", 10000))
+# Customer upserts sent per bulk_write call to the Data Mart
+app.config["DATA_MART_BATCH_SIZE"] = int(os.getenv("DATA_MART_BATCH_SIZE", 1000))
+# Most error records one /audits/errors?samples=true page reads back from their sources
+ERROR_SAMPLE_LIMIT = int(os.getenv("ERROR_SAMPLE_LIMIT", 100))
+
+# Serialized /fetch and /audits responses, invalidated by ingestion (see response_cache.py)
+response_cache = ResponseCache()
 CORS(app)
 
+
+def create_indexes():
+    try:
+        ensure_indexes(MongoWriter().db)
+    except Exception as e:
+        print(f"⚠️ Skipping index setup, MongoDB unavailable: {e}")
+
+
+# Create-only, so processes starting together never drop an index (rebuilds are `python indexes.py`);
+# in the background, so importing the app does not wait for MongoDB
+threading.Thread(target=create_indexes, name="create-indexes", daemon=True).start()
+
 # def convert_oid_to_str(obj):
 #     """
 #     Recursively converts {"$oid": "..."} objects to string in nested dicts/lists.
@@ -47,18 +116,6 @@ MODEL_MAPPING = {
     "Customer_UPI_Transactions": CustomerUPIModel
 }
 
-def remove_inner_ids(data):
-    """Recursively remove '_id' fields from dicts and lists"""
-    if isinstance(data, dict):
-        data.pop("_id", None)
-        for k, v in data.items():
-            data[k] = remove_inner_ids(v)
-    elif isinstance(data, list):
-        data = [remove_inner_ids(item) for item in data]
-    return data
-
-
-
 def parse_file(ext, file_path: str):
     # ext = os.path.splitext(file_path)[-1].lstrip(".").lower()
     parser = ParserFactory.get_parser(ext)
@@ -85,63 +142,53 @@ def get_collection_from_file(file_path: str) -> str:
     raise ValueError(f"No matching collection found for file: {file_name}")
 
 
-def keys_to_lower(obj):
-        """Recursively convert dict keys to lowercase"""
-        if isinstance(obj, dict):
-            return {str(k).lower(): keys_to_lower(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [keys_to_lower(i) for i in obj]
-        else:
-            return obj
+def store_in_mongo_warehouse_tables(file_path: str, parsed_data, frame=None, metrics: IngestMetrics = None,
+                                    source: str = None, first_row: int = 0):
+    """Validate a chunk, upsert its valid rows and record its failures.
 
-def store_in_mongo_warehouse_tables(file_path: str, parsed_data):
-    
+    Failures are stored as compact error records pointing at their row
+    (``first_row`` + index) in ``source``, the file the chunk was read from
+    (see error_records.py).
+    """
+    metrics = metrics or IngestMetrics()
     file_name = os.path.basename(file_path)
-    # Convert keys to lowercase
-    parsed_data_lower = [keys_to_lower(record) for record in parsed_data]
-    
-    parsed_data_lower = [remove_inner_ids(record) for record in parsed_data_lower]
     collection = get_collection_from_file(file_path)
-    model_cls = MODEL_MAPPING[collection]
     if collection not in MODEL_MAPPING:
         raise ValueError(f"No validator mapped for {file_name}")
-    # Remove _id if exists (to avoid duplicate key error)
-    for record in parsed_data_lower:
-        record.pop("_id", None)
-    results = {"file": file_name, "success": 0, "errors": 0, "error_records": [], "correct_records":[]}
-    for idx, record in enumerate(parsed_data_lower, start=1):
-        try:
-            model_cls(**record)
-            results["success"] += 1
-            results["correct_records"].append(
-                # "record_number": idx,
-                record
-            )
-        except ValidationError as e:
-            
-            invalid_fields = [err["loc"][0] for err in e.errors()]
-            results["errors"] += 1
-            results["error_records"].append({
-                # "record_number": idx,
-                "filename": file_name,
-                "record": record,
-                "invalid_fields": invalid_fields,
-                "errors": e.errors()
-            })
-    # return results
-    
-    # for record in results["correct_records"]:
-    #     record.pop("_id", None)
-        
-    # for record in results["error_records"]:
-    #     record.pop("_id", None)
-    """Insert parsed records into MongoDB"""
+    model_cls = MODEL_MAPPING[collection]
+    # Lowercase keys, map them to the validator's aliases and drop _id fields (to avoid duplicate key errors)
+    with metrics.stage("normalize") as stage:
+        parsed_data_lower, frame = normalize_batch(parsed_data, frame, model_cls)
+        stage.rows = len(parsed_data_lower)
+    # Validation is CPU bound, so it is sharded across the engine's process pool.
+    # Tabular chunks are checked column-wise first and only doubtful rows reach pydantic.
+    with metrics.stage("validate") as stage:
+        if frame is not None:
+            correct_records, failures = validate_frame(model_cls, frame, parsed_data_lower, get_engine())
+        else:
+            correct_records, failures = get_engine().validate(model_cls, parsed_data_lower)
+        stage.rows = len(parsed_data_lower)
     collection_name = get_collection_from_file(file_path)
     mongo = MongoWriter()
-    mongo.insert_records(collection_name, results["correct_records"])
-    mongo.insert_records("Error_Records", results["error_records"])
-    print(f"✅ Inserted {len(results["correct_records"])} records into '{collection_name}'")
-    return collection_name, results["correct_records"], len(results["correct_records"]), len(results["error_records"])
+    # Upserts on the natural key keep re-ingestion from duplicating rows
+    natural_key = NATURAL_KEYS.get(collection_name)
+    # Whatever type a chunk's parse guessed, keys are written as one type so later runs match them
+    correct_records = canonical_keys(correct_records, model_cls, [natural_key, *CUSTOMER_ID_KEYS])
+    with metrics.stage("warehouse_insert") as stage:
+        if natural_key:
+            write_stats = mongo.upsert_records(collection_name, correct_records, natural_key)
+        else:
+            write_stats = mongo.insert_records(collection_name, correct_records)
+        error_count = write_errors(mongo.db, file_name, source or file_path, first_row, failures)
+        stage.rows = len(correct_records) + error_count
+    failed_writes = []
+    if write_stats.get("failed_count"):
+        # Unordered upserts keep going past failures; record what was lost
+        failed_writes.append({"operations": len(correct_records), "failed_operations": write_stats["failed_count"],
+                              "error": write_stats["error"]})
+        print(f"⚠️ {write_stats['failed_count']} records could not be written to '{collection_name}': {write_stats['error']}")
+    print(f"✅ Inserted {len(correct_records)} records into '{collection_name}'")
+    return collection_name, correct_records, len(correct_records), error_count, failed_writes
 
 
 # def store_in_mongo(file_path: str, parsed_data):
@@ -184,8 +231,24 @@ def store_in_mongo_warehouse_tables(file_path: str, parsed_data):
 #     return collection_name, len(parsed_data)
 
 
+def invalidate_customers(collection_name: str, customer_ids):
+    """Drop cached /fetch responses built from these customers' Data Mart records.
+
+    Called after the writes, so a response built during them is not cached.
+    """
+    response_cache.invalidate("data_mart", *(
+        tag for customer_id in customer_ids
+        for tag in (f"customer:{customer_id}", f"customer:{customer_id}:{collection_name}")
+    ))
+
+
 def store_in_mongo_data_mart(file_path: str, parsed_data: list):
-    """Insert parsed records into Data Mart collection grouped by customer_id"""
+    """Insert parsed records into Data Mart collection grouped by customer_id
+
+    Embedded records are tagged with their file (``SOURCE_FIELD``) so that a
+    file ingested again from its first row can pull them first (see
+    ``ingest_file``).
+    """
 
     # Step 1: detect which collection type this data came from
     collection_name = get_collection_from_file(file_path)
@@ -193,23 +256,281 @@ def store_in_mongo_data_mart(file_path: str, parsed_data: list):
 
     data_mart_collection = "Customer"
 
+    # Step 2: group records per customer so each customer costs one write
+    grouped = {}
+    skipped = 0
     for record in parsed_data:
         customer_id = record.get("Customer_ID") or record.get("customer_id") or record.get("CUST_ID") or record.get("cust_id")
         if not customer_id:
-            print("⚠️ Skipping record: no Customer_ID found")
+            skipped += 1
             continue
-
-        # Step 2: Insert into the unified DataMart structure
-        mongo.db[data_mart_collection].update_one(
+        grouped.setdefault(customer_id, []).append(record)
+
+    if skipped:
+        print(f"⚠️ Skipped {skipped} records: no Customer_ID found")
+
+    if DATA_MART_LAYOUT == "bucketed":
+        stats = {
+            "records": len(parsed_data) - skipped,
+            "skipped": skipped,
+            "customers": len(grouped),
+            **write_buckets(mongo.db, collection_name, os.path.basename(file_path), grouped,
+                            app.config["DATA_MART_BATCH_SIZE"])
+        }
+        invalidate_customers(collection_name, grouped)
+        print(f"✅ Inserted {stats['records']} records for {stats['customers']} customers into Data Mart buckets under '{collection_name}'")
+        return collection_name, stats
+
+    # Step 3: push each customer's records in unordered bulk batches.
+    # $push appends without comparing against the array; re-runs pull the old copies first.
+    source = os.path.basename(file_path)
+    operations = [
+        UpdateOne(
             {"customer_id": customer_id},
-            {
-                "$push": {f"collections.{collection_name}": record}
-            },
+            {"$push": {f"collections.{collection_name}": {"$each": [
+                {**record, SOURCE_FIELD: source} for record in records
+            ]}}},
             upsert=True
         )
+        for customer_id, records in grouped.items()
+    ]
+    stats = {
+        "records": len(parsed_data) - skipped,
+        "skipped": skipped,
+        "customers": len(grouped),
+        "batches": 0,
+        "upserted": 0,
+        "modified": 0,
+        "failed_batches": [],
+        "seconds": 0.0
+    }
+    batch_size = app.config["DATA_MART_BATCH_SIZE"]
+    started = time.perf_counter()
+    for batch_no, start in enumerate(range(0, len(operations), batch_size)):
+        batch = operations[start:start + batch_size]
+        stats["batches"] += 1
+        try:
+            result = mongo.db[data_mart_collection].bulk_write(batch, ordered=False)
+            stats["upserted"] += result.upserted_count
+            stats["modified"] += result.modified_count
+        except BulkWriteError as e:
+            # Unordered batches keep going past failures; record what was lost
+            details = e.details
+            stats["upserted"] += details.get("nUpserted", 0)
+            stats["modified"] += details.get("nModified", 0)
+            failed_ops = details.get("writeErrors", [])
+            stats["failed_batches"].append({
+                "batch": batch_no,
+                "operations": len(batch),
+                "failed_operations": len(failed_ops),
+                "error": failed_ops[0]["errmsg"] if failed_ops else str(e)
+            })
+    stats["seconds"] = time.perf_counter() - started
+    invalidate_customers(collection_name, grouped)
+
+    print(f"✅ Inserted {stats['records']} records for {stats['customers']} customers into Data Mart under '{collection_name}'")
+    return collection_name, stats
+
+
+def _throughput(records: int, seconds: float) -> dict:
+    return {
+        "records": records,
+        "seconds": round(seconds, 3),
+        "records_per_sec": round(records / seconds, 1) if seconds > 0 else None
+    }
+
+
+def ingest_file(ext, file_path: str, progress=None, content_hash: str = None, full: bool = False,
+                metrics: IngestMetrics = None):
+    """Stream a file through validation, warehouse and data mart inserts chunk by chunk.
+
+    Only one chunk of parsed records is alive at a time, so memory stays flat
+    regardless of the file size. ``progress(stage, totals)`` is called as each
+    chunk moves through the pipeline. Records already ingested from an earlier
+    upload of the same source are skipped (see watermarks.py) unless ``full``.
+    Uploads with a ``content_hash`` are parsed once into a staged Parquet copy
+    (see staging.py) and every run over the same content reads that copy.
+    Each stage's timings are added to ``metrics`` (see instrumentation.py).
+    """
+    progress = progress or (lambda stage, totals: None)
+    metrics = metrics or IngestMetrics(ext.upper())
+    parser = ParserFactory.get_parser(ext)
+    collection_name = get_collection_from_file(file_path)
+    chunk_size = app.config["INGEST_CHUNK_SIZE"]
+    db = MongoWriter().db
+    warehouse_seconds = 0.0
+    warehouse_failed = []
+    data_mart = {"records": 0, "customers": 0, "seconds": 0.0, "failed_batches": []}
+
+    # An unchanged byte prefix lets a parser that seeks (CSV) read only the appended bytes of the upload
+    plan = None
+    if not full and parser.seeks_bytes:
+        with metrics.stage("delta_check"):
+            plan = byte_prefix_plan(db, file_path)
+
+    # Otherwise parse the upload once into its staged Parquet copy (keyed by content), then read that
+    source = file_path
+    if plan is None and content_hash and ext in STAGING_EXTENSIONS:
+        staged = staging_path(content_hash)
+        if not os.path.exists(staged):
+            progress("staging", {"processed_rows": 0, "correct_rows": 0, "error_rows": 0, "skipped_rows": 0})
+            with metrics.stage("staging") as stage:
+                staged_stats = stage_file(parser, file_path, staged, MODEL_MAPPING.get(collection_name), chunk_size, ext)
+                stage.rows = staged_stats["rows"]
+            print(f"📦 Staged {staged_stats['rows']} rows of '{os.path.basename(file_path)}' as Parquet ({staged_stats['bytes']} bytes)")
+        if os.path.exists(staged):  # an empty upload stages nothing
+            parser, source = ParquetParser(), staged
+
+    if plan is None:
+        progress("checking watermark", {"processed_rows": 0, "correct_rows": 0, "error_rows": 0, "skipped_rows": 0})
+        with metrics.stage("delta_check"):
+            plan = DeltaPlan(reason="full reload requested", hasher=RecordHasher()) if full else plan_delta(db, file_path, parser, chunk_size, source)
+    totals = {"processed_rows": 0, "correct_rows": 0, "error_rows": 0, "skipped_rows": plan.skip_rows}
+    if plan.skip_rows:
+        print(f"⏩ Skipping {plan.skip_rows} already ingested rows of '{os.path.basename(file_path)}' ({plan.reason})")
+    else:
+        # Error records from an earlier run of this file are replaced, not added to
+        clear_errors(db, os.path.basename(file_path))
+        if DATA_MART_LAYOUT == "bucketed":
+            # Buckets are appended to, not deduplicated, so a full run starts clean
+            drop_source(db, os.path.basename(file_path))
+            response_cache.clear()
+        elif db[WATERMARK_COLLECTION].find_one({"_id": source_key(file_path)}, {"_id": 1}) is not None:
+            # Embedded arrays are appended to with $push: a source seen before pulls its records once, up front
+            pull_source(db, collection_name, os.path.basename(file_path))
+            response_cache.clear()
+
+    progress("parsing", totals)
+    if plan.skip_bytes and source == file_path:
+        batches = parser.iter_tail(source, chunk_size, plan.skip_rows, plan.skip_bytes)
+    else:
+        batches = parser.iter_batches(source, chunk_size, plan.skip_rows)
+    for chunk, frame in metrics.iterate("parse", batches, rows=lambda batch: len(batch[0])):
+        if plan.hasher:
+            plan.hasher.update(chunk)
+        progress("validating", totals)
+        started = time.perf_counter()
+        _, correct_records, correct_count, error_count, failed_writes = store_in_mongo_warehouse_tables(
+            file_path, chunk, frame, metrics, source, plan.skip_rows + totals["processed_rows"])
+        warehouse_seconds += time.perf_counter() - started
+        warehouse_failed.extend(failed_writes)
+
+        progress("data_mart", totals)
+        with metrics.stage("data_mart_upsert") as stage:
+            _, mart_stats = store_in_mongo_data_mart(file_path, correct_records)
+            stage.rows = mart_stats["records"]
+        data_mart["records"] += mart_stats["records"]
+        data_mart["customers"] += mart_stats["customers"]
+        data_mart["seconds"] += mart_stats["seconds"]
+        data_mart["failed_batches"].extend(mart_stats["failed_batches"])
+
+        totals["processed_rows"] += len(chunk)
+        totals["correct_rows"] += correct_count
+        totals["error_rows"] += error_count
+        progress("parsing", totals)
+
+    save_watermark(
+        db, file_path,
+        rows=plan.skip_rows + totals["processed_rows"],
+        file_sha256=content_hash or file_sha256(file_path),
+        rows_sha256=plan.hasher.hexdigest() if plan.hasher else None,
+        hash_boundaries=plan.hasher.boundaries if plan.hasher else None
+    )
+    totals["delta"] = plan.reason
+
+    totals["throughput"] = {
+        collection_name: {
+            "warehouse": {
+                **_throughput(totals["processed_rows"], warehouse_seconds),
+                "failed_writes": warehouse_failed
+            },
+            "data_mart": {
+                **_throughput(data_mart["records"], data_mart["seconds"]),
+                "customers": data_mart["customers"],
+                "failed_batches": data_mart["failed_batches"]
+            }
+        }
+    }
+    return collection_name, totals
+
+
+def run_ingest_job(job: Job):
+    """Worker entry point: ingest a queued upload and keep its Audit record current"""
+    job.metrics = job.metrics or IngestMetrics(job.ext.upper())
+    audit = MongoWriter().db["Audit"]
+    audit.update_one({"audit_id": job.audit_id}, {"$set": {
+        "status": "IN_PROGRESS",
+        "comments": "Processing",
+        "started_at": job.started_at.isoformat()
+    }})
+    response_cache.invalidate("audits")
+    estimate = None
+
+    def progress(stage, totals):
+        rows_changed = totals["processed_rows"] != job.rows_processed
+        skipped_changed = totals["skipped_rows"] != job.skipped_rows
+        job.update(
+            stage=stage,
+            rows_processed=totals["processed_rows"],
+            error_rows=totals["error_rows"],
+            skipped_rows=totals["skipped_rows"],
+            total_rows=max(estimate - totals["skipped_rows"], 0) if estimate is not None else None
+        )
+        if rows_changed or skipped_changed:
+            audit.update_one({"audit_id": job.audit_id}, {"$set": {
+                "processed_rows": totals["processed_rows"],
+                "error_rows": totals["error_rows"],
+                "skipped_rows": totals["skipped_rows"]
+            }})
+            response_cache.invalidate("audits")
 
-    print(f"✅ Inserted {len(parsed_data)} records into Data Mart under '{collection_name}'")
-    return collection_name, len(parsed_data)
+    try:
+        # Inside the try: a corrupt file can fail here, and must still end as a FAILED audit
+        if job.content_hash:
+            mark_started(audit.database, job.content_hash, job.file_name, job.audit_id, os.path.getsize(job.file_path))
+        estimate = ParserFactory.get_parser(job.ext).estimate_rows(job.file_path)
+        job.update(total_rows=estimate)
+        collection_name, totals = ingest_file(job.ext, job.file_path, progress, job.content_hash, job.force,
+                                              job.metrics)
+    except Exception as e:
+        finished_at = datetime.now()
+        audit.update_one({"audit_id": job.audit_id}, {"$set": {
+            "status": "FAILED",
+            "comments": str(e),
+            "stages": job.metrics.summary(),
+            "finished_at": finished_at.isoformat()
+        }})
+        job.metrics.observe("FAILED")
+        record_audit(audit.database, job.ext.upper(), "FAILED", job.rows_processed, job.error_rows,
+                     (finished_at - job.started_at).total_seconds(), finished_at)
+        response_cache.invalidate("audits")
+        if job.content_hash:
+            mark_finished(audit.database, job.content_hash, "FAILED")
+        raise
+
+    finished_at = datetime.now()
+    audit.update_one({"audit_id": job.audit_id}, {"$set": {
+        "status": "SUCCESS",
+        "processed_rows": totals["processed_rows"],
+        "error_rows": totals["error_rows"],
+        "skipped_rows": totals["skipped_rows"],
+        "comments": (
+            f"Processed {totals['processed_rows']} new rows, skipped {totals['skipped_rows']} already ingested"
+            if totals["skipped_rows"] else "File processed successfully"
+        ),
+        "stages": job.metrics.summary(),
+        "finished_at": finished_at.isoformat()
+    }})
+    job.metrics.observe("SUCCESS")
+    record_audit(audit.database, job.ext.upper(), "SUCCESS", totals["processed_rows"], totals["error_rows"],
+                 (finished_at - job.started_at).total_seconds(), finished_at)
+    response_cache.invalidate("audits")
+    if job.content_hash:
+        mark_finished(audit.database, job.content_hash, "SUCCESS", collection_name, totals)
+    return {"collection": collection_name, **totals}
+
+
+ingest_queue = JobQueue(run_ingest_job)
 
 
 # def parse_csv(file_path):
@@ -253,9 +574,47 @@ def store_in_mongo_data_mart(file_path: str, parsed_data: list):
 #     return parsed_data
 
 
+def skip_unchanged_upload(job: Job, previous: dict):
+    """Record an upload whose content is already in the warehouse, without ingesting it again"""
+    shutil.rmtree(os.path.dirname(job.file_path), ignore_errors=True)
+    now = datetime.now()
+    audit_id = get_next_audit_id()
+    db = MongoWriter().db
+    db["Audit"].insert_one({
+        "audit_id": audit_id,
+        "file_name": job.file_name,
+        "file_type": job.ext.upper(),
+        "file_size": round(previous.get("file_size", 0) / (1024 * 1024), 2),  # in MB
+        "content_hash": job.content_hash,
+        "duplicate_of": previous.get("audit_id"),
+        "status": "SUCCESS",
+        "processed_rows": 0,
+        "error_rows": 0,
+        "skipped_rows": previous.get("processed_rows"),
+        "comments": f"Unchanged file, already ingested as audit {previous.get('audit_id')}",
+        "stages": job.metrics.summary(),
+        "started_at": now.isoformat(),
+        "finished_at": now.isoformat()
+    })
+    record_audit(db, job.ext.upper(), "SUCCESS", 0, 0, 0.0, now)
+    job.metrics.observe("UNCHANGED")
+    response_cache.invalidate("audits")
+    print(f"⏭️ Skipped '{job.file_name}': content already ingested as audit {previous.get('audit_id')}")
+    return jsonify({
+        "status": "unchanged",
+        "audit_id": audit_id,
+        "duplicate_of": previous.get("audit_id"),
+        "content_hash": job.content_hash
+    }), 200
+
+
 @app.route("/upload", methods=["POST"])
 def upload_file():
-    """Upload and parse file based on extension"""
+    """Save the uploaded file and queue it for ingestion; progress is served by /jobs/<id>
+
+    Files whose exact content was already ingested are not processed again
+    unless ``?force=true`` is given.
+    """
     if "file" not in request.files:
         return jsonify({"error": "No file uploaded"}), 400
 
@@ -264,59 +623,56 @@ def upload_file():
     if file.filename == "":
         return jsonify({"error": "Empty filename"}), 400
 
-    file_path = os.path.join(app.config["UPLOAD_FOLDER"], file.filename)
-    file.save(file_path)
-
     # Determine file type by extension
     ext = file.filename.rsplit(".", 1)[-1].lower()
-    
-    results = {"file": file.filename, "success": 0, "errors": 0, "error_details": []}
+    try:
+        ParserFactory.get_parser(ext)
+    except ValueError:
+        return jsonify({"error": f"Unsupported file type: {ext}"}), 400
+
+    # Each job gets its own folder so concurrent uploads of one file name don't clash
+    job = Job(file_path=None, file_name=file.filename, ext=ext)
+    job.metrics = IngestMetrics(ext.upper())
+    job_folder = os.path.join(app.config["UPLOAD_FOLDER"], job.id)
 
     try:
-        # if ext == "csv":
-        #     parsed = parse_csv(file_path)
-        # elif ext in ["xls", "xlsx"]:
-        #     parsed = parse_excel(file_path)
-        # elif ext == "json":
-        #     parsed = parse_json(file_path)
-        # elif ext == "xml":
-        #     parsed = parse_xml(file_path)
-        # elif ext == "pdf":
-        #     parsed = parse_pdf(file_path)
-        # else:
-        #     return jsonify({"error": f"Unsupported file type: {ext}"}), 400
-        parsed = parse_file(ext, file_path)
-        #print(parsed)
-        collection_name, correct_records, correct_count, error_count = store_in_mongo_warehouse_tables(file_path, parsed)
-        collection_name, inserted_count = store_in_mongo_data_mart(file_path, correct_records)
-        
-        audit_record = {
-            "audit_id": get_next_audit_id(), 
-            "file_name": file.filename,
-            "file_type": ext.upper(),
-            "file_size": round(os.path.getsize(file_path) / (1024 * 1024), 2),  # in MB
-            "status": "SUCCESS",
-            "processed_rows": len(parsed),
-            "error_rows": error_count,  # implement function if needed
-            "comments": "File processed successfully",
-            "started_at": datetime.now().isoformat(),  # you can track actual start & end if needed
-            "finished_at": datetime.now().isoformat()
-        }
+        os.makedirs(job_folder, exist_ok=True)
+        job.file_path = os.path.join(job_folder, file.filename)
+        with job.metrics.stage("save"):
+            file.save(job.file_path)
+            job.content_hash = file_sha256(job.file_path)
 
         mongo = MongoWriter()
-        # Insert audit record into MongoDB
-        mongo.db["Audit"].insert_one(audit_record)
-        return jsonify({
-            "status": "success"
-        }), 200
+        force = request.args.get("force", "").lower() in ("1", "true", "yes")
+        job.force = force
+        previous = None if force else find_ingested(mongo.db, job.content_hash)
+        if previous:
+            return skip_unchanged_upload(job, previous)
 
-    # # except Exception as e:
-    # #     return jsonify({
-    # #         "status": "error"
-    # #     }), 500
-    # #     # Create audit record
-        
-    #     return jsonify(), 202
+        job.audit_id = get_next_audit_id()
+        mongo.db["Audit"].insert_one({
+            "audit_id": job.audit_id,
+            "job_id": job.id,
+            "file_name": file.filename,
+            "file_type": ext.upper(),
+            "file_size": round(os.path.getsize(job.file_path) / (1024 * 1024), 2),  # in MB
+            "content_hash": job.content_hash,
+            "status": "PENDING",
+            "processed_rows": 0,
+            "error_rows": 0,
+            "skipped_rows": 0,
+            "comments": "Queued for processing",
+            "started_at": None,
+            "finished_at": None
+        })
+        response_cache.invalidate("audits")
+        ingest_queue.submit(job)
+        return jsonify({
+            "status": "queued",
+            "job_id": job.id,
+            "audit_id": job.audit_id,
+            "status_url": f"/jobs/{job.id}"
+        }), 202
 
     except Exception as e:
         mongo = MongoWriter()
@@ -332,182 +688,273 @@ def upload_file():
             "started_at": datetime.now().isoformat(),
             "finished_at": datetime.now().isoformat()
         })
+        record_audit(mongo.db, ext.upper(), "FAILED")
+        response_cache.invalidate("audits")
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/jobs/<job_id>", methods=["GET"])
+def fetch_job(job_id):
+    """Stage, row counts, rows/sec and ETA of an ingestion job"""
+    job = ingest_queue.get(job_id)
+    if job:
+        return jsonify(job.to_dict()), 200
+
+    # Job ran in another worker process or was evicted; the Audit record still tells its outcome
+    audit = MongoWriter().db["Audit"].find_one({"job_id": job_id}, {"_id": 0})
+    if not audit:
+        return jsonify({"error": f"No job found with id {job_id}"}), 404
+    return jsonify({
+        "job_id": job_id,
+        "audit_id": audit.get("audit_id"),
+        "file_name": audit.get("file_name"),
+        "status": audit.get("status"),
+        "rows_processed": audit.get("processed_rows"),
+        "error_rows": audit.get("error_rows"),
+        "started_at": audit.get("started_at"),
+        "finished_at": audit.get("finished_at")
+    }), 200
+
+
 def get_next_audit_id():
-    mongo = MongoWriter()
-        
-    last = mongo.db["Audit"].find_one(sort=[("audit_id", -1)])
-    return (last["audit_id"] + 1) if last else 1001
+    return get_allocator(MongoWriter().db).next_id()
+
+
+@app.route("/health", methods=["GET"])
+def health():
+    """Report MongoDB reachability and shared connection pool usage"""
+    stats = MongoWriter.pool_stats()
+    try:
+        MongoWriter().ping()
+        return jsonify({"status": "ok", "mongo": stats, "response_cache": response_cache.stats()}), 200
+    except Exception as e:
+        return jsonify({"status": "unavailable", "error": str(e), "mongo": stats, "response_cache": response_cache.stats()}), 503
+
 
-def count_errors(parsed_data):
-    return sum(1 for row in parsed_data if row.get("error"))
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Ingestion stage metrics in the Prometheus text format"""
+    payload = metrics_payload()
+    if payload is None:
+        return jsonify({"error": "prometheus_client is not installed"}), 503
+    body, content_type = payload
+    return Response(body, content_type=content_type)
 
 
 @app.route("/fetch", methods=["GET"])
+@cached_response(response_cache, lambda: ["data_mart"])
 def fetch_all_customer_data():
+    """Stream Data Mart customer documents, paginated by _id"""
+    try:
+        page = page_args(request.args, "_id", default_limit=100)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     try:
         mongo = MongoWriter()
         data_mart = mongo.db["Customer"]
+        return stream_page(find_page(data_mart, {}, page), page)
 
-        # Query by customer_id
-        customer_doc = data_mart.find({})
-
-        # if not customer_doc:
-        #     return jsonify({"error": f"No data found for customer_id {customer_id}"}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-        # Convert ObjectId to string for JSON serialization
-        # customer_doc["_id"] = str(customer_doc["_id"])
-        # if "collections" in customer_doc:
-        #     customer_doc["collections"].pop("Audit", None)
-        #     customer_doc["collections"].pop("Error_Log", None)
-        
 
+TRANSACTION_COLLECTIONS = ["upi", "credit", "trade", "retail"]
 
-        # Check if frontend requested a specific collection
-        # collection_key = request.args.get("collection")  # e.g., "credit"
-        # if collection_key:
-        #     # Map short keys → full collection names
-        #     collection_map = {
-        #         "upi": "Customer_UPI_Transactions",
-        #         "credit": "Customer_Credit_Card_Transactions",
-        #         "trade": "Customer_Trade",
-        #         "retail": "Customer_Retails_Transactions",
-        #         "customer": "Customer",
-        #         "audit": "Audit",
-        #         "error": "Error_Log"
-        #     }
-            
-            
-
-            # mapped_collection = collection_map.get(collection_key.lower())
-            # if not mapped_collection:
-            #     return jsonify({"error": f"Invalid collection key: {collection_key}"}), 400
-
-            # # Return only that collection data if available
-            # collections_data = customer_doc.get("collections", {})
-            # selected_data = collections_data.get(mapped_collection, [])
-            # # selected_data = convert_oid_to_str(selected_data)
-
-        return json_util.dumps({
-            customer_doc
-        }), 200
-
-        # If no collection filter → return whole customer doc
-        # return json_util.dumps(selected_data), 200
 
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
-    
+def _customer_tags(customer_id):
+    collection_key = (request.args.get("collection") or "").lower()
+    if collection_key in FILE_COLLECTION_MAP:
+        return [f"customer:{customer_id}:{FILE_COLLECTION_MAP[collection_key]}"]
+    return [f"customer:{customer_id}"]
 
 
 @app.route("/fetch/<customer_id>", methods=["GET"])
+@cached_response(response_cache, _customer_tags)
 def fetch_customer_data(customer_id):
-    """Fetch all data for a given customer_id from Data Mart House"""
+    """Fetch one page of a customer's records for a single collection from the Data Mart.
+
+    Query parameters: collection (upi, credit, trade, retail), offset, limit,
+    from / to (ISO dates) and sort (record field, "-" prefix for descending,
+    "date" for the transaction date). Without a collection the customer
+    profile is returned with per-collection record counts.
+    """
     try:
-        mongo = MongoWriter()
-        data_mart = mongo.db["Customer"]
+        offset = max(int(request.args.get("offset", 0)), 0)
+        limit = max(1, min(int(request.args.get("limit", 100)), MAX_PAGE_SIZE))
+        date_from = request.args.get("from")
+        date_to = request.args.get("to")
+        date_from = parse_date_param(date_from) if date_from else None
+        date_to = parse_date_param(date_to) if date_to else None
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-        # Query by customer_id
-        customer_doc = data_mart.find_one({"customer_id": customer_id})
+    try:
+        mongo = MongoWriter()
+        data_mart = mongo.db[DATA_MART_COLLECTION]
 
-        if not customer_doc:
+        # Indexed existence check, so a missing customer is a 404 rather than an empty page
+        bucketed = DATA_MART_LAYOUT == "bucketed"
+        exists = customer_exists(mongo.db, customer_id) if bucketed else data_mart.find_one(customer_id_query(customer_id), {"_id": 1})
+        if not exists:
             return jsonify({"error": f"No data found for customer_id {customer_id}"}), 404
 
-        # Convert ObjectId to string for JSON serialization
-        # customer_doc["_id"] = str(customer_doc["_id"])
-        # if "collections" in customer_doc:
-        #     customer_doc["collections"].pop("Audit", None)
-        #     customer_doc["collections"].pop("Error_Log", None)
-        
-
-
         # Check if frontend requested a specific collection
         collection_key = request.args.get("collection")  # e.g., "credit"
-        if collection_key:
-            # Map short keys → full collection names
-            collection_map = {
-                "upi": "Customer_UPI_Transactions",
-                "credit": "Customer_Credit_Card_Transactions",
-                "trade": "Customer_Trade",
-                "retail": "Customer_Retails_Transactions",
-                "customer": "Customer",
-                "audit": "Audit",
-                "error": "Error_Log"
-            }
-            
-            
-
-            mapped_collection = collection_map.get(collection_key.lower())
-            if not mapped_collection:
-                return jsonify({"error": f"Invalid collection key: {collection_key}"}), 400
-
-            # Return only that collection data if available
-            collections_data = customer_doc.get("collections", {})
-            selected_data = collections_data.get(mapped_collection, [])
-            # selected_data = convert_oid_to_str(selected_data)
+        if not collection_key:
+            names = [FILE_COLLECTION_MAP[key] for key in TRANSACTION_COLLECTIONS]
+            if bucketed:
+                customer_doc = customer_profile(mongo.db, customer_id, names)
+            else:
+                customer_doc = next(data_mart.aggregate(customer_summary_pipeline(customer_id, names)), None)
+            return json_response(customer_doc)
+
+        if collection_key.lower() not in TRANSACTION_COLLECTIONS:
+            return jsonify({"error": f"Invalid collection key: {collection_key}"}), 400
+        mapped_collection = FILE_COLLECTION_MAP[collection_key.lower()]
 
-            return json_util.dumps({
-                "customer_id": customer_id,
-                "collection": mapped_collection,
-                "records": selected_data
-            }), 200
-
-        # If no collection filter → return whole customer doc
-        return json_util.dumps(selected_data), 200
+        try:
+            page_pipeline = bucket_page_pipeline if bucketed else collection_page_pipeline
+            pipeline = page_pipeline(
+                customer_id, mapped_collection, offset=offset, limit=limit,
+                date_from=date_from, date_to=date_to, sort=request.args.get("sort")
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        source = mongo.db[BUCKET_COLLECTION] if bucketed else data_mart
+        result = next(source.aggregate(pipeline), {"total": [], "records": []})
+        total = result["total"][0]["count"] if result["total"] else 0
+
+        return json_response({
+            "customer_id": customer_id,
+            "collection": mapped_collection,
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+            "records": result["records"]
+        })
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     
+def _model_for_file(file_name):
+    try:
+        return MODEL_MAPPING.get(get_collection_from_file(file_name))
+    except ValueError:
+        return None
+
+
+def _stringify_id(doc):
+    doc["_id"] = str(doc["_id"])  # Convert ObjectId → string
+    return doc
+
+
 @app.route("/audits", methods=["GET"])
+@cached_response(response_cache, lambda: ["audits"])
 def fetch_audit_data():
-    """Fetch all audit records from the Audit collection"""
+    """Stream audit records in audit_id order; page with ?after=<audit_id>&limit=<n> (100 by default)"""
+    try:
+        page = page_args(request.args, "audit_id", default_limit=100)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     try:
         mongo = MongoWriter()
         audit_collection = mongo.db["Audit"]
+        return stream_page(find_page(audit_collection, {}, page), page, prepare=_stringify_id)
 
-        # Fetch all audits
-        audits_cursor = audit_collection.find()
-
-        # Convert cursor to list & handle ObjectId serialization
-        audits = []
-        for doc in audits_cursor:
-            doc["_id"] = str(doc["_id"])  # Convert ObjectId to string
-            audits.append(doc)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-        return json_util.dumps(audits), 200
+@app.route("/audits/summary", methods=["GET"])
+@cached_response(response_cache, lambda: ["audits"])
+def fetch_audit_summary():
+    """Status counts, error rates and processing-time percentiles by file type and time bucket"""
+    try:
+        interval = request.args.get("interval", "day")
+        date_from = request.args.get("from")
+        date_to = request.args.get("to")
+        date_from = parse_date_param(date_from) if date_from else None
+        date_to = parse_date_param(date_to) if date_to else None
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
+    try:
+        return jsonify(build_summary(MongoWriter().db, interval, date_from, date_to)), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @app.route("/audits/errors", methods=["GET"])
 def fetch_audit_errors():
+    """Error records or per-file error rollups; see the README for the query parameters.
+
+    ``?view=rollup`` returns each file's error counts by field and error type.
+    Records can be narrowed to one ``field`` and/or error ``type``; with
+    ``samples=true`` each record's row is read back from its source.
+    """
+    view = request.args.get("view", "records").lower()
+    if view not in ("records", "rollup"):
+        return jsonify({"error": f"Unsupported view: {view}"}), 400
+    samples = request.args.get("samples", "").lower() in ("1", "true", "yes")
+    try:
+        page = page_args(request.args, "_id", default_limit=ERROR_SAMPLE_LIMIT if samples else 500)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     try:
         mongo = MongoWriter()
-        error_collection = mongo.db["Error_Records"]
+        file_name = request.args.get("file_name")
+        not_found = {"message": f"No error records found for file: {file_name}" if file_name else "No error records found"}
 
-        # Find all error records for that file
-        error_cursor = error_collection.find({})
+        if view == "rollup":
+            files = error_rollup(mongo.db, file_name)
+            if not files:
+                return jsonify(not_found), 404
+            return jsonify({"files": files}), 200
 
-        errors = []
-        for doc in error_cursor:
-            doc["_id"] = str(doc["_id"])  # Convert ObjectId → string
-            errors.append(doc)
+        error_collection = mongo.db["Error_Records"]
+        query = error_query(file_name, request.args.get("field"), request.args.get("type"))
+        error_count = error_collection.count_documents(query) if query else error_collection.estimated_document_count()
+
+        if not error_count:
+            return jsonify(not_found), 404
+
+        if samples:
+            page["limit"] = min(page["limit"], ERROR_SAMPLE_LIMIT)
+        cursor = find_page(error_collection, query, page)
+        if samples:
+            # Rows are read back from their sources for this page only
+            cursor = attach_records(cursor, _model_for_file)
+        return stream_page(
+            cursor,
+            page,
+            prepare=_stringify_id,
+            envelope=({"error_count": error_count}, "error_records")
+        )
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-        if not errors:
-            return jsonify({"message": f"No error records found for file: {file_name}"}), 404
 
-        return json_util.dumps({
-            # "file_name": file_name,
-            "error_count": len(errors),
-            "error_records": errors
-        }), 200
+@app.route("/audits/errors/<error_id>", methods=["GET"])
+def fetch_audit_error(error_id):
+    """One error record with its row read back from its source as ``record`` (drill-down)"""
+    try:
+        error_id = ObjectId(error_id)
+    except (InvalidId, TypeError):
+        return jsonify({"error": f"Invalid error record id: {error_id}"}), 400
 
+    try:
+        doc = MongoWriter().db["Error_Records"].find_one({"_id": error_id})
+        if not doc:
+            return jsonify({"error": f"No error record found with id {error_id}"}), 404
+        return jsonify(_stringify_id(attach_records([doc], _model_for_file)[0])), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-
 if __name__ == "__main__":
     app.run(debug=True)
 
@@ -1,10 +1,102 @@
-from pymongo import MongoClient
+import os
+import threading
+from pymongo import InsertOne, MongoClient, UpdateOne, monitoring
+from pymongo.errors import BulkWriteError
 from datetime import datetime
 
+# Connection settings, overridable per deployment
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+MONGO_DB = os.getenv("MONGO_DB", "BNP_DB")
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", 100))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", 0))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", 5000))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", 0)) or None
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", 0)) or None
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """Counts connection pool events so pool usage can be reported."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.created = 0
+        self.closed = 0
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.pool_clears = 0
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "open_connections": self.created - self.closed,
+                "in_use": self.checked_out,
+                "max_in_use": self.max_checked_out,
+                "connections_created": self.created,
+                "connections_closed": self.closed,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "pool_clears": self.pool_clears,
+            }
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self._lock:
+            self.created += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.closed += 1
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+
 class MongoWriter:
-    def __init__(self, uri="mongodb://localhost:27017", db_name="BNP_DB"):
-        self.client = MongoClient(uri)
-        self.db = self.client[db_name]
+    # One pooled MongoClient per URI, shared by every MongoWriter in this process
+    _clients = {}
+    _pool_stats = {}
+    _pid = os.getpid()
+    _lock = threading.Lock()
+
+    def __init__(self, uri=None, db_name=None, client=None):
+        # ``client`` substitutes a ready client (e.g. mongomock in benchmarks) for the shared pool
+        self.client = client if client is not None else self.get_client(uri or MONGO_URI)
+        self.db = self.client[db_name or MONGO_DB]
 
         self.collection_map = {
             "credit": "Customer_Credit_Card_Transactions",
@@ -16,6 +108,66 @@ class MongoWriter:
             "error_records":"Error_Records"
         }
 
+    @classmethod
+    def get_client(cls, uri: str) -> MongoClient:
+        """Return the process-wide client for ``uri``, creating it on first use."""
+        with cls._lock:
+            # MongoClient is not fork-safe: a forked worker must build its own pool
+            if cls._pid != os.getpid():
+                cls._reset()
+            client = cls._clients.get(uri)
+            if client is None:
+                stats = PoolStats()
+                client = MongoClient(
+                    uri,
+                    maxPoolSize=MONGO_MAX_POOL_SIZE,
+                    minPoolSize=MONGO_MIN_POOL_SIZE,
+                    connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+                    serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+                    socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+                    waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+                    event_listeners=[stats],
+                )
+                cls._clients[uri] = client
+                cls._pool_stats[uri] = stats
+            return client
+
+    @classmethod
+    def _reset(cls):
+        # Inherited clients belong to the parent; drop them without closing its sockets
+        cls._clients = {}
+        cls._pool_stats = {}
+        cls._pid = os.getpid()
+
+    @classmethod
+    def _after_fork(cls):
+        # The parent's lock may have been held mid-fork, so it cannot be reused
+        cls._lock = threading.Lock()
+        cls._reset()
+
+    @classmethod
+    def close_all(cls):
+        with cls._lock:
+            for client in cls._clients.values():
+                client.close()
+            cls._reset()
+
+    @classmethod
+    def pool_stats(cls):
+        """Pool configuration and usage counters for every shared client."""
+        with cls._lock:
+            stats = dict(cls._pool_stats)
+        return {
+            "pid": os.getpid(),
+            "max_pool_size": MONGO_MAX_POOL_SIZE,
+            "min_pool_size": MONGO_MIN_POOL_SIZE,
+            "clients": len(stats),
+            "pools": [s.snapshot() for s in stats.values()],
+        }
+
+    def ping(self):
+        return self.client.admin.command("ping")
+
     def get_collection(self, file_name: str):
         for key, collection in self.collection_map.items():
             if key.lower() in file_name.lower():
@@ -28,6 +180,39 @@ class MongoWriter:
         result = self.db[collection_name].insert_many(records)
         return {"status": "success", "inserted_count": len(result.inserted_ids)}
 
+    def upsert_records(self, collection_name: str, records: list, key: str):
+        """Write records as upserts on their natural ``key``, so re-ingesting a row updates it.
+
+        Records without the key (missing or null) cannot be matched and are
+        inserted as before. The batch is unordered, so a failing write does not
+        stop the others; failures are reported in ``failed_count`` and ``error``.
+        """
+        if not records:
+            return {"status": "no records to insert"}
+        operations = [
+            UpdateOne({key: record[key]}, {"$set": record}, upsert=True)
+            if record.get(key) is not None else InsertOne(record)
+            for record in records
+        ]
+        try:
+            result = self.db[collection_name].bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            details = e.details
+            failed_ops = details.get("writeErrors", [])
+            return {
+                "status": "partial",
+                "inserted_count": details.get("nInserted", 0) + details.get("nUpserted", 0),
+                "updated_count": details.get("nMatched", 0),
+                "failed_count": len(failed_ops),
+                "error": failed_ops[0]["errmsg"] if failed_ops else str(e),
+            }
+        return {
+            "status": "success",
+            "inserted_count": result.inserted_count + result.upserted_count,
+            "updated_count": result.matched_count,
+            "failed_count": 0,
+        }
+
     def insert_audit(self, file_name: str, success_count: int, error_count: int):
         audit_doc = {
             "file_name": file_name,
@@ -36,3 +221,7 @@ class MongoWriter:
             "error_count": error_count
         }
         self.db["Audit"].insert_one(audit_doc)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=MongoWriter._after_fork)
@@ -0,0 +1,153 @@
+"""Record normalization applied before validation, in one pass per record.
+
+Parsed records come out with lowercase keys, renamed to the names their
+validator model reads (a field's alias, also when the source uses the field
+name), and without ``_id`` fields at any depth, so re-ingested rows do not
+carry Mongo ids. Keys are stored as they are validated, so they always stay
+lowercase: model aliases are lowercase, and a key is never mapped to an
+upper-case name.
+
+The normalized name of each key is worked out once per chunk, not once per
+row. Tabular chunks are renamed through their DataFrame: the columns are
+renamed once, and rows are re-keyed with that mapping only when a name
+actually changes (their cells are flat, so values are not walked).
+
+Validated records keep the parser's values, whose types pandas guesses per
+chunk: the same customer id can arrive as ``101`` in one chunk and ``"101"``
+in a chunk that also holds ``"abc"``. ``canonical_keys`` casts the keys
+writes match on (natural keys and customer ids) to their model type.
+"""
+import types
+import typing
+from functools import lru_cache
+
+from pydantic import TypeAdapter
+
+ID_KEY = "_id"
+# Keys the Data Mart groups records by, as stored
+CUSTOMER_ID_KEYS = ("customer_id", "cust_id")
+
+
+@lru_cache(maxsize=None)
+def alias_map(model_cls) -> dict:
+    """Lowercased field name -> the (lowercased) alias ``model_cls`` validates, for keys that differ."""
+    if model_cls is None:
+        return {}
+    aliases = {}
+    for name, field in model_cls.model_fields.items():
+        aliases[name.lower()] = (field.alias or name).lower()
+    for name, field in model_cls.model_fields.items():
+        alias = (field.alias or name).lower()
+        aliases[alias] = alias  # an alias wins over another field's name
+    return {key: alias for key, alias in aliases.items() if key != alias}
+
+
+@lru_cache(maxsize=None)
+def key_casts(model_cls) -> dict:
+    """Record key (the lowercase alias) -> validator for each plain ``int``/``str`` field of ``model_cls``."""
+    casts = {}
+    for name, field in model_cls.model_fields.items():
+        annotation = field.annotation
+        if typing.get_origin(annotation) in (typing.Union, types.UnionType):
+            args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+            annotation = args[0] if len(args) == 1 else None
+        if annotation in (int, str):
+            casts[(field.alias or name).lower()] = (annotation, TypeAdapter(annotation).validate_python)
+    return casts
+
+
+def canonical_keys(records: list, model_cls, keys) -> list:
+    """Validated ``records`` with ``keys`` cast in place to their model type (``"101"`` -> ``101``)."""
+    if model_cls is None:
+        return records
+    casts = key_casts(model_cls)
+    casts = [(key, *casts[key]) for key in dict.fromkeys(keys) if key in casts]
+    if not casts:
+        return records
+    for record in records:
+        for key, annotation, cast in casts:
+            value = record.get(key)
+            if value is not None and type(value) is not annotation:
+                record[key] = cast(value)
+    return records
+
+
+def normalize_key(key, aliases: dict = None):
+    """Normalized name of a top-level key, or ``None`` for ``_id``."""
+    key = str(key).lower()
+    if key == ID_KEY:
+        return None
+    return aliases.get(key, key) if aliases else key
+
+
+def _nested(value):
+    """Lowercase keys and drop ``_id`` below the top level."""
+    if isinstance(value, dict):
+        normalized = {}
+        for key, item in value.items():
+            key = str(key).lower()
+            if key != ID_KEY:
+                normalized[key] = _nested(item)
+        return normalized
+    if isinstance(value, list):
+        return [_nested(item) for item in value]
+    return value
+
+
+def normalize_records(records: list, model_cls=None) -> list:
+    """Each record as a new dict with normalized keys and no ``_id`` fields."""
+    aliases = alias_map(model_cls)
+    names = {}  # source key -> normalized key, shared by the chunk's records
+    normalized = []
+    for record in records:
+        row = {}
+        for key, value in record.items():
+            try:
+                name = names[key]
+            except KeyError:
+                name = names[key] = normalize_key(key, aliases)
+            if name is None:
+                continue
+            if isinstance(value, (dict, list)):
+                value = _nested(value)
+            row[name] = value
+        normalized.append(row)
+    return normalized
+
+
+def normalize_batch(records: list, frame=None, model_cls=None):
+    """``(records, frame)`` of one parsed chunk, normalized.
+
+    Chunks without a frame go through ``normalize_records``. A tabular chunk
+    has its frame's columns renamed once; when no name changes the records
+    are returned as they are. The frame keeps the record keys as its columns,
+    which is what ``validate_frame`` expects.
+    """
+    if frame is None:
+        return normalize_records(records, model_cls), None
+
+    aliases = alias_map(model_cls)
+    columns = list(frame.columns)
+    names = {column: normalize_key(column, aliases) for column in columns}
+    if all(names[column] == column for column in columns):
+        return records, frame
+
+    keep = [i for i, column in enumerate(columns) if names[column] is not None]
+    if len(keep) < len(columns):
+        frame = frame.iloc[:, keep]
+    frame = frame.set_axis([names[columns[i]] for i in keep], axis=1)
+
+    # Rows are flat, so only their keys change
+    rename = {column: name for column, name in names.items() if name is not None}
+    try:
+        if len(rename) == len(names):
+            records = [{rename[key]: value for key, value in record.items()} for record in records]
+        else:
+            records = [{rename[key]: value for key, value in record.items() if key in rename}
+                       for record in records]
+    except KeyError:  # a key the frame has no column for
+        records = normalize_records(records, model_cls)
+    return records, frame
+
+
+__all__ = ["CUSTOMER_ID_KEYS", "alias_map", "canonical_keys", "normalize_key", "normalize_records", "normalize_batch"]
@@ -0,0 +1,117 @@
+"""Keyset pagination and streamed responses for the read endpoints.
+
+Pages are addressed by the value of a sort key (``_id`` or ``audit_id``):
+``?after=<key of the last item seen>&limit=<n>``. Documents are encoded one
+at a time straight from the Mongo cursor, so memory stays constant however
+large the result is.
+"""
+import os
+from bson import ObjectId
+from bson.errors import InvalidId
+from flask import Response
+
+from response_encoding import encode
+
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", 10000))
+# Documents fetched per round trip while streaming a cursor
+CURSOR_BATCH_SIZE = int(os.getenv("CURSOR_BATCH_SIZE", 500))
+
+FORMATS = {"json": "application/json", "ndjson": "application/x-ndjson"}
+
+
+def page_args(args, key: str, default_limit=None) -> dict:
+    """Read ``limit``, ``after``, ``fields`` and ``format`` from the query string.
+
+    Raises ``ValueError`` for malformed values.
+    """
+    limit = args.get("limit", default_limit)
+    if limit is not None:
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+
+    after = args.get("after")
+    if after is not None:
+        try:
+            after = ObjectId(after) if key == "_id" else int(after)
+        except (InvalidId, TypeError, ValueError):
+            raise ValueError(f"Invalid 'after' cursor: {after}")
+
+    fields = [f.strip() for f in args.get("fields", "").split(",") if f.strip()]
+    projection = None
+    if fields:
+        projection = {field: 1 for field in fields}
+        projection[key] = 1  # the next cursor is read from this field
+
+    fmt = args.get("format", "json").lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+    return {"key": key, "limit": limit, "after": after, "projection": projection, "format": fmt}
+
+
+def find_page(collection, query: dict, page: dict):
+    """Cursor over one page of ``collection`` in key order."""
+    key = page["key"]
+    if page["after"] is not None:
+        query = {**query, key: {"$gt": page["after"]}}
+    cursor = collection.find(query, page["projection"]).sort(key, 1).batch_size(CURSOR_BATCH_SIZE)
+    if page["limit"]:
+        cursor = cursor.limit(page["limit"])
+    return cursor
+
+
+def _buffered(parts, size=64 * 1024):
+    """Group small byte parts into ~``size`` chunks to cut per-write overhead."""
+    buffer, buffered = [], 0
+    for part in parts:
+        buffer.append(part)
+        buffered += len(part)
+        if buffered >= size:
+            yield b"".join(buffer)
+            buffer, buffered = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def stream_page(cursor, page: dict, prepare=None, envelope=None) -> Response:
+    """Stream cursor documents as a JSON array, or NDJSON lines with ``format=ndjson``.
+
+    ``prepare`` adjusts each document before encoding. With ``envelope`` =
+    ``(fields, name)`` the JSON array is wrapped as ``{**fields, name: [...],
+    "next_after": ...}``; ``next_after`` is only set when the page is full.
+    """
+    key, limit = page["key"], page["limit"]
+    prepare = prepare or (lambda doc: doc)
+    state = {"next_after": None}
+
+    def documents():
+        count, last = 0, None
+        for doc in cursor:
+            count += 1
+            last = doc.get(key)
+            yield encode(prepare(doc))
+        if limit and count == limit and last is not None:
+            state["next_after"] = str(last)
+
+    def ndjson():
+        for encoded in documents():
+            yield encoded + b"\n"
+
+    def json_array():
+        if envelope:
+            fields, name = envelope
+            head = encode(fields)
+            yield (head[:-1] + b"," if fields else b"{") + encode(name) + b":["
+        else:
+            yield b"["
+        for i, encoded in enumerate(documents()):
+            yield (b"," if i else b"") + encoded
+        if envelope:
+            yield b'],"next_after":' + encode(state["next_after"]) + b"}"
+        else:
+            yield b"]"
+
+    body = ndjson() if page["format"] == "ndjson" else json_array()
+    return Response(_buffered(body), mimetype=FORMATS[page["format"]])
+
+
+__all__ = ["page_args", "find_page", "stream_page"]
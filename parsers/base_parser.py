@@ -1,11 +1,86 @@
 from abc import ABC, abstractmethod
+from itertools import islice
+
+DEFAULT_CHUNK_SIZE = 10000
+
 
 class FileParser(ABC):
     """Abstract base class for all file parsers."""
 
     extensions = []  # subclasses must define supported extensions
+    seeks_bytes = False  # iter_tail starts at a byte offset instead of parsing the prefix
 
     @abstractmethod
     def parse(self, file_path: str):
         """Parse file and return structured data."""
         pass
+
+    def iter_records(self, file_path: str):
+        """Yield parsed records one at a time.
+
+        Parsers that can read their format incrementally override this; the
+        default falls back to :meth:`parse`.
+        """
+        return iter(self.parse(file_path))
+
+    def iter_chunks(self, file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, skip_rows: int = 0):
+        """Yield :meth:`iter_records` in lists of at most ``chunk_size``.
+
+        The first ``skip_rows`` records are dropped (already ingested).
+        """
+        records = islice(self.iter_records(file_path), skip_rows, None)
+        while True:
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def estimate_rows(self, file_path: str):
+        """Cheap estimate of the record count for progress reporting, or ``None``."""
+        return None
+
+    def iter_batches(self, file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, skip_rows: int = 0):
+        """Yield ``(records, frame)`` pairs, starting after the first ``skip_rows`` records.
+
+        ``frame`` is a DataFrame view of ``records`` for sources with flat,
+        tabular rows (used for columnar pre-validation), otherwise ``None``.
+        """
+        for chunk in self.iter_chunks(file_path, chunk_size, skip_rows):
+            yield chunk, None
+
+    def iter_tail(self, file_path: str, chunk_size: int, skip_rows: int, skip_bytes: int):
+        """:meth:`iter_batches` after ``skip_rows`` records that end at byte ``skip_bytes``.
+
+        Parsers with ``seeks_bytes`` override this to skip parsing the
+        prefix; the default parses it and drops ``skip_rows``.
+        """
+        return self.iter_batches(file_path, chunk_size, skip_rows)
+
+
+def skip_frame_rows(frames, skip_rows: int):
+    """Drop the first ``skip_rows`` rows from a stream of DataFrames."""
+    for df in frames:
+        if skip_rows >= len(df):
+            skip_rows -= len(df)
+            continue
+        if skip_rows:
+            df = df.iloc[skip_rows:].reset_index(drop=True)
+            skip_rows = 0
+        yield df
+
+
+class TabularParser(FileParser):
+    """Base class for parsers that read their source into pandas DataFrames."""
+
+    @abstractmethod
+    def iter_frames(self, file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, skip_rows: int = 0):
+        """Yield the file as DataFrames of at most ``chunk_size`` rows, after the first ``skip_rows``."""
+        pass
+
+    def iter_chunks(self, file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, skip_rows: int = 0):
+        for df in self.iter_frames(file_path, chunk_size, skip_rows):
+            yield df.to_dict(orient="records")
+
+    def iter_batches(self, file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, skip_rows: int = 0):
+        for df in self.iter_frames(file_path, chunk_size, skip_rows):
+            yield df.to_dict(orient="records"), df
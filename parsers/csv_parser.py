@@ -1,9 +1,34 @@
 import pandas as pd
-from .base_parser import FileParser
+from .base_parser import DEFAULT_CHUNK_SIZE, TabularParser, skip_frame_rows
 
-class CSVParser(FileParser):
+class CSVParser(TabularParser):
     extensions = ["csv"]
+    seeks_bytes = True
 
     def parse(self, file_path: str):
         df = pd.read_csv(file_path)
         return df.to_dict(orient="records")
+
+    def iter_frames(self, file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, skip_rows: int = 0):
+        # Skipped rows are dropped after parsing: read_csv's skiprows counts lines, not records
+        with pd.read_csv(file_path, chunksize=chunk_size) as reader:
+            yield from skip_frame_rows(reader, skip_rows)
+
+    def iter_tail(self, file_path: str, chunk_size: int, skip_rows: int, skip_bytes: int):
+        # Rows start on a line after skip_bytes, so read from there with the header's column names
+        columns = list(pd.read_csv(file_path, nrows=0).columns)
+        with open(file_path, "rb") as f:
+            f.seek(skip_bytes)
+            if not f.peek(1):
+                return
+            with pd.read_csv(f, header=None, names=columns, chunksize=chunk_size) as reader:
+                for df in reader:
+                    yield df.to_dict(orient="records"), df
+
+    def estimate_rows(self, file_path: str):
+        # Line count minus the header; quoted multi-line cells make this an estimate
+        lines = 0
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                lines += block.count(b"\n")
+        return max(lines - 1, 0)
@@ -1,9 +1,46 @@
+from itertools import islice
+
 import pandas as pd
-from .base_parser import FileParser
+from openpyxl import load_workbook
+from .base_parser import DEFAULT_CHUNK_SIZE, TabularParser, skip_frame_rows
 
-class ExcelParser(FileParser):
+class ExcelParser(TabularParser):
     extensions = ["xls", "xlsx"]
 
     def parse(self, file_path: str):
         df = pd.read_excel(file_path)
         return df.to_dict(orient="records")
+
+    def estimate_rows(self, file_path: str):
+        if not file_path.lower().endswith(".xlsx"):
+            return None
+        wb = load_workbook(file_path, read_only=True)
+        try:
+            max_row = wb.worksheets[0].max_row  # from the sheet's stored dimension
+            return max(max_row - 1, 0) if max_row else None
+        finally:
+            wb.close()
+
+    def iter_frames(self, file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, skip_rows: int = 0):
+        # Legacy .xls workbooks have no streaming reader, load them in one go
+        if not file_path.lower().endswith(".xlsx"):
+            yield from skip_frame_rows([pd.read_excel(file_path)], skip_rows)
+            return
+
+        wb = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            rows = wb.worksheets[0].iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            columns = [str(h) if h is not None else f"Unnamed: {i}" for i, h in enumerate(header)]
+            # read_only sheets report formatted-but-empty rows, pandas drops them
+            rows = (row for row in rows if any(v is not None for v in row))
+            rows = islice(rows, skip_rows, None)
+            while True:
+                block = list(islice(rows, chunk_size))
+                if not block:
+                    return
+                yield pd.DataFrame.from_records(block, columns=columns)
+        finally:
+            wb.close()
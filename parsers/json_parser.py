@@ -1,9 +1,98 @@
 import json
 from .base_parser import FileParser
 
+try:
+    # ijson's C backend streams arrays without the buffer juggling below
+    import ijson
+except ImportError:
+    ijson = None
+
+# Characters read per refill while streaming a JSON array
+JSON_READ_SIZE = 1024 * 1024
+# Longest array element, in characters, before undecodable input is reported instead of read further
+JSON_MAX_ELEMENT_SIZE = 64 * 1024 * 1024
+WHITESPACE = " \t\n\r"
+
+
 class JSONParser(FileParser):
     extensions = ["json"]
 
+    def __init__(self, use_ijson: bool = None, read_size: int = JSON_READ_SIZE,
+                 max_element_size: int = JSON_MAX_ELEMENT_SIZE):
+        # None picks ijson when it is installed
+        self.use_ijson = ijson is not None and use_ijson is not False
+        self.read_size = read_size
+        self.max_element_size = max_element_size
+
     def parse(self, file_path: str):
         with open(file_path, "r", encoding="utf-8") as f:
             return json.load(f)
+
+    def iter_records(self, file_path: str):
+        """Yield the elements of a top-level JSON array one at a time.
+
+        Files whose top level is not an array are loaded whole; a single
+        object is yielded as one record.
+        """
+        with open(file_path, "r", encoding="utf-8-sig") as f:
+            head = f.read(self.read_size)
+            start = len(head) - len(head.lstrip(WHITESPACE))
+            if head[start:start + 1] != "[":
+                data = json.loads(head + f.read())
+                yield from data if isinstance(data, list) else [data]
+                return
+
+            if self.use_ijson:
+                with open(file_path, "rb") as fb:
+                    yield from ijson.items(fb, "item", use_float=True)
+                return
+
+            yield from self._iter_array(f, head, start + 1)
+
+    def _iter_array(self, f, buffer: str, pos: int):
+        """Decode array elements with raw_decode over a buffer refilled from ``f``."""
+        decoder = json.JSONDecoder()
+        eof = False
+        while True:
+            # Skip to the next element, refilling across chunk boundaries
+            while True:
+                while pos < len(buffer) and buffer[pos] in WHITESPACE:
+                    pos += 1
+                if pos < len(buffer) or eof:
+                    break
+                buffer, pos = f.read(self.read_size), 0
+                eof = not buffer
+
+            if pos >= len(buffer):
+                raise ValueError("Unexpected end of file inside JSON array")
+            char = buffer[pos]
+            if char == "]":
+                return
+            if char == ",":
+                pos += 1
+                continue
+
+            try:
+                record, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                if eof:
+                    raise
+                if len(buffer) - pos >= self.max_element_size:
+                    # Malformed input is not retried up to EOF, which would read the whole file
+                    raise ValueError(f"JSON array element does not decode within "
+                                     f"{self.max_element_size} characters: {e}") from e
+                # The element runs past the buffer; read at least as much again and decode it again
+                more = f.read(max(self.read_size, len(buffer) - pos))
+                eof = not more
+                buffer = buffer[pos:] + more
+                pos = 0
+                continue
+            # A number can stop at the buffer edge and still decode; make sure it has ended
+            if end == len(buffer) and not eof:
+                more = f.read(self.read_size)
+                eof = not more
+                buffer = buffer[pos:] + more
+                pos = 0
+                continue
+            yield record
+            pos = end
@@ -0,0 +1,26 @@
+import json
+from .base_parser import FileParser
+
+
+class NDJSONParser(FileParser):
+    """Newline-delimited JSON (JSON Lines): one JSON document per line."""
+
+    extensions = ["jsonl", "ndjson"]
+
+    def iter_records(self, file_path: str):
+        with open(file_path, "r", encoding="utf-8-sig") as f:
+            for line_number, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"Invalid JSON on line {line_number}: {e}") from e
+
+    def parse(self, file_path: str):
+        return list(self.iter_records(file_path))
+
+    def estimate_rows(self, file_path: str):
+        with open(file_path, "rb") as f:
+            return sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1 << 20), b""))
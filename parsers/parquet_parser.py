@@ -0,0 +1,209 @@
+import base64
+import datetime
+import decimal
+import json
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from .base_parser import DEFAULT_CHUNK_SIZE, TabularParser
+
+# Per-row cells that did not fit their column's type, as JSON {"values": {column: value}, "absent": [keys]}
+OVERFLOW_COLUMN = "__overflow__"
+# Prefix of the per-column flags marking numbers that were text in the source (see staging.py)
+TEXT_PREFIX = "__text__."
+# Schema metadata key describing where a staged file came from (see staging.py)
+STAGING_METADATA_KEY = b"staging"
+
+# Overflow cells are JSON, never pickle: values JSON cannot hold exactly are tagged with their type
+_TAG = "$t"
+
+
+def _encode_cell(value):
+    if value is None or type(value) in (bool, int, float, str):
+        return value  # floats keep NaN and infinities (Python's json writes them)
+    if isinstance(value, list):
+        return [_encode_cell(item) for item in value]
+    if isinstance(value, dict):
+        return {_TAG: "dict", "v": [[_encode_cell(k), _encode_cell(v)] for k, v in value.items()]}
+    if isinstance(value, tuple):
+        return {_TAG: "tuple", "v": [_encode_cell(item) for item in value]}
+    if value is pd.NaT:
+        return {_TAG: "nat"}
+    if isinstance(value, pd.Timestamp):
+        return {_TAG: "timestamp", "v": value.isoformat()}
+    if isinstance(value, datetime.datetime):
+        return {_TAG: "datetime", "v": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {_TAG: "date", "v": value.isoformat()}
+    if isinstance(value, datetime.time):
+        return {_TAG: "time", "v": value.isoformat()}
+    if isinstance(value, datetime.timedelta):
+        return {_TAG: "timedelta", "v": value.total_seconds()}
+    if isinstance(value, decimal.Decimal):
+        return {_TAG: "decimal", "v": str(value)}
+    if isinstance(value, bytes):
+        return {_TAG: "bytes", "v": base64.b64encode(value).decode("ascii")}
+    if isinstance(value, np.generic):
+        return {_TAG: "numpy", "dtype": value.dtype.str, "v": _encode_cell(value.item())}
+    for base in (bool, int, float, str):  # other subclasses of the JSON scalars
+        if isinstance(value, base):
+            return base(value)
+    raise TypeError(f"Cannot stage a cell of type {type(value).__name__}")
+
+
+def _decode_cell(value):
+    if isinstance(value, list):
+        return [_decode_cell(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    tag = value[_TAG]
+    if tag == "dict":
+        return {_decode_cell(k): _decode_cell(v) for k, v in value["v"]}
+    if tag == "tuple":
+        return tuple(_decode_cell(item) for item in value["v"])
+    if tag == "nat":
+        return pd.NaT
+    if tag == "timestamp":
+        return pd.Timestamp(value["v"])
+    if tag == "datetime":
+        return datetime.datetime.fromisoformat(value["v"])
+    if tag == "date":
+        return datetime.date.fromisoformat(value["v"])
+    if tag == "time":
+        return datetime.time.fromisoformat(value["v"])
+    if tag == "timedelta":
+        return datetime.timedelta(seconds=value["v"])
+    if tag == "decimal":
+        return decimal.Decimal(value["v"])
+    if tag == "bytes":
+        return base64.b64decode(value["v"])
+    if tag == "numpy":
+        return np.dtype(value["dtype"]).type(_decode_cell(value["v"]))
+    raise ValueError(f"Unknown overflow cell tag: {tag}")
+
+
+def encode_overflow(values: dict, absent: list) -> str:
+    """One row's overflow cell: the values that did not fit their columns and the keys the record lacked."""
+    return json.dumps({"values": {column: _encode_cell(value) for column, value in values.items()},
+                       "absent": list(absent)})
+
+
+def decode_overflow(text: str):
+    """``(values, absent keys)`` of an overflow cell written by ``encode_overflow``."""
+    data = json.loads(text)
+    return {column: _decode_cell(value) for column, value in data["values"].items()}, data["absent"]
+
+
+def _restore_text(series: pd.Series, text, arrow_type) -> pd.Series:
+    """``series`` with the flagged numbers turned back into the text they were staged from."""
+    spell = (lambda v: repr(float(v))) if pa.types.is_floating(arrow_type) else (lambda v: str(int(v)))
+    values = series.to_numpy(dtype=object, copy=True)
+    for row in np.flatnonzero(text):
+        values[row] = spell(values[row])
+    return pd.Series(values, index=series.index, dtype=object)
+
+
+class ParquetParser(TabularParser):
+    """Reads Parquet files, including the staged copies of uploads written by staging.py.
+
+    Files are memory-mapped and read one record batch at a time; ``columns``
+    limits the read to the named columns. Cells a staged file kept in its
+    overflow column are put back, so records come out exactly as the original
+    parser produced them.
+
+    It is an internal reader for staged files and is not registered for an
+    upload extension: uploads cannot be Parquet.
+    """
+
+    extensions = []
+
+    def __init__(self, columns: list = None):
+        self.columns = columns
+
+    def parse(self, file_path: str):
+        return [record for chunk in self.iter_chunks(file_path) for record in chunk]
+
+    def estimate_rows(self, file_path: str):
+        return pq.ParquetFile(file_path, memory_map=True).metadata.num_rows
+
+    def staging_info(self, file_path: str) -> dict:
+        """Metadata recorded when the file was staged, or ``{}`` for other Parquet files."""
+        metadata = pq.ParquetFile(file_path, memory_map=True).schema_arrow.metadata or {}
+        return json.loads(metadata[STAGING_METADATA_KEY]) if STAGING_METADATA_KEY in metadata else {}
+
+    def _batches(self, parquet: pq.ParquetFile, chunk_size: int, skip_rows: int):
+        """Record batches starting at the row group holding row ``skip_rows``, and the rows left to drop."""
+        first_group = 0
+        while first_group < parquet.num_row_groups and skip_rows >= parquet.metadata.row_group(first_group).num_rows:
+            skip_rows -= parquet.metadata.row_group(first_group).num_rows
+            first_group += 1
+        columns = None
+        if self.columns is not None:
+            names = parquet.schema_arrow.names
+            columns = [c for c in self.columns if c in names]
+            columns += [TEXT_PREFIX + c for c in columns if TEXT_PREFIX + c in names]
+            if OVERFLOW_COLUMN in names:
+                columns.append(OVERFLOW_COLUMN)
+        batches = parquet.iter_batches(batch_size=chunk_size, columns=columns,
+                                       row_groups=range(first_group, parquet.num_row_groups))
+        return batches, skip_rows
+
+    def _frames(self, file_path: str, chunk_size: int, skip_rows: int):
+        """``(frame, overflow)`` pairs from row ``skip_rows`` on; ``overflow`` maps row -> (values, absent keys)."""
+        parquet = pq.ParquetFile(file_path, memory_map=True)
+        batches, skip_rows = self._batches(parquet, chunk_size, skip_rows)
+        for batch in batches:
+            if skip_rows >= batch.num_rows:
+                skip_rows -= batch.num_rows
+                continue
+            if skip_rows:
+                batch, skip_rows = batch.slice(skip_rows), 0
+            overflow = {}
+            if OVERFLOW_COLUMN in batch.schema.names:
+                cells = batch.column(batch.schema.get_field_index(OVERFLOW_COLUMN))
+                overflow = {row: decode_overflow(cell) for row, cell in enumerate(cells.to_pylist()) if cell is not None}
+                batch = batch.drop_columns([OVERFLOW_COLUMN])
+            flags = [name for name in batch.schema.names if name.startswith(TEXT_PREFIX)]
+            texts = {name[len(TEXT_PREFIX):]: batch.column(name).to_numpy(zero_copy_only=False) for name in flags}
+            batch = batch.drop_columns(flags)
+            df = batch.to_pandas()
+            for name, column in zip(batch.schema.names, batch.columns):
+                # Nulls only stand in for overflow cells; keep the other values' Python types (ints stay ints)
+                if column.null_count:
+                    df[name] = pd.Series(column.to_pylist(), dtype=object)
+            for name, text in texts.items():
+                if name in df.columns and text.any():
+                    df[name] = _restore_text(df[name], text, batch.schema.field(name).type)
+            yield df, overflow
+
+    def _wanted(self, column) -> bool:
+        return self.columns is None or column in self.columns
+
+    def iter_frames(self, file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, skip_rows: int = 0):
+        for df, overflow in self._frames(file_path, chunk_size, skip_rows):
+            for row, (values, _) in overflow.items():
+                for column, value in values.items():
+                    if column in df.columns:
+                        df.at[row, column] = value
+            yield df
+
+    def iter_batches(self, file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, skip_rows: int = 0):
+        # Staged copies of record-shaped sources (JSON, XML) had no frame
+        if not self.staging_info(file_path).get("tabular", True):
+            for df, overflow in self._frames(file_path, chunk_size, skip_rows):
+                records = df.to_dict(orient="records")
+                for row, (values, absent) in overflow.items():
+                    record = records[row]
+                    record.update((k, v) for k, v in values.items() if self._wanted(k))
+                    for key in absent:
+                        record.pop(key, None)
+                yield records, None
+            return
+        for df in self.iter_frames(file_path, chunk_size, skip_rows):
+            yield df.to_dict(orient="records"), df
+
+    def iter_chunks(self, file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, skip_rows: int = 0):
+        for records, _ in self.iter_batches(file_path, chunk_size, skip_rows):
+            yield records
@@ -49,64 +49,123 @@
 #         return parsed_data
 
 
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
 import pdfplumber
+from pdfminer.pdftypes import resolve1
 from .base_parser import FileParser
+from .ocr_cache import OCRCache
+from .trade_ocr import extract_trade_rows
 from PIL import Image
 import pytesseract
-import re
 
 pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
 
+# Processes used to extract pages; 1 extracts inline
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", os.cpu_count() or 1))
+# Below this many uncached pages a worker pool costs more than it saves
+PDF_MIN_PARALLEL_PAGES = int(os.getenv("PDF_MIN_PARALLEL_PAGES", 4))
+OCR_RESOLUTION = 300
+# Part of every cache key; bump when extraction changes so stale rows are not served
+EXTRACTOR_VERSION = "2"
+
+
+def page_cache_key(page) -> str:
+    """Hash of everything that decides a page's rows: its content streams and images."""
+    parts = [f"{EXTRACTOR_VERSION}|{OCR_RESOLUTION}|{page.width}x{page.height}".encode()]
+    contents = page.page_obj.contents or []
+    for stream in contents:
+        stream = resolve1(stream)
+        if hasattr(stream, "get_data"):
+            parts.append(stream.get_data())
+    for image in page.images:
+        stream = image.get("stream")
+        if stream is not None:
+            parts.append(stream.get_data())
+    return OCRCache.key(*parts)
+
+
+def extract_page(page) -> list:
+    """Rows from one page: its digital tables, or OCR of the rendered page when it has none."""
+    page_rows = []
+
+    # Try extracting tables normally
+    tables = page.extract_tables()
+    if tables and len(tables) > 0:
+        for table in tables:
+            if not table:
+                continue
+            t_headers = [h.strip() if h else "" for h in table[0]]
+            for row in table[1:]:
+                record = {}
+                for i, cell in enumerate(row):
+                    header = t_headers[i] if i < len(t_headers) else f"col_{i}"
+                    record[header] = cell.strip() if cell else None
+                page_rows.append(record)
+    else:
+        # OCR fallback
+        image = page.to_image(resolution=OCR_RESOLUTION).original
+        text = pytesseract.image_to_string(image)
+        page_rows.extend(extract_trade_rows(text))
+
+    return page_rows
+
+
+def extract_pages(file_path: str, page_numbers: list) -> list:
+    """Rows for each of ``page_numbers`` (0-based), opening the PDF once. Runs in pool workers."""
+    with pdfplumber.open(file_path) as pdf:
+        return [extract_page(pdf.pages[number]) for number in page_numbers]
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _pool(workers: int) -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn keeps workers clear of the web server's threads and Mongo sockets
+            _executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
 class PDFParser(FileParser):
     extensions = ["pdf"]
 
-    def parse(self, file_path: str):
-        parsed_data = []
+    def __init__(self, workers: int = PDF_WORKERS, cache: OCRCache = None,
+                 min_parallel: int = PDF_MIN_PARALLEL_PAGES):
+        self.workers = max(1, workers)
+        self.cache = cache if cache is not None else OCRCache()
+        self.min_parallel = min_parallel
+
+    def _extract(self, file_path: str, page_numbers: list) -> list:
+        """Rows per page for ``page_numbers``, in the same order."""
+        if self.workers == 1 or len(page_numbers) < self.min_parallel:
+            return extract_pages(file_path, page_numbers)
 
-        # Define table headers
-        headers = [
-            "TradeID", "TradeDate", "Instrument", "Symbol", "TradeType",
-            "Quantity", "Price", "CustomerID", "TradeValue", "Fee",
-            "NetValue", "PnL", "SettlementDate", "RiskCategory"
-        ]
+        # Contiguous shards, a few per worker so one slow page does not hold up the rest
+        shard = max(1, math.ceil(len(page_numbers) / (self.workers * 2)))
+        shards = [page_numbers[i:i + shard] for i in range(0, len(page_numbers), shard)]
+        results = _pool(self.workers).map(extract_pages, [file_path] * len(shards), shards)
+        return [page_rows for shard_rows in results for page_rows in shard_rows]
 
+    def parse(self, file_path: str):
         with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                # Try extracting tables normally
-                tables = page.extract_tables()
-                if tables and len(tables) > 0:
-                    for table in tables:
-                        if not table:
-                            continue
-                        t_headers = [h.strip() if h else "" for h in table[0]]
-                        for row in table[1:]:
-                            record = {}
-                            for i, cell in enumerate(row):
-                                header = t_headers[i] if i < len(t_headers) else f"col_{i}"
-                                record[header] = cell.strip() if cell else None
-                            parsed_data.append(record)
-                else:
-                    # OCR fallback
-                    image = page.to_image(resolution=300).original
-                    text = pytesseract.image_to_string(image)
-
-                    # Clean common OCR artifacts
-                    text = re.sub(r"[\]\|\)]", " ", text)
-                    lines = [line.strip() for line in text.split("\n") if line.strip()]
-
-                    for line in lines:
-                        # Extract dates, numbers, and words in order
-                        # Match: number(s), date, text, number(s)...
-                        pattern = r"(\d+)\s+(\d{1,2}/\d{1,2}/\d{4})\s+(\w+)\s+(\w+)\s+(\w+)\s+([\d,]+)\s+([\d.]+)\s+(\d+)\s+([\d.]+)\s+([\d.]+)\s+(-?[\d.]+)\s+(\d{1,2}/\d{1,2}/\d{4})\s+(\w+)"
-                        match = re.match(pattern, line.replace(",", ""))  # remove commas from numbers
-
-                        if match:
-                            record = {headers[i]: match.group(i+1) for i in range(len(headers))}
-                            parsed_data.append(record)
-                        else:
-                            # fallback: split by spaces (for lines that don't match)
-                            values = re.split(r"\s+", line)
-                            record = {headers[i]: values[i] if i < len(values) else None for i in range(len(headers))}
-                            parsed_data.append(record)
-
-        return parsed_data
+            keys = [page_cache_key(page) for page in pdf.pages]
+
+        pages = [self.cache.get(key) for key in keys]
+        missing = [number for number, page_rows in enumerate(pages) if page_rows is None]
+        if missing:
+            for number, page_rows in zip(missing, self._extract(file_path, missing)):
+                pages[number] = page_rows
+                self.cache.put(keys[number], page_rows)
+
+        # Merge in page order, whichever worker or cache entry produced each page
+        return [record for page_rows in pages for record in page_rows]
@@ -0,0 +1,62 @@
+import re
+
+# Column order of the trade statement tables
+TRADE_HEADERS = [
+    "TradeID", "TradeDate", "Instrument", "Symbol", "TradeType",
+    "Quantity", "Price", "CustomerID", "TradeValue", "Fee",
+    "NetValue", "PnL", "SettlementDate", "RiskCategory"
+]
+
+_DATE = r"(\d{1,2}/\d{1,2}/\d{4})"
+_WORD = r"(\S+)"
+# Numbers may carry a trailing "." or "/" from OCR ("115.78."); it is matched but left out of the group
+_INT = r"(\d+)[./]*"
+_NUMBER = r"(-?\d+(?:\.\d+)?)[./]*"
+
+# One trade per line, all 14 columns; [ \t] keeps a match from running onto the next line
+TRADE_LINE = re.compile(
+    r"^[ \t]*" + r"[ \t]+".join([
+        _INT, _DATE, _WORD, _WORD, _WORD, _INT, _NUMBER, _INT,
+        _NUMBER, _NUMBER, _NUMBER, _NUMBER, _DATE, _WORD,
+    ]) + r"[ \t]*$",
+    re.MULTILINE,
+)
+
+# OCR noise fixed on the whole page before matching: cell borders read as
+# characters, stray braces, thousands separators and minus signs read as dashes
+OCR_TRANSLATION = str.maketrans({
+    "]": " ", "|": " ", ")": " ",
+    "{": None, "}": None, ",": None,
+    "—": "-", "–": "-", "~": "-",
+})
+TRAILING_PUNCT = re.compile(r"(?<=\d)[./]+(?=\s|$)")  # "115.78." -> "115.78", for unmatched lines
+
+
+def clean_ocr_text(text: str) -> str:
+    return text.translate(OCR_TRANSLATION)
+
+
+def _split_lines(text: str, rows: list):
+    """Fallback for lines that are not a full trade row: split on whitespace."""
+    for line in text.splitlines():
+        values = TRAILING_PUNCT.sub("", line).split()
+        if values:
+            rows.append({header: values[i] if i < len(values) else None for i, header in enumerate(TRADE_HEADERS)})
+
+
+def extract_trade_rows(text: str) -> list:
+    """Turn the OCR text of one statement page into trade records, in line order.
+
+    Full rows are picked out in a single ``finditer`` pass; the text between
+    matches (headers, damaged rows) goes through the whitespace fallback so
+    it still reaches validation and the error records.
+    """
+    text = clean_ocr_text(text)
+    rows = []
+    position = 0
+    for match in TRADE_LINE.finditer(text):
+        _split_lines(text[position:match.start()], rows)
+        rows.append(dict(zip(TRADE_HEADERS, match.groups())))
+        position = match.end()
+    _split_lines(text[position:], rows)
+    return rows
@@ -1,16 +1,54 @@
 import xml.etree.ElementTree as ET
-from .base_parser import FileParser
+import pandas as pd
+from .base_parser import DEFAULT_CHUNK_SIZE, FileParser
+
+try:
+    # lxml's iterparse is faster and frees parsed siblings more cheaply
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_etree = None
+
 
 class XMLParser(FileParser):
     extensions = ["xml"]
 
-    def parse(self, file_path: str):
-        tree = ET.parse(file_path)
-        root = tree.getroot()
+    def __init__(self, use_lxml: bool = None):
+        # None picks lxml when it is installed
+        self.use_lxml = lxml_etree is not None and use_lxml is not False
+
+    def iter_records(self, file_path: str):
+        """Yield one ``{tag: text}`` dict per child of the root element.
 
-        parsed_data = []
-        for child in root:
-            record = {elem.tag: elem.text for elem in child}
-            parsed_data.append(record)
+        Streams with ``iterparse`` and clears each record element once it is
+        read, so memory stays flat however large the export is.
+        """
+        etree = lxml_etree if self.use_lxml else ET
+        depth = 0
+        root = None
+        for event, elem in etree.iterparse(file_path, events=("start", "end")):
+            if event == "start":
+                depth += 1
+                if root is None:
+                    root = elem
+                continue
+
+            depth -= 1
+            if depth != 1:
+                continue
+            yield {field.tag: field.text for field in elem}
+
+            # Drop the finished record, and with lxml the references the root keeps to it
+            elem.clear()
+            if self.use_lxml:
+                while elem.getprevious() is not None:
+                    del root[0]
+            else:
+                root.clear()
+
+    def parse(self, file_path: str):
+        return list(self.iter_records(file_path))
 
-        return parsed_data
+    def iter_batches(self, file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, skip_rows: int = 0):
+        # Each child element is one flat row, so a chunk maps straight onto a DataFrame
+        for chunk in self.iter_chunks(file_path, chunk_size, skip_rows):
+            yield chunk, pd.DataFrame.from_records(chunk)
@@ -0,0 +1,232 @@
+"""In-process cache of serialized read responses.
+
+Entries hold the encoded response body, keyed by route path and query
+string, and are dropped after ``RESPONSE_CACHE_TTL`` seconds or, least
+recently used first, once the cache holds more than
+``RESPONSE_CACHE_MAX_ENTRIES`` entries or ``RESPONSE_CACHE_MAX_BYTES`` bytes.
+
+Each entry carries tags naming the data it was built from (``audits``,
+``customer:<id>``, ``customer:<id>:<collection>``). Ingestion invalidates the
+tags it writes to, so a cached page never outlives the data behind it. A
+response whose tags are invalidated while it is being built is served but
+not stored; responses built from other tags are unaffected. The cache is per
+process: other worker processes only see a write once their copy expires.
+
+Responses carry an ``ETag`` and ``Cache-Control: no-cache``, so browsers
+revalidate with ``If-None-Match`` and get a ``304`` when nothing changed.
+A streamed response is sent before its body is known, so its ETag is a
+random token that the stored entry keeps, instead of a hash of the body.
+"""
+import functools
+import hashlib
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from flask import Response, make_response, request
+
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", 60))  # seconds; 0 disables the cache
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 1024))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+# Larger responses (e.g. a full /audits listing) are served but not kept
+RESPONSE_CACHE_MAX_ENTRY_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRY_BYTES", 4 * 1024 * 1024))
+
+
+class CacheEntry:
+    def __init__(self, body: bytes, content_type: str, tags, expires: float, etag: str = None):
+        self.body = body
+        self.content_type = content_type
+        self.tags = frozenset(tags)
+        self.expires = expires
+        self.etag = etag or hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+class Build:
+    """A response being built from ``tags``' data; ``stale`` once one of them is invalidated."""
+
+    def __init__(self, tags):
+        self.tags = frozenset(str(tag) for tag in tags)
+        self.stale = False
+
+
+class ResponseCache:
+    """Bounded LRU + TTL map of response bodies, invalidated by tag."""
+
+    def __init__(self, ttl: float = RESPONSE_CACHE_TTL, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+                 max_bytes: int = RESPONSE_CACHE_MAX_BYTES, max_entry_bytes: int = RESPONSE_CACHE_MAX_ENTRY_BYTES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = min(max_entry_bytes, max_bytes)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        # Responses being built; invalidating one of their tags keeps them from being stored
+        self._builds = set()
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "not_modified": 0, "stores": 0,
+                         "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires <= time.monotonic():
+                self._remove(key)
+                self.counters["expirations"] += 1
+                entry = None
+            if entry is None:
+                self.counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.counters["hits"] += 1
+            return entry
+
+    def count(self, counter: str):
+        with self._lock:
+            self.counters[counter] += 1
+
+    def start(self, tags) -> Build:
+        """Register a response about to be built from ``tags``; hand it to ``put`` or ``discard``."""
+        build = Build(tags)
+        with self._lock:
+            self._builds.add(build)
+        return build
+
+    def discard(self, build: Build):
+        with self._lock:
+            self._builds.discard(build)
+
+    def put(self, key, body: bytes, content_type: str, build: Build, etag: str = None):
+        """Store the response of ``build``; returns the entry, or ``None``."""
+        self.discard(build)
+        if not self.enabled or len(body) > self.max_entry_bytes:
+            return None
+        entry = CacheEntry(body, content_type, build.tags, time.monotonic() + self.ttl, etag)
+        with self._lock:
+            if build.stale:
+                return None  # its data changed while this response was being built
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += len(body)
+            self.counters["stores"] += 1
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.counters["evictions"] += 1
+        return entry
+
+    def invalidate(self, *tags) -> int:
+        """Drop every entry carrying one of ``tags``; returns how many were dropped."""
+        tags = {str(tag) for tag in tags}
+        with self._lock:
+            for build in self._builds:
+                if build.tags & tags:
+                    build.stale = True
+            stale = [key for key, entry in self._entries.items() if entry.tags & tags]
+            for key in stale:
+                self._remove(key)
+            self.counters["invalidations"] += len(stale)
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            for build in self._builds:
+                build.stale = True
+            self.counters["invalidations"] += len(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key):
+        self._bytes -= len(self._entries.pop(key).body)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.counters["hits"] + self.counters["misses"]
+            return {
+                **self.counters,
+                "hit_ratio": round(self.counters["hits"] / lookups, 3) if lookups else None,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+            }
+
+    def _record(self, key, chunks, content_type: str, build: Build, etag: str):
+        """Pass a streamed body through, storing it once it completes within the entry size limit."""
+        parts, size, oversized = [], 0, False
+        try:
+            for chunk in chunks:
+                yield chunk
+                if oversized:
+                    continue
+                data = chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+                size += len(data)
+                if size > self.max_entry_bytes:
+                    # Too large to cache: drop what was collected and just stream the rest
+                    oversized, parts = True, None
+                else:
+                    parts.append(data)
+            if not oversized:
+                self.put(key, b"".join(parts), content_type, build, etag)
+        finally:
+            self.discard(build)  # an abandoned or oversized stream is not stored
+
+
+def cache_key(path: str, args) -> tuple:
+    return path, tuple(sorted(args.items(multi=True)))
+
+
+def _conditional(response: Response, etag: str) -> Response:
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(request)
+
+
+def cached_response(cache: ResponseCache, tags):
+    """Serve a GET view from ``cache``; ``tags(**view_kwargs)`` names the data the response depends on.
+
+    Only ``200`` responses are stored. Streamed responses keep streaming on a
+    miss and are stored when the stream finishes.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if not cache.enabled:
+                return view(*args, **kwargs)
+
+            key = cache_key(request.path, request.args)
+            entry = cache.get(key)
+            if entry is not None:
+                response = _conditional(Response(entry.body, content_type=entry.content_type), entry.etag)
+                if response.status_code == 304:
+                    cache.count("not_modified")
+                return response
+
+            build = cache.start(tags(**kwargs))
+            try:
+                response = make_response(view(*args, **kwargs))
+            except BaseException:
+                cache.discard(build)
+                raise
+            if response.status_code != 200:
+                cache.discard(build)
+                return response
+            if response.is_streamed:
+                etag = uuid.uuid4().hex
+                response.response = cache._record(key, response.response, response.content_type, build, etag)
+                response.call_on_close(lambda: cache.discard(build))  # also when the stream never starts
+                response.set_etag(etag)
+                response.headers["Cache-Control"] = "no-cache"
+                return response
+            entry = cache.put(key, response.get_data(), response.content_type, build)
+            return _conditional(response, entry.etag) if entry else response
+        return wrapper
+    return decorator
+
+
+__all__ = ["ResponseCache", "cached_response", "cache_key"]
@@ -0,0 +1,181 @@
+"""Response encoding: plain JSON for BSON documents, and negotiated compression.
+
+``encode`` turns Mongo documents into plain JSON bytes: ObjectIds become
+their hex string and datetimes ISO 8601 strings, instead of the extended
+JSON (``{"$oid": ...}``, ``{"$date": ...}``) written by ``json_util``. It
+uses orjson when installed and the standard library otherwise.
+``RESPONSE_ENCODER=extended`` switches back to ``json_util``.
+
+``compress_response`` is an ``after_request`` hook that gzip- or
+brotli-encodes JSON responses according to the request's Accept-Encoding,
+streaming responses included.
+"""
+import base64
+import datetime
+import json
+import math
+import os
+import uuid
+import zlib
+from decimal import Decimal
+from bson import Binary, Decimal128, ObjectId, json_util
+from bson.regex import Regex
+from bson.timestamp import Timestamp
+from flask import Response, request
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional: the standard library encoder is used instead
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # optional: only gzip is offered
+    brotli = None
+
+RESPONSE_ENCODER = os.getenv("RESPONSE_ENCODER", "plain")
+# Smaller bodies are sent as they are; compressing them costs more than it saves
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", 1024))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", 6))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", 4))
+
+COMPRESSIBLE_MIMETYPES = {"application/json", "application/x-ndjson"}
+
+
+def _default(obj):
+    """Plain JSON value for the types neither encoder handles itself."""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, (datetime.datetime, datetime.date)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal128):
+        return str(obj.to_decimal())
+    if isinstance(obj, (Decimal, uuid.UUID)):
+        return str(obj)
+    if isinstance(obj, Timestamp):
+        return obj.as_datetime().isoformat()
+    if isinstance(obj, Regex):
+        return obj.pattern
+    if isinstance(obj, (Binary, bytes)):
+        return base64.b64encode(obj).decode("ascii")
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _plain_orjson(obj) -> bytes:
+    # orjson writes NaN/Infinity as null, which keeps the output valid JSON
+    return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _finite(obj):
+    """``obj`` with NaN/Infinity floats replaced by ``None``, as orjson writes them."""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(value) for value in obj]
+    return obj
+
+
+def _plain_stdlib(obj) -> bytes:
+    try:
+        text = json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":"), allow_nan=False)
+    except ValueError:
+        # NaN is common (pandas gives it for empty cells); only then is the document copied
+        text = json.dumps(_finite(obj), default=_default, ensure_ascii=False, separators=(",", ":"), allow_nan=False)
+    return text.encode("utf-8")
+
+
+def _extended(obj) -> bytes:
+    return json_util.dumps(obj).encode("utf-8")
+
+
+ENCODERS = {
+    "plain": _plain_orjson if orjson is not None else _plain_stdlib,
+    "extended": _extended,
+}
+
+if RESPONSE_ENCODER not in ENCODERS:
+    raise ValueError(f"Unknown RESPONSE_ENCODER: {RESPONSE_ENCODER} (expected one of {', '.join(ENCODERS)})")
+encode = ENCODERS[RESPONSE_ENCODER]
+
+
+def json_response(obj, status: int = 200) -> Response:
+    return Response(encode(obj), status=status, mimetype="application/json")
+
+
+class EncoderJSONProvider(JSONProvider):
+    """Flask JSON provider backed by ``encode``, so ``jsonify`` produces the same output as the streamed routes."""
+
+    def dumps(self, obj, **kwargs) -> str:
+        return encode(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s) if orjson is not None else json.loads(s)
+
+    def response(self, *args, **kwargs) -> Response:
+        return json_response(self._prepare_response_obj(args, kwargs))
+
+
+def negotiate_encoding(accept_encoding) -> str:
+    """``br`` or ``gzip`` as accepted by the client (brotli only when installed), else ``None``."""
+    if brotli is not None and accept_encoding["br"]:
+        return "br"
+    if accept_encoding["gzip"]:
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    def __init__(self, coding: str):
+        if coding == "br":
+            self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+            self.compress, self._finish = self._compressor.process, self._compressor.finish
+        else:
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # 31: gzip container
+            self.compress, self._finish = self._compressor.compress, self._compressor.flush
+
+    def finish(self) -> bytes:
+        return self._finish()
+
+
+def _compress_stream(chunks, coding: str):
+    compressor = _Compressor(coding)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+def compress_response(response: Response) -> Response:
+    """``after_request`` hook compressing JSON bodies the client accepts compressed."""
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES or response.status_code != 200 \
+            or response.direct_passthrough or "Content-Encoding" in response.headers:
+        return response
+    response.vary.add("Accept-Encoding")
+    coding = negotiate_encoding(request.accept_encodings)
+    if coding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = _compress_stream(response.response, coding)
+    else:
+        body = response.get_data()
+        if len(body) < COMPRESS_MIN_BYTES:
+            return response
+        compressor = _Compressor(coding)
+        response.set_data(compressor.compress(body) + compressor.finish())
+
+    response.headers["Content-Encoding"] = coding
+    # The bytes differ per coding, so the validator becomes weak (If-None-Match compares weakly)
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+__all__ = ["encode", "json_response", "EncoderJSONProvider", "compress_response", "negotiate_encoding"]
@@ -0,0 +1,279 @@
+"""Columnar staging of uploads.
+
+Each accepted upload is parsed once and written to
+``STAGING_DIR/<sha256>.parquet``, keyed by its content hash. Ingestion then
+reads the staged copy with ParquetParser (memory-mapped, one record batch at
+a time), and so does any later run over the same content: a forced
+re-upload, a backfill, or analytics reading a few columns with
+``read_staged``.
+
+Column types come from the collection's validator model (``int``,
+``float``, ``str`` and ``bool`` fields); other columns take the type of
+their first chunk. Sources that give text cells (XML, and CSV columns
+pandas read as text) still fill the model's int and float columns: a text
+cell that is the exact spelling of a number (``str(int)``, ``repr(float)``)
+is stored as that number, and the column's ``__text__.<name>`` flag marks
+it so it reads back as the original text. A cell that does not fit its
+column's type otherwise (a word in an int column, a missing value, a key
+some JSON records lack) is kept in a per-row overflow column instead, so
+the staged file reads back the records the original parser produced and
+validation gives the same result. Overflow cells are JSON, with tags for
+the types JSON cannot hold (dates, numpy scalars, ...), so reading a staged
+file never unpickles.
+"""
+import datetime
+import json
+import os
+import types
+import typing
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from parsers.parquet_parser import OVERFLOW_COLUMN, STAGING_METADATA_KEY, TEXT_PREFIX, encode_overflow
+
+STAGING_DIR = os.getenv("STAGING_DIR", os.path.join("uploads", ".staging"))
+# Upload formats converted to Parquet; PDFs have their own page cache (see parsers/ocr_cache.py)
+STAGING_EXTENSIONS = {ext for ext in os.getenv("STAGING_EXTENSIONS", "csv,xls,xlsx,xml,json,jsonl,ndjson").split(",") if ext}
+STAGING_COMPRESSION = os.getenv("STAGING_COMPRESSION", "zstd")
+# Bumped when the staged layout changes, so older staged files are not reused
+STAGING_VERSION = "3"
+
+_MODEL_TYPES = {int: pa.int64(), float: pa.float64(), str: pa.string(), bool: pa.bool_()}
+_TIMESTAMP = pa.timestamp("us")
+
+
+def staging_path(content_hash: str) -> str:
+    return os.path.join(STAGING_DIR, f"{content_hash}.v{STAGING_VERSION}.parquet")
+
+
+def model_types(model_cls) -> dict:
+    """Arrow type for each plain ``int``/``float``/``str``/``bool`` field, by record key (the lowercase alias)."""
+    types_by_key = {}
+    for name, field in model_cls.model_fields.items():
+        annotation = field.annotation
+        if typing.get_origin(annotation) in (typing.Union, types.UnionType):
+            args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+            annotation = args[0] if len(args) == 1 else None
+        if annotation in _MODEL_TYPES:
+            types_by_key[(field.alias or name).lower()] = _MODEL_TYPES[annotation]
+    return types_by_key
+
+
+def _inferred_type(series: pd.Series) -> pa.DataType:
+    kind = series.dtype.kind
+    if kind in "iu":
+        return pa.int64()
+    if kind == "f":
+        return pa.float64()
+    if kind == "b":
+        return pa.bool_()
+    if kind == "M":
+        return _TIMESTAMP
+    return pa.string()
+
+
+# Python values a column of each type holds exactly; anything else goes to the overflow column
+_FITS = {
+    pa.int64(): lambda v: (type(v) is int or isinstance(v, np.integer)) and -2 ** 63 <= v < 2 ** 63,
+    pa.float64(): lambda v: type(v) is float or isinstance(v, np.floating),
+    pa.string(): lambda v: isinstance(v, str),
+    pa.bool_(): lambda v: type(v) is bool or isinstance(v, np.bool_),
+    _TIMESTAMP: lambda v: isinstance(v, datetime.datetime) and v is not pd.NaT,
+}
+
+
+def _int_from_text(text: str):
+    try:
+        value = int(text)
+    except ValueError:
+        return None
+    return value if str(value) == text and -2 ** 63 <= value < 2 ** 63 else None
+
+
+def _float_from_text(text: str):
+    try:
+        value = float(text)
+    except ValueError:
+        return None
+    return value if repr(value) == text else None
+
+
+# Numeric column types whose text cells are stored as numbers when they read back unchanged
+_FROM_TEXT = {pa.int64(): _int_from_text, pa.float64(): _float_from_text}
+
+
+def _column(series: pd.Series, arrow_type: pa.DataType):
+    """``(array, misfit mask, text mask)`` for one column chunk; misfit cells are null in the array.
+
+    The text mask (``None`` when no cell came from text) marks numbers parsed from text cells.
+    """
+    kind = series.dtype.kind
+    values = series.to_numpy()
+    if arrow_type == pa.int64() and kind in "iu":
+        return pa.array(values, type=arrow_type), None, None
+    if arrow_type == pa.int64() and kind == "f":
+        with np.errstate(invalid="ignore"):
+            fits = np.isfinite(values) & (values == np.floor(values)) & (np.abs(values) < 2 ** 63)
+        return pa.array(np.where(fits, values, 0).astype(np.int64), mask=~fits), ~fits, None
+    if arrow_type == pa.float64() and kind in "iuf":
+        # NaN stays a float value, it is not turned into null
+        return pa.array(values.astype(np.float64), type=arrow_type), None, None
+    if arrow_type == pa.bool_() and kind == "b":
+        return pa.array(values, type=arrow_type), None, None
+    if arrow_type == _TIMESTAMP and kind == "M":
+        missing = series.isna().to_numpy()
+        return pa.array(series, type=arrow_type, from_pandas=True), missing if missing.any() else None, None
+
+    values = series.to_numpy(dtype=object)
+    fits = _FITS[arrow_type]
+    from_text = _FROM_TEXT.get(arrow_type)
+    cells = []
+    fit = np.ones(len(values), dtype=bool)
+    text = np.zeros(len(values), dtype=bool)
+    for row, value in enumerate(values):
+        if fits(value):
+            cells.append(value)
+            continue
+        number = from_text(value) if from_text is not None and isinstance(value, str) else None
+        if number is None:
+            cells.append(None)
+            fit[row] = False
+        else:
+            cells.append(number)
+            text[row] = True
+    return pa.array(cells, type=arrow_type), ~fit, text if text.any() else None
+
+
+class StagingWriter:
+    """Writes parsed chunks of one upload to a Parquet file, one row group per chunk."""
+
+    def __init__(self, path: str, model_cls=None, source: dict = None):
+        self.path = path
+        self.model_types = model_types(model_cls) if model_cls is not None else {}
+        self.source = source or {}
+        self.schema = None
+        self.columns = []  # the source's columns, in schema order
+        self.rows = 0
+        self.overflow_rows = 0
+        self._writer = None
+        self._tmp = f"{path}.{os.getpid()}.tmp"
+
+    def _open(self, columns: dict):
+        fields = [
+            pa.field(name, self.model_types.get(name.lower()) or _inferred_type(series.infer_objects()))
+            for name, series in columns.items()
+        ]
+        self.columns = [field.name for field in fields]
+        # A text flag per model int/float column, so numbers parsed from text read back as that text
+        fields += [pa.field(TEXT_PREFIX + field.name, pa.bool_()) for field in fields
+                   if field.type in _FROM_TEXT and field.name.lower() in self.model_types]
+        fields.append(pa.field(OVERFLOW_COLUMN, pa.string()))
+        metadata = {STAGING_METADATA_KEY: json.dumps(self.source).encode("utf-8")}
+        self.schema = pa.schema(fields, metadata=metadata)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._writer = pq.ParquetWriter(self._tmp, self.schema, compression=STAGING_COMPRESSION)
+
+    def write(self, records: list, frame: pd.DataFrame = None):
+        """Stage one chunk: the parser's DataFrame for tabular sources, otherwise its records."""
+        if not records:
+            return
+        if frame is not None:
+            columns = {str(name): frame[name] for name in frame.columns}
+        else:
+            # Built from the records themselves: a DataFrame would turn None into NaN and ints into numpy ints
+            keys = dict.fromkeys(str(key) for record in records for key in record)
+            columns = {key: pd.Series([record.get(key) for record in records], dtype=object) for key in keys}
+        if self._writer is None:
+            self._open(columns)
+
+        overflow = [None] * len(records)
+
+        def spill(row, column, value):
+            if overflow[row] is None:
+                overflow[row] = ({}, [])
+            overflow[row][0][column] = value
+
+        arrays = {}
+        for name in self.columns:
+            field = self.schema.field(name)
+            text = None
+            if name not in columns:
+                arrays[name] = pa.nulls(len(records), type=field.type)
+            else:
+                series = columns[name]
+                arrays[name], misfit, text = _column(series, field.type)
+                if misfit is not None:
+                    for row in np.flatnonzero(misfit):
+                        spill(row, name, series.iat[row])
+            if TEXT_PREFIX + name in self.schema.names:
+                arrays[TEXT_PREFIX + name] = pa.array(text if text is not None else np.zeros(len(records), dtype=bool))
+
+        if frame is None:
+            # Record-shaped sources: keep keys outside the schema, and which keys each record lacked
+            known = set(self.schema.names)
+            for row, record in enumerate(records):
+                for key, value in record.items():
+                    if str(key) not in known:
+                        spill(row, str(key), value)
+                missing = [name for name in self.columns if name not in record]
+                if missing:
+                    if overflow[row] is None:
+                        overflow[row] = ({}, [])
+                    for name in missing:
+                        overflow[row][0].pop(name, None)
+                    overflow[row][1].extend(missing)
+
+        arrays[OVERFLOW_COLUMN] = pa.array([encode_overflow(*o) if o is not None else None for o in overflow],
+                                           type=pa.string())
+        self._writer.write_table(pa.Table.from_arrays([arrays[name] for name in self.schema.names], schema=self.schema))
+        self.rows += len(records)
+        self.overflow_rows += sum(o is not None for o in overflow)
+
+    def close(self):
+        if self._writer is None:
+            return
+        self._writer.close()
+        os.replace(self._tmp, self.path)  # readers only ever see a complete file
+
+    def abort(self):
+        if self._writer is not None:
+            self._writer.close()
+        if os.path.exists(self._tmp):
+            os.remove(self._tmp)
+
+
+def stage_file(parser, file_path: str, path: str, model_cls=None, chunk_size: int = 10000, ext: str = None) -> dict:
+    """Parse ``file_path`` once and write its staged Parquet copy to ``path``."""
+    ext = ext or file_path.rsplit(".", 1)[-1].lower()
+    source = {
+        "file_name": os.path.basename(file_path),
+        "ext": ext,
+        "tabular": False,
+        "model": model_cls.__name__ if model_cls is not None else None,
+        "version": STAGING_VERSION,
+    }
+    writer = StagingWriter(path, model_cls, source)
+    try:
+        for records, frame in parser.iter_batches(file_path, chunk_size):
+            if writer.schema is None:
+                source["tabular"] = frame is not None
+            writer.write(records, frame)
+        writer.close()
+    except BaseException:
+        writer.abort()
+        raise
+    return {"rows": writer.rows, "overflow_rows": writer.overflow_rows,
+            "bytes": os.path.getsize(path) if os.path.exists(path) else 0}
+
+
+def read_staged(content_hash: str, columns: list = None) -> pa.Table:
+    """Memory-mapped Arrow table of a staged upload, limited to ``columns`` (analytics reads).
+
+    Values that did not fit their column's type are null here, and numbers
+    parsed from text are numbers (flagged in ``__text__.<name>``);
+    ParquetParser restores both.
+    """
+    return pq.read_table(staging_path(content_hash), columns=columns, memory_map=True)
@@ -0,0 +1,93 @@
+import importlib
+import io
+
+import pytest
+
+from jobs import Job, JobQueue
+
+
+def make_job(name="upi_transactions.csv"):
+    return Job(f"uploads/{name}", name, name.rsplit(".", 1)[-1])
+
+
+def test_inline_job_runs_to_success():
+    seen = []
+
+    def runner(job):
+        seen.append(job.status)
+        job.update(stage="parsing", rows_processed=5)
+        return {"rows": 5}
+
+    queue = JobQueue(runner, workers=0)
+    job = make_job()
+    assert (job.status, job.stage) == ("PENDING", "queued")
+
+    assert queue.submit(job) is job
+    assert seen == ["IN_PROGRESS"]
+    assert job.done and job.wait(0)
+    assert job.status == "SUCCESS"
+    assert job.stage == "done"
+    assert job.result == {"rows": 5}
+    assert job.error is None
+    assert queue.get(job.id) is job
+
+    state = job.to_dict()
+    assert state["rows_processed"] == 5
+    assert state["started_at"] is not None and state["finished_at"] is not None
+    assert state["eta_seconds"] is None
+
+
+def test_inline_job_failure_is_recorded():
+    def runner(job):
+        raise ValueError("File is not a zip file")
+
+    queue = JobQueue(runner, workers=0)
+    job = queue.submit(make_job("upi_transactions.xlsx"))
+    assert job.done
+    assert job.status == "FAILED"
+    assert job.stage == "done"
+    assert job.error == "File is not a zip file"
+    assert job.result is None
+
+
+def test_finished_jobs_are_evicted_oldest_first():
+    queue = JobQueue(lambda job: None, workers=0, max_finished=1)
+    jobs = [queue.submit(make_job()) for _ in range(3)]
+    # Eviction runs on submit, before the new job finishes
+    assert queue.get(jobs[0].id) is None
+    assert queue.get(jobs[1].id) is jobs[1]
+    assert queue.get(jobs[2].id) is jobs[2]
+
+
+@pytest.fixture
+def app_module(tmp_path, monkeypatch):
+    """main with a mongomock client, uploads under ``tmp_path`` and an inline job queue."""
+    mongomock = pytest.importorskip("mongomock")
+    import mongo_writer
+
+    client = mongomock.MongoClient()
+    monkeypatch.setattr(mongo_writer.MongoWriter, "get_client", classmethod(lambda cls, uri: client))
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("STAGING_DIR", str(tmp_path / "staging"))
+    main = importlib.import_module("main")
+    monkeypatch.setattr(main, "ingest_queue", JobQueue(main.run_ingest_job, workers=0))
+    return main, client[main.MongoWriter().db.name]
+
+
+def test_unreadable_upload_fails_its_audit(app_module):
+    main, db = app_module
+    response = main.app.test_client().post(
+        "/upload", data={"file": (io.BytesIO(b"not a zip"), "upi_transactions.xlsx")})
+    assert response.status_code == 202
+    body = response.get_json()
+
+    job = main.ingest_queue.get(body["job_id"])
+    assert job.status == "FAILED"
+    assert "zip" in job.error
+
+    audit = db["Audit"].find_one({"audit_id": body["audit_id"]})
+    assert audit["status"] == "FAILED"
+    assert audit["comments"] == job.error
+    assert audit["finished_at"]
+    ledger = db["Ingestion_Ledger"].find_one({"_id": job.content_hash})
+    assert ledger["status"] == "FAILED"
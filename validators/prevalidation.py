@@ -0,0 +1,208 @@
+"""Columnar pre-validation for tabular sources.
+
+Checks whole DataFrame columns with pandas/NumPy instead of running the
+pydantic validators row by row. A row is accepted here only when every field
+is certain to pass its model; everything else falls back to full pydantic
+validation, so error records keep exactly the shape of ``e.errors()``.
+"""
+import datetime
+import typing
+
+import numpy as np
+import pandas as pd
+
+from validators.retail_transactions import CustomerRetailModel, DATE_FORMATS as RETAIL_DATE_FORMATS, TIME_FORMATS
+from validators.trade_transactions import CustomerTradeModel
+from validators.upi_transactions import CustomerUPIModel, TIMESTAMP_FORMATS
+
+INT_PATTERN = r"[+-]?\d+"
+FLOAT_PATTERN = r"[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?"
+# What float() accepts once the trade cleaners have stripped everything but digits, dots and minus
+CLEANED_FLOAT_PATTERN = r"-?(?:\d+\.?\d*|\.\d+)"
+
+
+def _all(series, value):
+    return np.full(len(series), value, dtype=bool)
+
+
+def _as_text(series):
+    return series.astype(str).str.strip()
+
+
+def _parses_with(text, formats):
+    ok = np.zeros(len(text), dtype=bool)
+    for fmt in formats:
+        ok |= pd.to_datetime(text, format=fmt, errors="coerce").notna().to_numpy()
+    return ok
+
+
+# ---- plain pydantic types ----
+
+def _check_int(series, required):
+    kind = series.dtype.kind
+    if kind in "iu":
+        return _all(series, True)
+    if kind == "f":
+        values = series.to_numpy()
+        with np.errstate(invalid="ignore"):
+            return np.isfinite(values) & (values == np.floor(values))
+    if kind == "O":
+        return series.astype(str).str.fullmatch(INT_PATTERN).to_numpy(dtype=bool)
+    return _all(series, False)
+
+
+def _check_float(series, required):
+    kind = series.dtype.kind
+    if kind in "iuf":
+        return _all(series, True)  # pydantic accepts NaN for float fields
+    if kind == "O":
+        return series.astype(str).str.fullmatch(FLOAT_PATTERN).to_numpy(dtype=bool)
+    return _all(series, False)
+
+
+def _check_str(series, required):
+    if series.dtype.kind != "O":
+        return _all(series, False)
+    if pd.api.types.infer_dtype(series, skipna=False) == "string":
+        return _all(series, True)
+    # Mixed column: None/NaN is ambiguous here, so only real strings pass
+    return series.map(type).eq(str).to_numpy()
+
+
+PLAIN_CHECKS = {int: _check_int, float: _check_float, str: _check_str}
+
+
+# ---- equivalents of the models' custom field validators ----
+
+def _check_formatted_date(formats):
+    def check(series, required):
+        if series.dtype.kind == "M":
+            return _all(series, False)
+        return _parses_with(_as_text(series), formats)
+    return check
+
+
+def _check_lenient(series, required):
+    # Validator turns anything unparseable into None, so optional fields always pass
+    return _all(series, not required)
+
+
+def _check_retail_time(series, required):
+    if series.dtype.kind == "M":
+        return _all(series, False)
+    text = _as_text(series).str.replace(r"^(\d:\d{2}:\d{2})$", r"0\1", regex=True)
+    return _parses_with(text, TIME_FORMATS)
+
+
+def _check_upi_timestamp(series, required):
+    if series.dtype.kind == "M":
+        return series.notna().to_numpy()
+    return _parses_with(_as_text(series), TIMESTAMP_FORMATS)
+
+
+def _check_cleaned_int(series, required):
+    cleaned = _as_text(series).str.replace(r"[^0-9\-]", "", regex=True)
+    ok = cleaned.str.fullmatch(r"-?\d+")
+    if not required:
+        ok = ok | cleaned.eq("")
+    return ok.to_numpy(dtype=bool)
+
+
+def _check_cleaned_float(series, required):
+    cleaned = _as_text(series).str.replace(",", "", regex=False).str.replace(r"[^\d\.\-]", "", regex=True)
+    ok = cleaned.str.fullmatch(CLEANED_FLOAT_PATTERN)
+    if not required:
+        ok = ok | cleaned.eq("")
+    return ok.to_numpy(dtype=bool)
+
+
+CUSTOM_CHECKS = {
+    CustomerRetailModel: {
+        "date": _check_formatted_date(RETAIL_DATE_FORMATS),
+        "time": _check_retail_time,
+    },
+    CustomerTradeModel: {
+        "trade_date": _check_lenient,
+        "settlement_date": _check_lenient,
+        "quantity": _check_cleaned_int,
+        "price": _check_cleaned_float,
+        "trade_value": _check_cleaned_float,
+        "fee": _check_cleaned_float,
+        "net_value": _check_cleaned_float,
+        "pnl": _check_cleaned_float,
+    },
+    CustomerUPIModel: {
+        "timestamp": _check_upi_timestamp,
+    },
+}
+
+
+def _base_type(annotation):
+    args = [a for a in typing.get_args(annotation) if a is not type(None)]
+    if typing.get_origin(annotation) is typing.Union and len(args) == 1:
+        return args[0]
+    return annotation
+
+
+def _field_checks(model_cls):
+    """Yield ``(column, field_name, required, check)`` for every field of the model."""
+    custom = CUSTOM_CHECKS.get(model_cls, {})
+    validated = {
+        field
+        for decorator in model_cls.__pydantic_decorators__.field_validators.values()
+        for field in decorator.info.fields
+    }
+    for name, field in model_cls.model_fields.items():
+        column = field.alias or name
+        if name in custom:
+            check = custom[name]
+        elif name in validated:
+            check = None  # custom validator without a vectorized equivalent
+        else:
+            check = PLAIN_CHECKS.get(_base_type(field.annotation))
+        yield column, name, field.is_required(), check
+
+
+def prevalidate(model_cls, frame: pd.DataFrame) -> np.ndarray:
+    """Return a boolean mask of rows that are certain to pass ``model_cls``.
+
+    ``frame`` must use the same (normalized) column names as the records that
+    are validated.
+    """
+    passed = np.ones(len(frame), dtype=bool)
+    if not frame.columns.is_unique:
+        return ~passed
+    populate_by_name = model_cls.model_config.get("populate_by_name", False)
+    for column, name, required, check in _field_checks(model_cls):
+        if column not in frame.columns:
+            if populate_by_name and name != column and name in frame.columns:
+                return ~passed  # field given by name instead of alias, leave it to pydantic
+            if required:
+                return ~passed
+            continue  # defaults are not validated
+        if check is None:
+            return ~passed
+        passed &= check(frame[column], required)
+        if not passed.any():
+            break
+    return passed
+
+
+def validate_frame(model_cls, frame: pd.DataFrame, records: list, engine):
+    """Like ``engine.validate`` but only rows that fail the columnar checks reach pydantic.
+
+    ``records`` are the row dicts of ``frame`` in the same order, and the
+    frame's columns are their keys (``normalize.normalize_batch`` keeps both in step).
+    """
+    pending = np.flatnonzero(~prevalidate(model_cls, frame))
+    if len(pending) == 0:
+        return list(records), []
+
+    _, pending_failures = engine.validate(model_cls, [records[i] for i in pending])
+    failures = [(int(pending[i]), errors) for i, errors in pending_failures]
+    failed = {i for i, _ in failures}
+    valid = [record for i, record in enumerate(records) if i not in failed]
+    return valid, failures
+
+
+__all__ = ["prevalidate", "validate_frame"]
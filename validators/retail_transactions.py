@@ -3,6 +3,9 @@ from typing import Optional
 import datetime
 import re
 
+DATE_FORMATS = ["%m/%d/%Y", "%Y-%m-%d", "%d/%m/%Y"]
+TIME_FORMATS = ["%H:%M:%S", "%I:%M:%S%p", "%H:%M"]
+
 class CustomerRetailModel(BaseModel):
     transaction_id: int = Field(..., alias="transaction_id")
     customer_id: int = Field(..., alias="customer_id")
@@ -35,8 +38,7 @@ class CustomerRetailModel(BaseModel):
         if isinstance(v, datetime.date):
             return v
         s = str(v).strip()
-        fmts = ["%m/%d/%Y", "%Y-%m-%d", "%d/%m/%Y"]
-        for fmt in fmts:
+        for fmt in DATE_FORMATS:
             try:
                 return datetime.datetime.strptime(s, fmt).date()
             except ValueError:
@@ -55,8 +57,7 @@ class CustomerRetailModel(BaseModel):
         # Fix leading zero issue → allow "3:19:22"
         if re.match(r'^\d:\d{2}:\d{2}$', s):
             s = "0" + s
-        fmts = ["%H:%M:%S", "%I:%M:%S%p", "%H:%M"]
-        for fmt in fmts:
+        for fmt in TIME_FORMATS:
             try:
                 return datetime.datetime.strptime(s, fmt).time()
             except ValueError:
@@ -3,6 +3,8 @@ from typing import Optional
 import datetime
 import re
 
+DATE_FORMATS = ["%m/%d/%Y", "%Y-%m-%d", "%d/%m/%Y"]
+
 class CustomerTradeModel(BaseModel):
     trade_id: int = Field(..., alias="tradeid")              # match lowercase parser keys
     trade_date: Optional[datetime.date] = Field(None, alias="tradedate")
@@ -31,8 +33,7 @@ class CustomerTradeModel(BaseModel):
         if isinstance(v, datetime.date):
             return v
         s = str(v).strip().strip("}").strip("{")  # remove stray braces
-        fmts = ["%m/%d/%Y", "%Y-%m-%d", "%d/%m/%Y"]
-        for fmt in fmts:
+        for fmt in DATE_FORMATS:
             try:
                 return datetime.datetime.strptime(s, fmt).date()
             except ValueError:
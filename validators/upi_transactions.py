@@ -2,13 +2,15 @@ from pydantic import BaseModel, Field, field_validator
 from typing import Optional
 import datetime
 
+TIMESTAMP_FORMATS = ["%Y-%m-%d %H:%M:%S", "%m/%d/%Y %H:%M:%S", "%d/%m/%Y %H:%M:%S", "%Y-%m-%dT%H:%M:%S"]
+
 class CustomerUPIModel(BaseModel):
     transaction_id: str = Field(..., alias="transaction id")
     customer_id: int = Field(..., alias="customer id")
     timestamp: datetime.datetime = Field(..., alias="timestamp")
     transaction_type: Optional[str] = Field(None, alias="transaction type")
     merchant_category: Optional[str] = Field(None, alias="merchant_category")
-    amount: Optional[int] = Field(None, alias="amount (INR)")
+    amount: Optional[float] = Field(None, alias="amount (inr)")  # lowercase, as records are stored
     transaction_status: Optional[str] = Field(None, alias="transaction_status")
     sender_age_group: Optional[str] = Field(None, alias="sender_age_group")
     receiver_age_group: Optional[str] = Field(None, alias="receiver_age_group")
@@ -33,8 +35,7 @@ class CustomerUPIModel(BaseModel):
         if isinstance(v, datetime.datetime):
             return v
         s = str(v).strip()
-        fmts = ["%Y-%m-%d %H:%M:%S", "%m/%d/%Y %H:%M:%S", "%d/%m/%Y %H:%M:%S", "%Y-%m-%dT%H:%M:%S"]
-        for fmt in fmts:
+        for fmt in TIMESTAMP_FORMATS:
             try:
                 return datetime.datetime.strptime(s, fmt)
             except ValueError:
@@ -0,0 +1,111 @@
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import repeat
+from pydantic import TypeAdapter, ValidationError
+
+VALIDATION_WORKERS = int(os.getenv("VALIDATION_WORKERS", os.cpu_count() or 1))
+VALIDATION_BATCH_SIZE = int(os.getenv("VALIDATION_BATCH_SIZE", 5000))
+# Below this many records pickling to a worker costs more than it saves
+VALIDATION_MIN_PARALLEL = int(os.getenv("VALIDATION_MIN_PARALLEL", 2000))
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model_cls):
+    return TypeAdapter(list[model_cls])
+
+
+def validate_batch(model_cls, records: list) -> dict:
+    """Validate a batch in one pydantic call.
+
+    Returns ``{index: errors}`` for the failing records, where ``errors`` has
+    the same shape as ``model_cls(**record)`` raising ``e.errors()``.
+    """
+    try:
+        _list_adapter(model_cls).validate_python(records)
+        return {}
+    except ValidationError as e:
+        failures = {}
+        for err in e.errors():
+            index, *loc = err["loc"]
+            err["loc"] = tuple(loc)
+            if "ctx" in err:
+                # Validator exceptions (ctx["error"]) cannot be stored in Mongo; keep their message
+                err["ctx"] = {k: str(v) if isinstance(v, Exception) else v for k, v in err["ctx"].items()}
+            failures.setdefault(index, []).append(err)
+        return failures
+
+
+class ValidationEngine:
+    """Validates records against a pydantic model across a process pool."""
+
+    def __init__(self, workers: int = VALIDATION_WORKERS, batch_size: int = VALIDATION_BATCH_SIZE,
+                 min_parallel: int = VALIDATION_MIN_PARALLEL):
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.min_parallel = min_parallel
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn keeps workers clear of the web server's threads and Mongo sockets
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def validate(self, model_cls, records: list):
+        """Split records into valid ones and ``(index, errors)`` failures, both in record order."""
+        if not records:
+            return [], []
+
+        parallel = self.workers > 1 and len(records) >= self.min_parallel
+        shard = self.batch_size
+        if parallel:
+            # Spread small inputs over every worker instead of filling one batch
+            shard = min(shard, math.ceil(len(records) / self.workers))
+        offsets = range(0, len(records), shard)
+        batches = [records[i:i + shard] for i in offsets]
+
+        if parallel:
+            results = self._pool().map(validate_batch, repeat(model_cls), batches)
+        else:
+            results = map(validate_batch, repeat(model_cls), batches)
+
+        valid, failures = [], []
+        for offset, batch, batch_failures in zip(offsets, batches, results):
+            for i, record in enumerate(batch):
+                errors = batch_failures.get(i)
+                if errors is None:
+                    valid.append(record)
+                else:
+                    failures.append((offset + i, errors))
+        return valid, failures
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> ValidationEngine:
+    """Process-wide engine shared by the upload pipeline and batch validation."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = ValidationEngine()
+        return _engine
+
+
+__all__ = ["ValidationEngine", "get_engine", "validate_batch"]
@@ -2,12 +2,13 @@ import os
 import json
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from pydantic import ValidationError
 from validators.credit_card_transactions import CustomerCreditCardModel
 from validators.customers import CustomerModel
 from validators.retail_transactions import CustomerRetailModel
 from validators.trade_transactions import CustomerTradeModel
 from validators.upi_transactions import CustomerUPIModel
+from validators.validation_engine import get_engine
+from normalize import normalize_records
 from parsers.csv_parser import CSVParser
 from parsers.excel_parser import ExcelParser
 from parsers.json_parser import JSONParser
@@ -31,15 +32,6 @@ PARSER_MAPPING = {
     "xml": XMLParser()
 }
 
-def keys_to_lower(obj):
-        """Recursively convert dict keys to lowercase"""
-        if isinstance(obj, dict):
-            return {str(k).lower(): keys_to_lower(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [keys_to_lower(i) for i in obj]
-        else:
-            return obj
-
 def get_parser(file_path: str):
     ext = os.path.splitext(file_path)[-1].lower().replace(".", "")
     parser = PARSER_MAPPING.get(ext)
@@ -54,24 +46,18 @@ def validate_file(file_path: str):
     model_cls = MODEL_MAPPING[file_name]
     parser = get_parser(file_path)
     records = parser.parse(file_path)
-    # Convert keys to lowercase
-    records = [keys_to_lower(record) for record in records]
-
-    # Remove _id if exists (to avoid duplicate key error)
-    for record in records:
-        record.pop("_id", None)
+    # Lowercase keys, map them to the model's aliases and drop _id (to avoid duplicate key error)
+    records = normalize_records(records, model_cls)
     results = {"file": file_name, "success": 0, "errors": 0, "error_details": []}
-    for idx, record in enumerate(records, start=1):
-        try:
-            model_cls(**record)
-            results["success"] += 1
-        except ValidationError as e:
-            results["errors"] += 1
-            results["error_details"].append({
-                "record_number": idx,
-                "record": record,
-                "errors": e.errors()
-            })
+    valid, failures = get_engine().validate(model_cls, records)
+    results["success"] = len(valid)
+    for idx, errors in failures:
+        results["errors"] += 1
+        results["error_details"].append({
+            "record_number": idx + 1,
+            "record": records[idx],
+            "errors": errors
+        })
     return results
 
 def run_all_validations(files: list[str]):
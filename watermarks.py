@@ -0,0 +1,177 @@
+"""Per-source watermarks for incremental ingestion of append-only exports.
+
+After a file is ingested, its source (the file name) gets a watermark: how
+many records were processed, the byte size, the SHA-256 of the whole file
+and a SHA-256 over the processed records. When the same source is uploaded
+again and its start is unchanged, only the records after the watermark are
+validated and written.
+
+Two checks decide that the start is unchanged:
+
+* byte prefix: the first ``size`` bytes hash to the stored file hash.
+  Cheap, and enough for CSV and JSON Lines files that grow by appending.
+  Parsers that can start at a line's byte offset (CSV) then read only the
+  bytes after ``size``.
+* record prefix: the first ``rows`` parsed records hash to the stored
+  record hash. Used when the bytes moved but the rows did not, e.g. a JSON
+  array gaining elements before its closing bracket, or a re-saved workbook.
+
+The record hash covers every processed record. A byte-prefix run does not
+parse the prefix, so it continues the stored hash instead: at the watermark's
+row the digest is re-seeded with the previous hex digest. Those rows are kept
+as ``hash_boundaries``, so a record-prefix check that hashes the records
+from the start re-seeds at the same rows and gets the same value.
+"""
+import hashlib
+import json
+import os
+from datetime import datetime
+
+from ingestion_ledger import HASH_READ_SIZE
+
+WATERMARK_COLLECTION = "Ingestion_Watermarks"
+
+
+def source_key(file_path: str) -> str:
+    return os.path.basename(file_path).lower()
+
+
+def prefix_sha256(file_path: str, size: int) -> str:
+    """SHA-256 of the first ``size`` bytes of the file."""
+    digest = hashlib.sha256()
+    remaining = size
+    with open(file_path, "rb") as f:
+        while remaining > 0:
+            block = f.read(min(HASH_READ_SIZE, remaining))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+    return digest.hexdigest()
+
+
+class RecordHasher:
+    """Order-sensitive SHA-256 over parsed records, fed chunk by chunk.
+
+    The digest is re-seeded with its own hex digest after each row count in
+    ``boundaries`` (see the module docstring).
+    """
+
+    def __init__(self, boundaries: list = (), seed: str = None, rows: int = 0):
+        self.boundaries = list(boundaries)
+        self.rows = rows
+        self._pending = [row for row in self.boundaries if row > rows]
+        self._digest = self._seeded(seed)
+
+    @classmethod
+    def resume(cls, rows_sha256: str, rows: int, boundaries: list = ()):
+        """Continue the record hash of a watermark whose first ``rows`` records are not re-read."""
+        return cls(list(boundaries) + [rows], rows_sha256, rows)
+
+    @staticmethod
+    def _seeded(seed: str = None):
+        digest = hashlib.sha256()
+        if seed:
+            digest.update(seed.encode("ascii") + b"\n")
+        return digest
+
+    def update(self, records: list):
+        for record in records:
+            self._digest.update(json.dumps(record, sort_keys=True, default=str).encode("utf-8"))
+            self._digest.update(b"\n")
+            self.rows += 1
+            if self._pending and self.rows == self._pending[0]:
+                self._pending.pop(0)
+                self._digest = self._seeded(self._digest.hexdigest())
+
+    def hexdigest(self) -> str:
+        return self._digest.hexdigest()
+
+
+class DeltaPlan:
+    """Where an ingestion run starts, and why."""
+
+    def __init__(self, skip_rows: int = 0, reason: str = "no watermark", hasher: RecordHasher = None,
+                 skip_bytes: int = 0):
+        self.skip_rows = skip_rows
+        self.reason = reason
+        # Byte offset of the first unprocessed record, when the byte prefix is unchanged
+        self.skip_bytes = skip_bytes
+        # Carries the record hash of the skipped prefix forward, when it was computed
+        self.hasher = hasher
+
+
+def plan_delta(db, file_path: str, parser, chunk_size: int, parse_path: str = None) -> DeltaPlan:
+    """Decide how many leading records of ``file_path`` were already ingested.
+
+    ``parse_path`` is what ``parser`` reads records from when it is not
+    ``file_path`` itself, e.g. the upload's staged Parquet copy.
+    """
+    watermark = db[WATERMARK_COLLECTION].find_one({"_id": source_key(file_path)})
+    if not watermark or not watermark.get("rows"):
+        return DeltaPlan(hasher=RecordHasher())
+
+    plan = _byte_prefix_plan(file_path, watermark)
+    if plan:
+        return plan
+
+    if watermark.get("rows_sha256"):
+        hasher = RecordHasher(watermark.get("hash_boundaries", []))
+        chunks = parser.iter_chunks(parse_path or file_path, chunk_size)
+        try:
+            for chunk in chunks:
+                hasher.update(chunk[:watermark["rows"] - hasher.rows])
+                if hasher.rows >= watermark["rows"]:
+                    break
+        finally:
+            chunks.close()
+        if hasher.rows == watermark["rows"] and hasher.hexdigest() == watermark["rows_sha256"]:
+            return DeltaPlan(watermark["rows"], "record prefix unchanged", hasher)
+
+    return DeltaPlan(reason="source changed before its watermark", hasher=RecordHasher())
+
+
+def byte_prefix_plan(db, file_path: str):
+    """The byte-prefix half of :func:`plan_delta`, which parses nothing; ``None`` when it does not apply."""
+    watermark = db[WATERMARK_COLLECTION].find_one({"_id": source_key(file_path)})
+    if not watermark or not watermark.get("rows"):
+        return None
+    return _byte_prefix_plan(file_path, watermark)
+
+
+def _byte_prefix_plan(file_path: str, watermark: dict):
+    size = os.path.getsize(file_path)
+    if size < watermark["size"] or not watermark.get("ends_with_newline") \
+            or prefix_sha256(file_path, watermark["size"]) != watermark["file_sha256"]:
+        return None
+    # The prefix is not parsed, so its record hash is continued rather than recomputed
+    hasher = RecordHasher.resume(watermark["rows_sha256"], watermark["rows"], watermark.get("hash_boundaries", [])) \
+        if watermark.get("rows_sha256") else None
+    return DeltaPlan(watermark["rows"], "byte prefix unchanged", hasher, skip_bytes=watermark["size"])
+
+
+def _ends_with_newline(file_path: str) -> bool:
+    """Appends start a new line only if the file already ended with one."""
+    with open(file_path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() == 0:
+            return False
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def save_watermark(db, file_path: str, rows: int, file_sha256: str, rows_sha256: str = None,
+                   hash_boundaries: list = None):
+    db[WATERMARK_COLLECTION].update_one(
+        {"_id": source_key(file_path)},
+        {"$set": {
+            "rows": rows,
+            "size": os.path.getsize(file_path),
+            "file_sha256": file_sha256,
+            "ends_with_newline": _ends_with_newline(file_path),
+            "rows_sha256": rows_sha256,
+            "hash_boundaries": hash_boundaries or [],
+            "updated_at": datetime.now(),
+        }},
+        upsert=True,
+    )